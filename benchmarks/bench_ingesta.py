@@ -0,0 +1,95 @@
+"""
+Benchmark de ingesta sostenida con el generador sintético.
+
+Mide, con bloques de telemetria.sintetico:
+- muestras/s generadas (bloque vectorizado -> TelemetryBatch);
+- muestras/s hasta disco en HistorialDB, muestra a muestra (append) y
+  por bloque (append_batch), incluida la espera al último commit;
+- muestras/s en la bitácora binaria (append / append_batch).
+
+Uso:
+    python benchmarks/bench_ingesta.py
+    python benchmarks/bench_ingesta.py --muestras 500000 --bloque 2000 --patron barrido
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from telemetria.bitacora import FlightLogWriter  # noqa: E402
+from telemetria.historial import HistorialDB  # noqa: E402
+from telemetria.sintetico import PATTERNS, SyntheticGenerator  # noqa: E402
+
+
+def bloques(args):
+    gen = SyntheticGenerator(args.patron, args.hz, dropout=args.perdidas, seed=1)
+    out = []
+    left = args.muestras
+    while left > 0:
+        out.append(gen.block(min(args.bloque, left)))
+        left -= args.bloque
+    return out
+
+
+def medir_bd(batches, folder: Path, por_bloque: bool) -> float:
+    db = HistorialDB(folder / "telemetria_ui.db", max_pending=10_000_000)
+    db.start_flight("Sintético")
+    t0 = time.perf_counter()
+    for batch in batches:
+        if por_bloque:
+            db.append_batch("Sintético", batch)
+        else:
+            for s in batch.samples():
+                db.append("Sintético", s)
+    db.flush(wait=True)
+    dt = time.perf_counter() - t0
+    db.close()
+    return dt
+
+
+def medir_bitacora(batches, path: Path, por_bloque: bool) -> float:
+    log = FlightLogWriter(path, "Sintético")
+    t0 = time.perf_counter()
+    for batch in batches:
+        if por_bloque:
+            log.append_batch(batch)
+        else:
+            for s in batch.samples():
+                log.append(s)
+    log.close()
+    return time.perf_counter() - t0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("--muestras", type=int, default=200_000)
+    p.add_argument("--bloque", type=int, default=1000, help="muestras por bloque")
+    p.add_argument("--hz", type=float, default=100.0, help="tasa nominal del generador")
+    p.add_argument("--patron", choices=PATTERNS, default="ocho")
+    p.add_argument("--perdidas", type=float, default=0.0)
+    args = p.parse_args(argv)
+
+    t0 = time.perf_counter()
+    batches = bloques(args)
+    gen_s = time.perf_counter() - t0
+    n = sum(len(b) for b in batches)
+    print(f"{n} muestras ({args.patron}, bloques de {args.bloque})")
+    print(f"  generador              : {n / gen_s:12,.0f} muestras/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        for label, por_bloque in (("append", False), ("append_batch", True)):
+            dt = medir_bd(batches, folder / label, por_bloque)
+            print(f"  historial {label:<13}: {n / dt:12,.0f} muestras/s")
+        for label, por_bloque in (("append", False), ("append_batch", True)):
+            dt = medir_bitacora(batches, folder / f"{label}.bin", por_bloque)
+            print(f"  bitácora {label:<14}: {n / dt:12,.0f} muestras/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Benchmark del parser LoRa (`clave:valor,...` -> TelemetrySample).
+
+Compara el parser anterior de LoRaBackend (split + dict + f() con
+try/float por clave, reproducido aquí tal cual) con parse_lora_line, y
+el mismo corpus enviado como tramas binarias (telemetria.trama_lora):
+bytes por muestra en el enlace y tramas/s decodificadas.
+
+Uso:
+    python benchmarks/bench_lora_parser.py                 # corpus sintético
+    python benchmarks/bench_lora_parser.py captura.txt     # líneas capturadas
+    python benchmarks/bench_lora_parser.py --lineas 500000 --rondas 5
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from telemetria.telemetria import (  # noqa: E402
+    LORA_KEYS,
+    TelemetrySample,
+    parse_lora_fields,
+    parse_lora_line,
+)
+from telemetria.trama_lora import LoRaStreamDecoder, encode_frame  # noqa: E402
+
+
+def _parse_line_anterior(line: str) -> Dict[str, float]:
+    out: Dict[str, float] = {}
+    for part in line.split(","):
+        if ":" not in part:
+            continue
+        k, v = part.split(":", 1)
+        k = k.strip().lower()
+        v = v.strip()
+        try:
+            out[k] = float(v)
+        except Exception:
+            pass
+    return out
+
+
+def parse_anterior(line: str, t_default: float = 0.0) -> TelemetrySample:
+    """Ruta de LoRaBackend.samples antes del parser por tabla."""
+    data = _parse_line_anterior(line)
+    if data.get("ts") is not None:
+        t = float(data.get("ts"))
+    else:
+        t = t_default
+
+    def f(key: str) -> Optional[float]:
+        try:
+            v = data.get(key)
+            return float(v) if v is not None else None
+        except Exception:
+            return None
+
+    return TelemetrySample(
+        time_s=t, lat_deg=f("lat"), lon_deg=f("lon"), abs_alt_m=None, rel_alt_m=None,
+        roll_deg=None, pitch_deg=None, yaw_deg=None, vx_ms=None, vy_ms=None, vz_ms=None,
+        groundspeed_ms=f("speed"), voltage_v=f("vbat"), battery_percent=f("bat"),
+        flight_mode="LORA", in_air=None, gps_fix_type=None, num_sat=None,
+        temp_c=f("temp"), hum_pct=f("hum"), pres_hpa=f("pres"), rad_mwcm2=f("rad"),
+        acc_ms2=f("acc"), raw_line=line,
+    )
+
+
+def corpus_sintetico(n: int, seed: int = 1) -> List[str]:
+    """
+    Líneas como las del enlace real: contrato completo con algo de ruido
+    (campos faltantes, valores corruptos, claves desconocidas, basura).
+    """
+    rnd = random.Random(seed)
+    lines = []
+    for i in range(n):
+        t = i * 0.1
+        fields = [
+            f"temp:{24.0 + 0.8 * math.sin(0.05 * t):.1f}",
+            f"hum:{45.0 + 8.0 * math.cos(0.03 * t):.1f}",
+            f"pres:{1012.0 + math.sin(0.01 * t):.1f}",
+            f"rad:{0.25 + 0.05 * math.sin(0.07 * t):.2f}",
+            f"lat:{19.332 + 0.0005 * math.cos(t):.4f}",
+            f"lon:{-99.184 + 0.0005 * math.sin(t):.4f}",
+            f"speed:{2.0 + rnd.random():.2f}",
+            f"acc:{0.3 + 0.2 * rnd.random():.2f}",
+            f"vbat:{15.8 - 0.0015 * t:.2f}",
+            f"bat:{max(0.0, 100.0 - 0.05 * t):.0f}",
+            f"ts:{t:.1f}",
+        ]
+        r = rnd.random()
+        if r < 0.05:
+            del fields[rnd.randrange(len(fields))]
+        elif r < 0.08:
+            k = rnd.randrange(len(fields))
+            fields[k] = fields[k].split(":")[0] + ":ERR"
+        elif r < 0.10:
+            fields.append("rssi:-87")
+        elif r < 0.11:
+            fields = ["#boot ok"]
+        lines.append(",".join(fields))
+    return lines
+
+
+def medir(fn, lines: List[str], rondas: int) -> float:
+    """Mejor tiempo (s) de `rondas` pasadas sobre el corpus."""
+    best = float("inf")
+    for _ in range(rondas):
+        t0 = time.perf_counter()
+        for line in lines:
+            fn(line, 0.0)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    p.add_argument("corpus", nargs="?", help="archivo de texto con líneas LoRa capturadas")
+    p.add_argument("--lineas", type=int, default=200_000, help="tamaño del corpus sintético")
+    p.add_argument("--rondas", type=int, default=3)
+    args = p.parse_args(argv)
+
+    if args.corpus:
+        with open(args.corpus, encoding="utf-8", errors="ignore") as f:
+            lines = [ln.strip() for ln in f if ln.strip()]
+        origen = args.corpus
+    else:
+        lines = corpus_sintetico(args.lineas)
+        origen = "sintético"
+
+    # Ambos parsers deben dar exactamente las mismas muestras
+    for line in lines[:20_000]:
+        a, b = parse_anterior(line), parse_lora_line(line)
+        if a != b:
+            print(f"Diferencia en {line!r}:\n  {a}\n  {b}", file=sys.stderr)
+            return 1
+
+    print(f"Corpus {origen}: {len(lines)} líneas, mejor de {args.rondas} rondas")
+    base = medir(parse_anterior, lines, args.rondas)
+    nuevo = medir(parse_lora_line, lines, args.rondas)
+    print(f"  anterior         : {len(lines) / base:12,.0f} líneas/s")
+    print(f"  parse_lora_line  : {len(lines) / nuevo:12,.0f} líneas/s  ({base / nuevo:.2f}×)")
+
+    # Mismas muestras como tramas binarias
+    keys = {field: key for key, field in LORA_KEYS.items()}
+    frames = [encode_frame({keys[k]: v for k, v in parse_lora_fields(ln).items()})
+              for ln in lines]
+    stream = b"".join(frames)
+    text_bytes = sum(len(ln) + 1 for ln in lines)
+    best = float("inf")
+    for _ in range(args.rondas):
+        dec = LoRaStreamDecoder(LORA_KEYS)
+        t0 = time.perf_counter()
+        for i in range(0, len(stream), 4096):
+            dec.feed(stream[i:i + 4096])
+        best = min(best, time.perf_counter() - t0)
+    print(f"  trama binaria    : {len(frames) / best:12,.0f} tramas/s (solo decodificar)")
+    print(f"  bytes por muestra: texto {text_bytes / len(lines):.1f}, "
+          f"binario {len(stream) / len(frames):.1f} "
+          f"({text_bytes / len(stream):.1f}× más muestras por enlace)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+Decimación de series para graficar sin perder picos.
+
+En lugar de tomar una de cada `step` muestras (que puede saltarse una caída
+de voltaje o un pico de altitud), se divide la serie en cubetas, idealmente
+una por pixel horizontal de la gráfica, y de cada cubeta se conservan el
+mínimo y el máximo en su orden temporal. El resultado tiene como mucho
+2 puntos por cubeta: el costo de dibujo queda acotado por el ancho en
+pixeles y no por el largo del buffer.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Índices (ordenados) de los mínimos y máximos de cada cubeta de `y`.
+    Siempre incluye la primera y la última muestra.
+    """
+    y = np.asarray(y)
+    n = len(y)
+    n_buckets = max(1, int(n_buckets))
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)          # ceil(n / n_buckets)
+    n_full = (n // size) * size
+    body = y[:n_full].reshape(-1, size)
+    offsets = np.arange(0, n_full, size)
+    i_min = body.argmin(axis=1) + offsets
+    i_max = body.argmax(axis=1) + offsets
+    parts = [i_min, i_max]
+
+    if n_full < n:
+        tail = y[n_full:]
+        parts.append(np.array([n_full + tail.argmin(), n_full + tail.argmax()]))
+
+    parts.append(np.array([0, n - 1]))
+    return np.unique(np.concatenate(parts))
+
+
+def minmax_decimate(x: np.ndarray, y: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decima (x, y) conservando mínimo y máximo de cada cubeta.
+    Si la serie ya cabe (<= 2 puntos por cubeta) devuelve las mismas vistas.
+    """
+    if len(y) <= 2 * max(1, int(n_buckets)):
+        return x, y
+    idx = minmax_indices(y, n_buckets)
+    return x[idx], y[idx]
+
+
+def buckets_for_width(width_px: float, max_points: int = 0) -> int:
+    """
+    Número de cubetas para una gráfica de `width_px` pixeles de ancho.
+    `max_points` (> 0) limita además el total de puntos dibujados.
+    """
+    buckets = max(1, int(width_px))
+    if max_points and max_points > 0:
+        buckets = min(buckets, max(1, int(max_points) // 2))
+    return buckets
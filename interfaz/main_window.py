@@ -1,10 +1,8 @@
 import asyncio
-import csv
-import sqlite3
 import random
 import os
+import threading
 import time
-from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Tuple
@@ -55,16 +53,36 @@ from PySide6.QtWidgets import (
     QCheckBox,
     QSpinBox,
     QDoubleSpinBox,
+    QProgressDialog,
+    QSlider,
 )
 
+import numpy as np
 import pyqtgraph as pg
 
 # IMPORTAR BACKEND REAL DEL PROYECTO
 from telemetria.telemetria import (
+    TelemetryBatch,
     TelemetrySample,
     BackendTelemetria,
     LoRaBackend,
 )
+from telemetria.historial import HistorialDB, QUERY_COLUMNS
+from telemetria.bitacora import FlightLogReader
+from telemetria.replay import REPLAY_SPEEDS, ReplayBackend
+from telemetria.sintetico import PATTERNS, SyntheticBackend
+from telemetria.exportar import (
+    EXPORT_FORMATS,
+    ExportCancelled,
+    available_formats,
+    format_for_path,
+    write_columnar,
+    write_csv,
+)
+from interfaz.decimacion import buckets_for_width, minmax_decimate
+from interfaz.piramide import SeriesPyramid
+from interfaz.mapa import TrajectoryLayer
+from interfaz.vehiculos import VEHICLE_COLORS, Vehicle, VehicleRegistry
 
 # ----------------------------------------------------------------------
 # CONFIGURACIÓN DE TEMAS (paleta negro / naranja del equipo)
@@ -914,133 +932,6 @@ class AttitudeIndicator(QWidget):
         p.end()
 
 
-# ----------------------------------------------------------------------
-# MANEJO DE BASE DE DATOS PARA HISTORIAL
-# ----------------------------------------------------------------------
-
-
-class HistorialDB:
-    """
-    Encapsula el acceso a SQLite para guardar y leer historial de telemetría.
-    Esta base de datos es propia de la interfaz (independiente del backend).
-    """
-
-    def __init__(self, db_path: Path):
-        self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self._conn.execute("PRAGMA journal_mode=WAL;")
-        self._conn.execute(
-            """
-        CREATE TABLE IF NOT EXISTS samples (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            created_iso TEXT,
-            fuente TEXT,
-            raw_line TEXT,
-            t_s REAL,
-            lat REAL,
-            lon REAL,
-            alt_msl REAL,
-            alt_rel REAL,
-            roll REAL,
-            pitch REAL,
-            yaw REAL,
-            vn REAL,
-            ve REAL,
-            vd REAL,
-            v REAL,
-            vbat REAL,
-            bat_pct REAL,
-            modo TEXT,
-            en_aire INTEGER,
-            gps_fix INTEGER,
-            sats INTEGER,
-            temp REAL,
-            hum REAL,
-            pres REAL,
-            rad REAL,
-            acc REAL
-        );
-        """
-        )
-        self._buf: List[Tuple] = []
-
-    def append(self, fuente: str, s: TelemetrySample):
-        """Añade un nuevo registro al buffer de escritura."""
-        row = (
-            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
-            fuente,
-            getattr(s, "raw_line", "") or "",
-            getattr(s, "time_s", 0.0) or 0.0,
-            getattr(s, "lat_deg", None),
-            getattr(s, "lon_deg", None),
-            getattr(s, "abs_alt_m", None),
-            getattr(s, "rel_alt_m", None),
-            getattr(s, "roll_deg", None),
-            getattr(s, "pitch_deg", None),
-            getattr(s, "yaw_deg", None),
-            getattr(s, "vx_ms", None),
-            getattr(s, "vy_ms", None),
-            getattr(s, "vz_ms", None),
-            getattr(s, "groundspeed_ms", None),
-            getattr(s, "voltage_v", None),
-            getattr(s, "battery_percent", None),
-            getattr(s, "flight_mode", None),
-            int(bool(getattr(s, "in_air", False))),
-            getattr(s, "gps_fix_type", None),
-            getattr(s, "num_sat", None),
-            getattr(s, "temp_c", None),
-            getattr(s, "hum_pct", None),
-            getattr(s, "pres_hpa", None),
-            getattr(s, "rad_mwcm2", None),
-            getattr(s, "acc_ms2", None),
-        )
-        self._buf.append(row)
-
-    def flush(self):
-        """Escribe en disco todos los registros pendientes en el buffer."""
-        if not self._buf:
-            return
-        self._conn.executemany(
-            """
-            INSERT INTO samples (
-                created_iso, fuente, raw_line, t_s, lat, lon, alt_msl, alt_rel,
-                roll, pitch, yaw, vn, ve, vd, v, vbat, bat_pct, modo, en_aire,
-                gps_fix, sats, temp, hum, pres, rad, acc
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            self._buf,
-        )
-        self._conn.commit()
-        self._buf.clear()
-
-    def get_all(self):
-        """Devuelve todas las filas de la tabla (para exportar)."""
-        cur = self._conn.execute("SELECT * FROM samples ORDER BY id ASC")
-        cols = [d[0] for d in cur.description]
-        return cols, cur.fetchall()
-
-    def get_latest(self, limit: int = 50):
-        """Devuelve las últimas `limit` filas (para vista rápida)."""
-        cur = self._conn.execute(
-            "SELECT * FROM samples ORDER BY id DESC LIMIT ?", (limit,)
-        )
-        cols = [d[0] for d in cur.description]
-        return cols, cur.fetchall()
-
-    def clear(self):
-        """Elimina todo el historial."""
-        self._conn.execute("DELETE FROM samples")
-        self._conn.commit()
-        self._conn.execute("VACUUM")
-        self._conn.commit()
-
-    def close(self):
-        """Cierra la conexión de forma segura."""
-        self.flush()
-        self._conn.close()
-
-
 # ----------------------------------------------------------------------
 # DIÁLOGOS AUXILIARES (detalle de métrica, detalle de telemetría)
 # ----------------------------------------------------------------------
@@ -1050,16 +941,24 @@ class MetricDetailDialog(QDialog):
     """
     Diálogo que muestra una gráfica ampliada de una métrica específica
     junto con una tabla de sus valores recientes desde la base de datos.
+    Si el vuelo no cabe crudo en el presupuesto de puntos y hay pirámide
+    de agregados, la gráfica cubre el vuelo completo desde ella.
     """
 
+    PLOT_BUDGET = 2000   # puntos crudos como máximo en la gráfica
+    TABLE_ROWS = 500
+
     def __init__(self, parent, db: HistorialDB, theme: str,
-                 title: str, db_column: str, unit: str, color: str):
+                 title: str, db_column: str, unit: str, color: str,
+                 pyramid: Optional[SeriesPyramid] = None, metric_key: Optional[str] = None):
         super().__init__(parent)
         self.db = db
         self.db_column = db_column
         self.unit = unit
         self.color = color
         self.theme = theme
+        self.pyramid = pyramid
+        self.metric_key = metric_key
 
         self.setWindowTitle(title)
         self.resize(900, 600)
@@ -1076,6 +975,10 @@ class MetricDetailDialog(QDialog):
         self.plot = pg.PlotWidget()
         self.plot.showGrid(x=True, y=True, alpha=0.15)
         self.plot.setBackground(THEMES[self.theme]["graph_bg"])
+        # Envolvente mín/máx (vuelo completo desde la pirámide) + curva
+        env_color = QColor(self.color)
+        env_color.setAlpha(90)
+        self.curve_env = self.plot.plot(pen=pg.mkPen(env_color, width=1))
         self.curve = self.plot.plot(
             pen=pg.mkPen(self.color, width=2)
         )
@@ -1093,25 +996,38 @@ class MetricDetailDialog(QDialog):
 
     def _reload_from_db(self):
         """Lee las últimas muestras desde la BD y actualiza gráfica + tabla."""
-        cols, rows = self.db.get_latest(500)
-        if "t_s" not in cols or self.db_column not in cols:
+        # Solo las dos columnas necesarias, no la fila completa
+        try:
+            _, rows = self.db.query(
+                ("t_s", self.db_column), limit=self.PLOT_BUDGET, newest_first=True
+            )
+        except ValueError:
             return
-        i_ts = cols.index("t_s")
-        i_val = cols.index(self.db_column)
 
         times = []
         vals = []
         data_rows = []
-        for row in reversed(rows):  # más antiguo primero
-            t = row[i_ts]
-            v = row[i_val]
+        for t, v in reversed(rows):  # más antiguo primero
             if v is None:
                 continue
             times.append(t)
             vals.append(v)
             data_rows.append((t, v))
+        data_rows = data_rows[-self.TABLE_ROWS:]
 
-        self.curve.setData(times, vals)
+        # Como en _update_graphs: crudo si las filas leídas cubren el vuelo;
+        # si no, vuelo completo desde los agregados precalculados.
+        raw_covers = (
+            self.pyramid is None or not self.metric_key
+            or self.pyramid.total <= len(rows)
+        )
+        if raw_covers:
+            self.curve_env.clear()
+            self.curve.setData(times, vals)
+        else:
+            budget = self.PLOT_BUDGET
+            self.curve_env.setData(*self.pyramid.envelope(self.metric_key, budget))
+            self.curve.setData(*self.pyramid.means(self.metric_key, budget))
 
         self.table.setRowCount(len(data_rows))
         self.table.setColumnCount(2)
@@ -1121,6 +1037,255 @@ class MetricDetailDialog(QDialog):
             self.table.setItem(r, 1, QTableWidgetItem(f"{v:.3f}"))
 
 
+class ExportDialog(QDialog):
+    """
+    Opciones de exportación del historial: columnas a incluir y, si se
+    activa, rango de tiempo (t_s) a exportar.
+    """
+
+    def __init__(self, parent, columns):
+        super().__init__(parent)
+        self.setWindowTitle("Exportar historial")
+        self.resize(560, 420)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+
+        lbl_cols = QLabel("Columnas")
+        lbl_cols.setProperty("role", "subtitle")
+        layout.addWidget(lbl_cols)
+
+        grid = QGridLayout()
+        self.col_checks = []
+        for i, col in enumerate(columns):
+            chk = QCheckBox(col)
+            chk.setChecked(True)
+            self.col_checks.append(chk)
+            grid.addWidget(chk, i // 4, i % 4)
+        layout.addLayout(grid)
+
+        row_time = QHBoxLayout()
+        self.chk_time = QCheckBox("Solo rango de tiempo t_s [s]:")
+        self.spin_t_from = QDoubleSpinBox()
+        self.spin_t_to = QDoubleSpinBox()
+        for spin in (self.spin_t_from, self.spin_t_to):
+            spin.setRange(0.0, 1e9)
+            spin.setDecimals(1)
+            spin.setEnabled(False)
+        self.spin_t_to.setValue(3600.0)
+        self.chk_time.toggled.connect(self.spin_t_from.setEnabled)
+        self.chk_time.toggled.connect(self.spin_t_to.setEnabled)
+        row_time.addWidget(self.chk_time)
+        row_time.addWidget(self.spin_t_from)
+        row_time.addWidget(QLabel("a"))
+        row_time.addWidget(self.spin_t_to)
+        row_time.addStretch()
+        layout.addLayout(row_time)
+
+        layout.addStretch()
+        row_btn = QHBoxLayout()
+        row_btn.addStretch()
+        btn_cancel = QPushButton("Cancelar")
+        btn_cancel.setProperty("action", "secondary")
+        btn_cancel.clicked.connect(self.reject)
+        btn_ok = QPushButton("Exportar")
+        btn_ok.setProperty("action", "primary")
+        btn_ok.clicked.connect(self.accept)
+        row_btn.addWidget(btn_cancel)
+        row_btn.addWidget(btn_ok)
+        layout.addLayout(row_btn)
+
+    def selected_columns(self) -> List[str]:
+        return [chk.text() for chk in self.col_checks if chk.isChecked()]
+
+    def time_range(self) -> Tuple[Optional[float], Optional[float]]:
+        if not self.chk_time.isChecked():
+            return None, None
+        return self.spin_t_from.value(), self.spin_t_to.value()
+
+
+class FlightReviewDialog(QDialog):
+    """
+    Revisión de un vuelo grabado (bitácora binaria mapeada en memoria).
+    El deslizador salta a cualquier instante: HUD, mapa y gráfica se
+    actualizan con búsqueda binaria sobre el índice de tiempo, sin leer
+    el vuelo completo.
+    """
+
+    GRAPH_FIELDS = (
+        ("rel_alt_m", "Altitud [m]"),
+        ("groundspeed_ms", "Velocidad [m/s]"),
+        ("voltage_v", "Batería [V]"),
+        ("temp_c", "Temperatura [°C]"),
+        ("pres_hpa", "Presión [hPa]"),
+        ("hum_pct", "Humedad [%]"),
+    )
+    WINDOWS = (("Vuelo completo", 0.0), ("±30 s", 30.0), ("±5 min", 300.0))
+    SLIDER_STEPS = 10_000
+
+    def __init__(self, parent, reader: FlightLogReader, theme: str, title: str):
+        super().__init__(parent)
+        self.reader = reader
+        self.theme = theme
+        self.t0, self.t1 = reader.t_range
+        self.t_now = self.t0
+
+        self.setWindowTitle(title)
+        self.resize(1100, 760)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+
+        header = QHBoxLayout()
+        lbl_title = QLabel(title)
+        lbl_title.setProperty("role", "title")
+        header.addWidget(lbl_title)
+        header.addStretch()
+        self.lbl_info = QLabel(f"{len(reader)} muestras • {reader.fuente}")
+        self.lbl_info.setProperty("role", "unit")
+        header.addWidget(self.lbl_info)
+        layout.addLayout(header)
+
+        # HUD + valores + mapa
+        top = QHBoxLayout()
+        self.att = AttitudeIndicator(theme=theme)
+        top.addWidget(self.att, 1)
+        self.lbl_values = QLabel("--")
+        self.lbl_values.setProperty("role", "unit")
+        self.lbl_values.setAlignment(Qt.AlignLeft | Qt.AlignTop)
+        top.addWidget(self.lbl_values, 1)
+
+        self.map_plot = pg.PlotWidget()
+        self.map_plot.showGrid(x=True, y=True, alpha=0.15)
+        self.map_plot.setBackground(THEMES[theme]["graph_bg"])
+        self.map_plot.setAspectLocked(True)
+        self.map_plot.disableAutoRange()
+        self.track = TrajectoryLayer(max_points=2000)
+        self.track.attach(self.map_plot, pg.mkPen(THEMES[theme]["accent_color"], width=2))
+        self.map_marker = pg.ScatterPlotItem(
+            size=10, pen=pg.mkPen("w", width=1),
+            brush=pg.mkBrush(THEMES[theme]["accent_color"]), symbol="o",
+        )
+        self.map_plot.addItem(self.map_marker)
+        top.addWidget(self.map_plot, 2)
+        layout.addLayout(top, 3)
+
+        # Gráfica con cursor de tiempo
+        row_graph = QHBoxLayout()
+        self.combo_field = QComboBox()
+        for key, label in self.GRAPH_FIELDS:
+            self.combo_field.addItem(label, key)
+        self.combo_window = QComboBox()
+        for label, half in self.WINDOWS:
+            self.combo_window.addItem(label, half)
+        self.combo_field.currentIndexChanged.connect(self._update_graph)
+        self.combo_window.currentIndexChanged.connect(self._update_graph)
+        row_graph.addWidget(self.combo_field)
+        row_graph.addWidget(self.combo_window)
+        row_graph.addStretch()
+        layout.addLayout(row_graph)
+
+        self.plot = pg.PlotWidget()
+        self.plot.showGrid(x=True, y=True, alpha=0.15)
+        self.plot.setBackground(THEMES[theme]["graph_bg"])
+        self.curve = self.plot.plot(pen=pg.mkPen(THEMES[theme]["accent_color"], width=2))
+        self.cursor = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen("#FFD60A", width=1))
+        self.plot.addItem(self.cursor, ignoreBounds=True)
+        layout.addWidget(self.plot, 2)
+
+        # Navegación en el tiempo
+        row_nav = QHBoxLayout()
+        self.slider = QSlider(Qt.Horizontal)
+        self.slider.setRange(0, self.SLIDER_STEPS)
+        self.slider.valueChanged.connect(self._on_slider)
+        self.spin_t = QDoubleSpinBox()
+        self.spin_t.setRange(self.t0, max(self.t0, self.t1))
+        self.spin_t.setDecimals(1)
+        self.spin_t.setSuffix(" s")
+        self.spin_t.editingFinished.connect(lambda: self.jump_to(self.spin_t.value()))
+        row_nav.addWidget(self.slider, 1)
+        row_nav.addWidget(self.spin_t)
+        layout.addLayout(row_nav)
+
+        # Trayectoria completa (una sola vez, vectorizada)
+        _, lats = reader.window("lat_deg")
+        _, lons = reader.window("lon_deg")
+        ok = np.isfinite(lats) & np.isfinite(lons) & ~((lats == 0.0) & (lons == 0.0))
+        self.track.extend(lats[ok], lons[ok])
+        b = self.track.bounds
+        if b is not None:
+            self.map_plot.plotItem.vb.setRange(
+                xRange=(b[0] - 1e-6, b[1] + 1e-6), yRange=(b[2] - 1e-6, b[3] + 1e-6), padding=0.12
+            )
+        self.track.render()
+
+        self._update_graph()
+        if len(reader):
+            self.jump_to(self.t0)
+
+    def _on_slider(self, value: int):
+        span = self.t1 - self.t0
+        self.jump_to(self.t0 + span * value / self.SLIDER_STEPS, from_slider=True)
+
+    def jump_to(self, t: float, from_slider: bool = False):
+        """Muestra el estado del vuelo en el instante `t` (O(log n))."""
+        if not len(self.reader):
+            return
+        self.t_now = min(max(t, self.t0), self.t1)
+        s = self.reader.sample_at(self.t_now)
+
+        if not from_slider and self.t1 > self.t0:
+            pos = round((self.t_now - self.t0) / (self.t1 - self.t0) * self.SLIDER_STEPS)
+            self.slider.blockSignals(True)
+            self.slider.setValue(pos)
+            self.slider.blockSignals(False)
+        self.spin_t.blockSignals(True)
+        self.spin_t.setValue(self.t_now)
+        self.spin_t.blockSignals(False)
+
+        self.att.set_attitude(s.roll_deg or 0.0, s.pitch_deg or 0.0, yaw_deg=s.yaw_deg)
+
+        def fmt(v, spec):
+            return "--" if v is None else format(v, spec)
+        self.lbl_values.setText(
+            f"t = {fmt(s.time_s, '.1f')} s\n"
+            f"Modo: {s.flight_mode or '--'}  •  En aire: {'Sí' if s.in_air else 'No'}\n"
+            f"Alt: {fmt(s.rel_alt_m, '.1f')} m  •  Vel: {fmt(s.groundspeed_ms, '.1f')} m/s\n"
+            f"Batería: {fmt(s.voltage_v, '.2f')} V  ({fmt(s.battery_percent, '.0f')} %)\n"
+            f"Lat: {fmt(s.lat_deg, '.6f')}  Lon: {fmt(s.lon_deg, '.6f')}\n"
+            f"Temp: {fmt(s.temp_c, '.1f')} °C  •  Pres: {fmt(s.pres_hpa, '.1f')} hPa"
+        )
+
+        if s.lat_deg is not None and s.lon_deg is not None:
+            self.map_marker.setData(x=[s.lon_deg], y=[s.lat_deg])
+            self.track.ensure_visible(self.map_plot.plotItem.vb, s.lat_deg, s.lon_deg)
+
+        self.cursor.setPos(self.t_now)
+        if self.combo_window.currentData():
+            self._update_graph()
+
+    def _update_graph(self, *args):
+        """Curva de la métrica elegida (vuelo completo o ventana alrededor del cursor)."""
+        key = self.combo_field.currentData()
+        half = self.combo_window.currentData() or 0.0
+        if half > 0:
+            t_from, t_to = self.t_now - half, self.t_now + half
+        else:
+            t_from, t_to = None, None
+        t, v = self.reader.window(key, t_from, t_to)
+        ok = np.isfinite(v)
+        # Copias: la curva no debe retener vistas del archivo mapeado
+        t, v = np.array(t[ok]), np.array(v[ok])
+        buckets = buckets_for_width(self.plot.width() or 800)
+        self.curve.setData(*minmax_decimate(t, v, buckets))
+        if half > 0:
+            self.plot.setXRange(t_from, t_to, padding=0)
+        else:
+            self.plot.enableAutoRange(x=True)
+
+
 class TelemetryDetailDialog(QDialog):
     """
     Diálogo que muestra el resumen detallado de una muestra de telemetría
@@ -1254,9 +1419,85 @@ class TelemetryDetailDialog(QDialog):
 # ----------------------------------------------------------------------
 
 
-class TelemetrySignals(QObject):
-    """Objeto de señales Qt para propagar muestras de telemetría al hilo de UI."""
-    sample = Signal(object)
+class ExportSignals(QObject):
+    """Señales del hilo de exportación hacia la UI."""
+    progress = Signal(int, int)          # filas escritas, total
+    finished = Signal(int, str, str)     # filas (-1 si no terminó), ruta, error
+
+
+class DashboardViewModel:
+    """
+    Capa de vista-modelo del dashboard con seguimiento de cambios.
+    Recuerda el último texto, estilo y valor aplicados a cada widget y solo
+    toca el widget cuando algo cambia visiblemente (evita re-polish de Qt).
+    Lleva contadores de actualizaciones aplicadas / omitidas.
+    """
+
+    def __init__(self):
+        self._text = {}
+        self._style = {}
+        self._value = {}
+        self.applied = 0
+        self.skipped = 0
+
+    def set_text(self, widget, text: str) -> bool:
+        """Aplica setText solo si el texto cambió."""
+        if self._text.get(widget) == text:
+            self.skipped += 1
+            return False
+        self._text[widget] = text
+        widget.setText(text)
+        self.applied += 1
+        return True
+
+    def set_style(self, widget, style: str) -> bool:
+        """Aplica setStyleSheet solo si el estilo cambió."""
+        if self._style.get(widget) == style:
+            self.skipped += 1
+            return False
+        self._style[widget] = style
+        widget.setStyleSheet(style)
+        self.applied += 1
+        return True
+
+    def set_value(self, widget, value, setter) -> bool:
+        """Llama setter(value) solo si el valor cambió (niveles, barras...)."""
+        if self._value.get(widget) == value:
+            self.skipped += 1
+            return False
+        self._value[widget] = value
+        setter(value)
+        self.applied += 1
+        return True
+
+    def invalidate(self, *widgets):
+        """
+        Olvida el estado recordado (de todos los widgets o de los indicados).
+        Se usa cuando otro código modifica el widget directamente
+        (cambio de tema, animaciones de conexión, etc.).
+        """
+        if not widgets:
+            self._text.clear()
+            self._style.clear()
+            self._value.clear()
+            return
+        for w in widgets:
+            self._text.pop(w, None)
+            self._style.pop(w, None)
+            self._value.pop(w, None)
+
+    def stats(self) -> dict:
+        """Devuelve contadores de actualizaciones aplicadas / omitidas."""
+        total = self.applied + self.skipped
+        return {
+            "applied": self.applied,
+            "skipped": self.skipped,
+            "skip_ratio": (self.skipped / total) if total else 0.0,
+        }
+
+    def reset_stats(self):
+        self.applied = 0
+        self.skipped = 0
 
 
 class MainWindow(QMainWindow):
@@ -1303,37 +1544,34 @@ class MainWindow(QMainWindow):
         self.save_dir.mkdir(exist_ok=True)
 
         # Parámetros de rendimiento / BD (ajustables desde Configuración)
-        self.db_commit_per_sample = True       # escribir en disco por muestra
-        self.db_timer_interval_ms = 1000       # flush periódico (ms)
+        self.db_commit_per_sample = True       # commit en cuanto llega cada lote
+        self.db_timer_interval_ms = 1000       # latencia máxima de commit (ms)
+        self.db_synchronous = "FULL"           # fsync en cada commit (ver HistorialDB)
+
+        # Base de datos local de historial (escritor en su propio hilo)
+        self.db = HistorialDB(
+            self.save_dir / "telemetria_ui.db",
+            max_latency_ms=self.db_timer_interval_ms,
+            synchronous=self.db_synchronous,
+        )
 
-        # Base de datos local de historial
-        self.db = HistorialDB(self.save_dir / "telemetria_ui.db")
-        self.db_timer = QTimer(self)
-        self.db_timer.timeout.connect(self.db.flush)
-        self.db_timer.start(self.db_timer_interval_ms)
+        # Vuelca las bitácoras binarias de los vuelos en curso
+        self.flight_log_timer = QTimer(self)
+        self.flight_log_timer.timeout.connect(self._flush_flight_log)
+        self.flight_log_timer.start(self.db_timer_interval_ms)
 
         self.last_export_path: Optional[str] = None
-
-        # Backend de telemetría
-        self.backend = None
-        self.backend_task = None
-        self.source_name = "DEMO"
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_progress: Optional[QProgressDialog] = None
 
         # Reconexión automática
         self.auto_reconnect_enabled = False
         self.reconnect_interval_s = 5.0
         self.reconnect_max_attempts = 3
-        self._last_endpoint: str = ""
-        self._reconnect_attempts = 0
-
-        # Buffers para gráficas
-        self.time_buf = deque(maxlen=600)
-        self.alt_buf = deque(maxlen=600)
-        self.spd_buf = deque(maxlen=600)
-        self.volt_buf = deque(maxlen=600)
-        self.temp_buf = deque(maxlen=600)
-        self.pres_buf = deque(maxlen=600)
-        self.hum_buf = deque(maxlen=600)
+
+        # Buffers para gráficas de cada vehículo: anillo NumPy preasignado
+        # (tiempo + métricas) y agregados mín/máx/media a 10x, 100x y 1000x
+        self.graph_buffer_points = 100_000
 
         # Habilitación individual de gráficas
         self.graph_enabled = {
@@ -1361,24 +1599,30 @@ class MainWindow(QMainWindow):
         self._map_profile_points = [400, 600, 800, 1000, 1500, 2000]
         self._db_profile_commit_flags = [True, True, False, False, False, False]
         self._db_profile_intervals = [500, 1000, 1000, 1500, 2000, 3000]
+        # Perfiles por muestra: fsync en cada commit; el resto, solo en checkpoints
+        self._db_profile_synchronous = ["FULL", "FULL", "NORMAL", "NORMAL", "NORMAL", "NORMAL"]
 
-        # Buffer para mapa (lat/lon)
-        self.map_positions: deque[Tuple[float, float]] = deque(maxlen=self.map_max_points)
-        self.map_home: Optional[Tuple[float, float]] = None
+        # Home y demás vehículos dibujados en el mapa (la trayectoria es de
+        # cada vehículo)
+        self._map_home_drawn: Optional[Tuple[float, float]] = None
+        self._fleet_drawn: Optional[tuple] = None
 
         self.graph_paused = False
         self.graph_smooth = False
 
-        # Tiempo de vuelo acumulado
-        self.flight_time_s = 0.0
-        self.last_time_s = None
+        # Suavizado incremental (media móvil / EMA / mediana)
+        self.graph_smooth_mode = "ma"
+        self.graph_smooth_window = 5
+
+        # Vehículos: cada uno con su backend, puente, buffers, trayectoria y
+        # partición del historial. El vehículo 1 escribe en self.db.
+        self.vehicles = VehicleRegistry()
+        self._add_vehicle()
 
         # Energía específica (para tendencia)
         self.prev_energy = None
         self.energy_trend = 0
 
-        self.last_sample: Optional[TelemetrySample] = None
-
         # Timestamps para controlar frecuencia de refresco de mapa y gráficas
         self._last_graph_update_ms = 0.0
         self._last_map_update_ms = 0.0
@@ -1415,8 +1659,15 @@ class MainWindow(QMainWindow):
         self.link_timeout_timer.setSingleShot(True)
         self.link_timeout_timer.timeout.connect(self._on_link_timeout)
 
-        self.signals = TelemetrySignals()
-        self.signals.sample.connect(self._handle_sample)
+        # Puente por lotes (uno por vehículo): el backend empuja muestras y
+        # la UI las drena en un tick de ~60 Hz (ver _drain_samples).
+        self.ui_frame_ms = 16
+        self.ui_tick_timer = QTimer(self)
+        self.ui_tick_timer.setTimerType(Qt.PreciseTimer)
+        self.ui_tick_timer.timeout.connect(self._drain_samples)
+
+        # Vista-modelo del dashboard (solo toca widgets cuando algo cambia)
+        self.dash_vm = DashboardViewModel()
 
         # Animación de “Conectando...”
         self.connect_anim_timer = QTimer(self)
@@ -1443,6 +1694,9 @@ class MainWindow(QMainWindow):
         # Inicializar controles de rendimiento (perfiles) con valores intermedios
         self._init_performance_controls()
 
+        # Tick de UI que drena el puente de muestras
+        self.ui_tick_timer.start(self.ui_frame_ms)
+
         self.statusBar().hide()
 
     # ------------------------------------------------------------------
@@ -1494,6 +1748,13 @@ class MainWindow(QMainWindow):
         sbl.addLayout(logo_column)
         sbl.addSpacing(20)
 
+        # Vehículo que muestran dashboard, gráficas y HUD
+        self.combo_vehicle = QComboBox()
+        self.combo_vehicle.setToolTip("Vehículo mostrado (el mapa muestra todos)")
+        self.combo_vehicle.currentIndexChanged.connect(self._on_vehicle_selected)
+        sbl.addWidget(self.combo_vehicle)
+        self._refresh_vehicle_combo()
+
         # Botones de navegación
         self.btn_dash = self._nav_button("Dashboard")
         self.btn_map = self._nav_button("Mapa")
@@ -1582,12 +1843,12 @@ class MainWindow(QMainWindow):
         elif idx == 2:
             # Al entrar a gráficas, refrescar una vez con todos los datos acumulados
             self._update_graphs()
-        elif idx == 1 and self.last_sample is not None:
+        elif idx == 1 and self.vehicle.last_sample is not None:
             # Al entrar al mapa, refrescar una vez con la última muestra
-            lat = getattr(self.last_sample, "lat_deg", 0.0) or 0.0
-            lon = getattr(self.last_sample, "lon_deg", 0.0) or 0.0
-            alt = getattr(self.last_sample, "rel_alt_m", 0.0) or 0.0
-            spd = getattr(self.last_sample, "groundspeed_ms", 0.0) or 0.0
+            lat = getattr(self.vehicle.last_sample, "lat_deg", 0.0) or 0.0
+            lon = getattr(self.vehicle.last_sample, "lon_deg", 0.0) or 0.0
+            alt = getattr(self.vehicle.last_sample, "rel_alt_m", 0.0) or 0.0
+            spd = getattr(self.vehicle.last_sample, "groundspeed_ms", 0.0) or 0.0
             self._update_map(lat, lon, alt, spd)
 
     # ------------------------------------------------------------------
@@ -1850,12 +2111,13 @@ class MainWindow(QMainWindow):
         self.map_plot.setLabel("left", "Latitud [deg]")
         self.map_plot.setLabel("bottom", "Longitud [deg]")
         self.map_plot.setMouseEnabled(x=True, y=True)
-        self.map_plot.enableAutoRange(x=True, y=True)
+        # El encuadre lo decide la trayectoria (solo si el UAV sale de la vista)
+        self.map_plot.disableAutoRange()
 
-        # Curva de trayectoria
-        self.map_curve = self.map_plot.plot(
-            pen=pg.mkPen(THEMES[self.current_theme]["accent_color"], width=2)
-        )
+        # Curvas de trayectoria de cada vehículo (una curva por bloque, ver
+        # interfaz/mapa.py)
+        for vehicle in self.vehicles:
+            vehicle.map_track.attach(self.map_plot, self._vehicle_pen(vehicle))
         # Punto UAV actual
         self.map_uav_spot = pg.ScatterPlotItem(
             size=10,
@@ -1874,6 +2136,10 @@ class MainWindow(QMainWindow):
         )
         self.map_plot.addItem(self.map_home_spot)
 
+        # Posición actual de los demás vehículos (un solo item para todos)
+        self.map_fleet_spot = pg.ScatterPlotItem(size=9, pen=pg.mkPen("w", width=1), symbol="t")
+        self.map_plot.addItem(self.map_fleet_spot)
+
         # Crosshair
         self.map_crosshair_v = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen("#444", width=1))
         self.map_crosshair_h = pg.InfiniteLine(angle=0, movable=False, pen=pg.mkPen("#444", width=1))
@@ -1928,8 +2194,23 @@ class MainWindow(QMainWindow):
         self.btn_smooth_graphs.setCheckable(True)
         self.btn_smooth_graphs.clicked.connect(self._toggle_graph_smooth)
 
+        # Filtro y ventana de suavizado
+        self.combo_smooth_mode = QComboBox()
+        self.combo_smooth_mode.addItem("Media móvil", "ma")
+        self.combo_smooth_mode.addItem("EMA", "ema")
+        self.combo_smooth_mode.addItem("Mediana", "median")
+        self.combo_smooth_mode.currentIndexChanged.connect(self._on_smooth_params_changed)
+
+        self.spin_smooth_window = QSpinBox()
+        self.spin_smooth_window.setRange(2, 500)
+        self.spin_smooth_window.setValue(self.graph_smooth_window)
+        self.spin_smooth_window.setSuffix(" muestras")
+        self.spin_smooth_window.valueChanged.connect(self._on_smooth_params_changed)
+
         header.addWidget(self.btn_pause_graphs)
         header.addWidget(self.btn_smooth_graphs)
+        header.addWidget(self.combo_smooth_mode)
+        header.addWidget(self.spin_smooth_window)
         layout.addLayout(header)
 
         grid = QGridLayout()
@@ -2003,7 +2284,7 @@ class MainWindow(QMainWindow):
 
             btn_expand.clicked.connect(
                 lambda _, col=db_column, u=unit, ttl=title_text, k=key: self._open_metric_detail(
-                    ttl, col, u, self.metric_colors[k]
+                    ttl, col, u, self.metric_colors[k], k
                 )
             )
 
@@ -2070,19 +2351,44 @@ class MainWindow(QMainWindow):
 
         return page
 
-    def _open_metric_detail(self, title: str, db_column: str, unit: str, color: str):
+    def _open_metric_detail(self, title: str, db_column: str, unit: str, color: str,
+                            key: Optional[str] = None):
         """Abre el diálogo de detalle para una métrica específica."""
-        dlg = MetricDetailDialog(self, self.db, self.current_theme, title, db_column, unit, color)
+        dlg = MetricDetailDialog(
+            self, self.vehicle.db, self.current_theme, title, db_column, unit, color,
+            pyramid=self.vehicle.graph_pyramid, metric_key=key,
+        )
         dlg.exec()
 
     def _toggle_graph_pause(self):
         """Activa o desactiva la pausa de actualización de gráficas."""
         self.graph_paused = self.btn_pause_graphs.isChecked()
         self.btn_pause_graphs.setText("Reanudar" if self.graph_paused else "Pausar")
+        if self.graph_paused:
+            # Las curvas pueden apuntar a vistas del anillo, que sigue
+            # escribiéndose: se congelan con una copia propia.
+            for _, _, curve in self._graph_curves():
+                xd, yd = curve.getData()
+                if xd is not None and yd is not None:
+                    curve.setData(np.array(xd), np.array(yd))
 
     def _toggle_graph_smooth(self):
-        """Activa o desactiva el suavizado (promedio móvil) de las gráficas."""
+        """Activa o desactiva el suavizado de las gráficas."""
         self.graph_smooth = self.btn_smooth_graphs.isChecked()
+        if self.graph_smooth:
+            # Mientras está apagado no se alimenta: se recalcula una vez aquí
+            self.vehicle.graph_smoother.rebuild(self.vehicle.graph_series)
+        self._update_graphs()
+
+    def _on_smooth_params_changed(self, *_):
+        """Cambia filtro / ventana de suavizado y recalcula la serie suavizada."""
+        self.graph_smooth_mode = self.combo_smooth_mode.currentData() or "ma"
+        self.graph_smooth_window = int(self.spin_smooth_window.value())
+        for vehicle in self.vehicles:
+            vehicle.graph_smoother.configure(self.graph_smooth_mode, self.graph_smooth_window)
+        if self.graph_smooth:
+            self.vehicle.graph_smoother.rebuild(self.vehicle.graph_series)
+            self._update_graphs()
 
     # ------------------------------------------------------------------
     # PÁGINA: HISTORIAL
@@ -2091,8 +2397,9 @@ class MainWindow(QMainWindow):
     def _build_page_history(self) -> QWidget:
         """
         Construye la página de historial:
+        - Selector de vuelo (cada conexión es un vuelo con su archivo).
         - Tabla con últimas muestras.
-        - Botones para exportar CSV, abrir CSV, ver detalle y borrar todo.
+        - Botones para exportar CSV, abrir CSV, ver detalle y borrar.
         """
         page = QWidget()
         layout = QVBoxLayout(page)
@@ -2105,6 +2412,11 @@ class MainWindow(QMainWindow):
         header.addWidget(title)
         header.addStretch()
 
+        self.combo_flight = QComboBox()
+        self.combo_flight.setMinimumWidth(260)
+        self.combo_flight.currentIndexChanged.connect(self._on_flight_selected)
+        header.addWidget(self.combo_flight)
+
         btn_detail = QPushButton("Detalles (última muestra)")
         btn_detail.setProperty("action", "secondary")
         btn_detail.clicked.connect(self._open_telemetry_detail)
@@ -2117,6 +2429,14 @@ class MainWindow(QMainWindow):
         btn_open_csv.setProperty("action", "secondary")
         btn_open_csv.clicked.connect(self._open_last_csv)
 
+        btn_review = QPushButton("Revisar vuelo")
+        btn_review.setProperty("action", "secondary")
+        btn_review.clicked.connect(self._open_flight_review)
+
+        btn_drop_flight = QPushButton("Eliminar vuelo")
+        btn_drop_flight.setProperty("action", "danger")
+        btn_drop_flight.clicked.connect(self._drop_selected_flight)
+
         btn_clear = QPushButton("Eliminar todo")
         btn_clear.setProperty("action", "danger")
         btn_clear.clicked.connect(self._clear_history)
@@ -2124,6 +2444,8 @@ class MainWindow(QMainWindow):
         header.addWidget(btn_detail)
         header.addWidget(btn_export)
         header.addWidget(btn_open_csv)
+        header.addWidget(btn_review)
+        header.addWidget(btn_drop_flight)
         header.addWidget(btn_clear)
 
         layout.addLayout(header)
@@ -2138,9 +2460,44 @@ class MainWindow(QMainWindow):
 
         return page
 
-    def _reload_history_table(self):
-        """Recarga la tabla de historial con las últimas muestras."""
-        cols, rows = self.db.get_latest(200)
+    def _selected_flight(self) -> Optional[int]:
+        """Vuelo elegido en el historial (None = almacén actual)."""
+        if not hasattr(self, "combo_flight"):
+            return None
+        return self.combo_flight.currentData()
+
+    def _refresh_flight_combo(self):
+        """Rellena el selector de vuelos desde el catálogo."""
+        selected = self._selected_flight()
+        self.combo_flight.blockSignals(True)
+        self.combo_flight.clear()
+        self.combo_flight.addItem("Vuelo actual", None)
+        _, rows = self.db.flights()
+        for flight_id, inicio, _fin, fuente, _archivo, archivado, vehiculo in rows:
+            if flight_id == self.db.current_flight:
+                continue
+            label = f"Vuelo {flight_id} • {inicio} • {fuente}"
+            if vehiculo:
+                label += f" • {vehiculo}"
+            if archivado:
+                label += " (archivado)"
+            self.combo_flight.addItem(label, flight_id)
+        idx = self.combo_flight.findData(selected)
+        self.combo_flight.setCurrentIndex(max(0, idx))
+        self.combo_flight.blockSignals(False)
+
+    def _on_flight_selected(self, _idx: int):
+        self._reload_history_table(refresh_flights=False)
+
+    def _reload_history_table(self, refresh_flights: bool = True):
+        """Recarga la tabla de historial con las últimas muestras del vuelo elegido."""
+        if refresh_flights:
+            self._refresh_flight_combo()
+        try:
+            cols, rows = self.db.get_latest(200, flight=self._selected_flight())
+        except Exception as e:
+            QMessageBox.warning(self, "Historial", str(e))
+            return
         self.table_history.setRowCount(len(rows))
         self.table_history.setColumnCount(len(cols))
         self.table_history.setHorizontalHeaderLabels(cols)
@@ -2151,22 +2508,104 @@ class MainWindow(QMainWindow):
                 self.table_history.setItem(r, c, item)
 
     def _export_history(self):
-        """Exporta el historial completo a un archivo CSV."""
-        path, _ = QFileDialog.getSaveFileName(
-            self, "Guardar historial como CSV", str(self.save_dir / "telemetria_ui.csv"), "CSV (*.csv)"
+        """
+        Exporta el historial del vuelo elegido (CSV, Parquet, Arrow o NPZ)
+        en un hilo de trabajo: lectura por bloques, barra de progreso y
+        opción de cancelar.
+        """
+        if self._export_thread is not None and self._export_thread.is_alive():
+            QMessageBox.information(self, "Exportando", "Ya hay una exportación en curso.")
+            return
+
+        dlg = ExportDialog(self, QUERY_COLUMNS)
+        if dlg.exec() != QDialog.Accepted:
+            return
+        cols = dlg.selected_columns()
+        if not cols:
+            QMessageBox.information(self, "Exportar", "Elige al menos una columna.")
+            return
+        t_from, t_to = dlg.time_range()
+
+        filters = {
+            "csv": "CSV (*.csv)",
+            "parquet": "Parquet (*.parquet)",
+            "arrow": "Arrow IPC (*.arrow)",
+            "npz": "NumPy (*.npz)",
+        }
+        formats = available_formats()
+        path, selected = QFileDialog.getSaveFileName(
+            self, "Exportar historial", str(self.save_dir / "telemetria_ui.csv"),
+            ";;".join(filters[f] for f in formats),
         )
         if not path:
             return
-        cols, rows = self.db.get_all()
+        fmt = format_for_path(path)
+        if Path(path).suffix.lower() not in EXPORT_FORMATS:
+            # Sin extensión reconocida: usar el filtro elegido
+            fmt = next((f for f in formats if filters[f] == selected), "csv")
+            path += next(ext for ext, f in EXPORT_FORMATS.items() if f == fmt)
+        if fmt not in formats:
+            QMessageBox.warning(
+                self, "Exportar", "Parquet / Arrow requieren pyarrow; usa CSV o NPZ."
+            )
+            return
+
+        flight = self._selected_flight()
         try:
-            with open(path, "w", newline="", encoding="utf-8-sig") as f:
-                w = csv.writer(f)
-                w.writerow(cols)
-                w.writerows(rows)
-            self.last_export_path = path
-            QMessageBox.information(self, "Exportado", "Historial exportado correctamente.")
+            total = self.db.count(t_from, t_to, flight=flight)
+            chunks = self.db.iter_query(cols, t_from, t_to, flight=flight)
         except Exception as e:
             QMessageBox.critical(self, "Error", str(e))
+            return
+
+        self._export_cancel = threading.Event()
+        self._export_progress = QProgressDialog(
+            "Exportando historial…", "Cancelar", 0, max(1, total), self
+        )
+        self._export_progress.setWindowTitle("Exportar historial")
+        self._export_progress.setWindowModality(Qt.WindowModal)
+        self._export_progress.setMinimumDuration(300)
+        self._export_progress.canceled.connect(self._export_cancel.set)
+
+        self._export_signals = ExportSignals()
+        self._export_signals.progress.connect(self._on_export_progress)
+        self._export_signals.finished.connect(self._on_export_finished)
+
+        signals = self._export_signals
+        cancel = self._export_cancel
+
+        def _worker():
+            try:
+                report = lambda done, tot: signals.progress.emit(done, tot)
+                if fmt == "csv":
+                    n = write_csv(path, cols, chunks, total, report, cancel)
+                else:
+                    n = write_columnar(path, cols, chunks, fmt, total, report, cancel)
+                signals.finished.emit(n, path, "")
+            except ExportCancelled:
+                signals.finished.emit(-1, path, "")
+            except Exception as e:
+                signals.finished.emit(-1, path, str(e))
+
+        self._export_thread = threading.Thread(target=_worker, name="export-csv", daemon=True)
+        self._export_thread.start()
+
+    def _on_export_progress(self, done: int, total: int):
+        if self._export_progress is not None:
+            self._export_progress.setMaximum(max(1, total, done))
+            self._export_progress.setValue(done)
+
+    def _on_export_finished(self, rows: int, path: str, error: str):
+        if self._export_progress is not None:
+            self._export_progress.reset()
+            self._export_progress = None
+        if error:
+            QMessageBox.critical(self, "Error", error)
+        elif rows >= 0:
+            self.last_export_path = path
+            QMessageBox.information(
+                self, "Exportado", f"Historial exportado correctamente ({rows} filas)."
+            )
 
     def _open_last_csv(self):
         """Abre el último CSV exportado, si existe."""
@@ -2178,6 +2617,61 @@ class MainWindow(QMainWindow):
         except Exception:
             QMessageBox.information(self, "Ruta", self.last_export_path)
 
+    def _open_flight_review(self):
+        """Abre la bitácora del vuelo elegido para recorrerla en el tiempo."""
+        flight_id = self._selected_flight()
+        if flight_id is None:
+            flight_id = self.vehicle.db.current_flight
+            if self.vehicle.flight_log is not None:
+                self.vehicle.flight_log.flush()
+        path = None
+        if flight_id is not None:
+            path = self.db.flight_file(flight_id, ".bin")
+        if path is None or not path.exists():
+            QMessageBox.information(
+                self, "Revisar vuelo", "Este vuelo no tiene bitácora binaria grabada."
+            )
+            return
+        try:
+            reader = FlightLogReader(path)
+        except ValueError as e:
+            QMessageBox.warning(self, "Revisar vuelo", str(e))
+            return
+        dlg = FlightReviewDialog(self, reader, self.current_theme, f"Vuelo {flight_id}")
+        try:
+            dlg.exec()
+        finally:
+            # El diálogo no debe sobrevivir con el lector: el .bin queda
+            # libre para eliminar / archivar el vuelo
+            dlg.reader = None
+            dlg.deleteLater()
+            reader.close()
+
+    def _drop_selected_flight(self):
+        """Elimina el vuelo elegido (borra su archivo, sin tocar los demás)."""
+        flight_id = self._selected_flight()
+        if flight_id is None:
+            QMessageBox.information(
+                self, "Vuelo actual", "Elige un vuelo anterior para eliminarlo."
+            )
+            return
+        if flight_id in self.vehicles.active_flights():
+            QMessageBox.information(
+                self, "Vuelo en curso", "Ese vuelo lo está grabando otro vehículo."
+            )
+            return
+        if (
+            QMessageBox.question(self, "Confirmar", f"¿Eliminar el vuelo {flight_id}?")
+            == QMessageBox.Yes
+        ):
+            try:
+                self.db.drop_flight(flight_id)
+            except (TimeoutError, OSError) as e:
+                QMessageBox.warning(self, "Historial", f"No se pudo eliminar el vuelo:\n{e}")
+                return
+            self.combo_flight.setCurrentIndex(0)
+            self._reload_history_table()
+
     def _clear_history(self):
         """Elimina todo el contenido de la base de datos de historial."""
         if (
@@ -2186,12 +2680,17 @@ class MainWindow(QMainWindow):
             )
             == QMessageBox.Yes
         ):
-            self.db.clear()
+            # Los vuelos en curso de los demás vehículos se conservan; el del
+            # vehículo 1 (dueño de self.db) sigue en un archivo nuevo
+            try:
+                self.vehicles.primary.clear_history(keep=self.vehicles.active_flights())
+            except (TimeoutError, OSError) as e:
+                QMessageBox.warning(self, "Historial", f"No se pudo limpiar el historial:\n{e}")
             self._reload_history_table()
 
     def _open_telemetry_detail(self):
         """Abre el diálogo de detalle para la última muestra recibida."""
-        dlg = TelemetryDetailDialog(self, self.last_sample, self.current_theme)
+        dlg = TelemetryDetailDialog(self, self.vehicle.last_sample, self.current_theme)
         dlg.exec()
 
     # ------------------------------------------------------------------
@@ -2224,7 +2723,7 @@ class MainWindow(QMainWindow):
 
         form = QFormLayout()
         self.combo_source = QComboBox()
-        self.combo_source.addItems(["DEMO", "MAVSDK", "LoRa"])
+        self.combo_source.addItems(["DEMO", "MAVSDK", "LoRa", "Replay", "Sintético"])
         self.combo_source.currentTextChanged.connect(self._on_source_changed)
 
         self.edit_endpoint = QLineEdit("udp://:14540")
@@ -2232,10 +2731,26 @@ class MainWindow(QMainWindow):
         form.addRow("Endpoint / Puerto:", self.edit_endpoint)
         cl.addLayout(form)
 
+        # Vehículos: "Conectar" aplica al activo (selector de la barra lateral)
+        veh_row = QHBoxLayout()
+        btn_add_vehicle = QPushButton("Agregar vehículo")
+        btn_add_vehicle.setProperty("action", "secondary")
+        btn_add_vehicle.clicked.connect(self._on_add_vehicle_clicked)
+        btn_remove_vehicle = QPushButton("Quitar vehículo")
+        btn_remove_vehicle.setProperty("action", "secondary")
+        btn_remove_vehicle.clicked.connect(self._on_remove_vehicle_clicked)
+        veh_row.addWidget(btn_add_vehicle)
+        veh_row.addWidget(btn_remove_vehicle)
+        veh_row.addStretch()
+        cl.addLayout(veh_row)
+
         info = QLabel(
             "DEMO: genera datos sintéticos.\n"
             "MAVSDK: conéctate a SITL o dron real vía UDP.\n"
-            "LoRa: usa un puerto serie (ej. COM3) hacia el módulo LoRa."
+            "LoRa: usa un puerto serie (ej. COM3) hacia el módulo LoRa.\n"
+            "Replay: reproduce un vuelo grabado (.db, .csv o .bin).\n"
+            "Sintético: carga configurable (patrón, tasa, ruido, pérdidas).\n"
+            "Cada vehículo tiene su propio enlace; Conectar aplica al vehículo activo."
         )
         info.setProperty("role", "unit")
         cl.addWidget(info)
@@ -2256,6 +2771,21 @@ class MainWindow(QMainWindow):
         mav_form.addRow("MAVSDK system_id:", self.spin_mav_system_id)
         mav_form.addRow("MAVSDK component_id:", self.spin_mav_comp_id)
         mav_form.addRow("Timeout conexión SITL (s):", self.spin_mav_timeout)
+        self.spin_mav_rate_pos = QDoubleSpinBox()
+        self.spin_mav_rate_pos.setRange(0.5, 50.0)
+        self.spin_mav_rate_pos.setDecimals(1)
+        self.spin_mav_rate_pos.setValue(10.0)
+        self.spin_mav_rate_att = QDoubleSpinBox()
+        self.spin_mav_rate_att.setRange(1.0, 250.0)
+        self.spin_mav_rate_att.setDecimals(0)
+        self.spin_mav_rate_att.setValue(50.0)
+        self.spin_mav_rate_slow = QDoubleSpinBox()
+        self.spin_mav_rate_slow.setRange(0.2, 10.0)
+        self.spin_mav_rate_slow.setDecimals(1)
+        self.spin_mav_rate_slow.setValue(1.0)
+        mav_form.addRow("Tasa posición / velocidad (Hz):", self.spin_mav_rate_pos)
+        mav_form.addRow("Tasa actitud / HUD (Hz):", self.spin_mav_rate_att)
+        mav_form.addRow("Tasa batería / GPS / estado (Hz):", self.spin_mav_rate_slow)
         cl.addWidget(self.mavsdk_adv_frame)
 
         # Configuración avanzada LoRa
@@ -2276,6 +2806,48 @@ class MainWindow(QMainWindow):
         lora_form.addRow("Retraso reintento (s):", self.spin_lora_retry_delay)
         cl.addWidget(self.lora_adv_frame)
 
+        # Configuración de reproducción
+        self.replay_adv_frame = QFrame()
+        replay_form = QFormLayout(self.replay_adv_frame)
+        self.combo_replay_speed = QComboBox()
+        for label, speed in REPLAY_SPEEDS:
+            self.combo_replay_speed.addItem(label, speed)
+        self.combo_replay_speed.currentIndexChanged.connect(self._on_replay_speed_changed)
+        btn_replay_file = QPushButton("Elegir grabación…")
+        btn_replay_file.setProperty("action", "secondary")
+        btn_replay_file.clicked.connect(self._choose_replay_file)
+        replay_form.addRow("Velocidad:", self.combo_replay_speed)
+        replay_form.addRow("Archivo:", btn_replay_file)
+        cl.addWidget(self.replay_adv_frame)
+
+        # Configuración del generador sintético (pruebas de carga)
+        self.synth_adv_frame = QFrame()
+        synth_form = QFormLayout(self.synth_adv_frame)
+        self.combo_synth_pattern = QComboBox()
+        self.combo_synth_pattern.addItems(PATTERNS)
+        self.spin_synth_rate = QDoubleSpinBox()
+        self.spin_synth_rate.setRange(1.0, 1000.0)
+        self.spin_synth_rate.setDecimals(0)
+        self.spin_synth_rate.setValue(10.0)
+        self.combo_synth_speed = QComboBox()
+        for label, speed in REPLAY_SPEEDS:
+            self.combo_synth_speed.addItem(label, speed)
+        self.combo_synth_speed.currentIndexChanged.connect(self._on_synth_speed_changed)
+        self.spin_synth_noise = QDoubleSpinBox()
+        self.spin_synth_noise.setRange(0.0, 10.0)
+        self.spin_synth_noise.setDecimals(1)
+        self.spin_synth_noise.setValue(1.0)
+        self.spin_synth_dropout = QDoubleSpinBox()
+        self.spin_synth_dropout.setRange(0.0, 90.0)
+        self.spin_synth_dropout.setDecimals(1)
+        self.spin_synth_dropout.setValue(0.0)
+        synth_form.addRow("Patrón:", self.combo_synth_pattern)
+        synth_form.addRow("Tasa (Hz):", self.spin_synth_rate)
+        synth_form.addRow("Velocidad:", self.combo_synth_speed)
+        synth_form.addRow("Ruido (× nominal):", self.spin_synth_noise)
+        synth_form.addRow("Pérdidas (%):", self.spin_synth_dropout)
+        cl.addWidget(self.synth_adv_frame)
+
         # Botón conectar
         btn_connect = QPushButton("Conectar")
         btn_connect.setProperty("action", "primary")
@@ -2297,17 +2869,151 @@ class MainWindow(QMainWindow):
 
         return page
 
+    # --- Vehículos -----------------------------------------------------
+
+    @property
+    def vehicle(self) -> Vehicle:
+        """Vehículo activo (el que muestran dashboard, gráficas y HUD)."""
+        return self.vehicles.active
+
+    def _vehicle_color(self, vehicle: Vehicle) -> str:
+        """Color de la trayectoria: acento del tema para el vehículo 1."""
+        if vehicle is self.vehicles.primary:
+            return THEMES[self.current_theme]["accent_color"]
+        return VEHICLE_COLORS[(vehicle.vid - 2) % len(VEHICLE_COLORS)]
+
+    def _vehicle_pen(self, vehicle: Vehicle):
+        return pg.mkPen(self._vehicle_color(vehicle), width=2)
+
+    def _add_vehicle(self) -> Vehicle:
+        """
+        Da de alta un vehículo con su pipeline. El primero escribe en
+        self.db; los demás abren su propio HistorialDB sobre la misma base
+        (otro hilo escritor y otro archivo de vuelo).
+        """
+        vid = self.vehicles.next_id()
+        if len(self.vehicles) == 0:
+            db, owns_db = self.db, False
+        else:
+            db = HistorialDB(
+                self.db.db_path,
+                max_latency_ms=self.db_timer_interval_ms,
+                synchronous=self.db_synchronous,
+            )
+            owns_db = True
+        vehicle = self.vehicles.add(Vehicle(
+            vid, f"UAV-{vid}", db, owns_db,
+            graph_capacity=self.graph_buffer_points,
+            map_max_points=self.map_max_points,
+            smooth_mode=self.graph_smooth_mode,
+            smooth_window=self.graph_smooth_window,
+        ))
+        if hasattr(self, "map_plot"):
+            vehicle.map_track.attach(self.map_plot, self._vehicle_pen(vehicle))
+        return vehicle
+
+    def _refresh_vehicle_combo(self):
+        """Rellena el selector de vehículos (con su fuente si están conectados)."""
+        self.combo_vehicle.blockSignals(True)
+        self.combo_vehicle.clear()
+        for vehicle in self.vehicles:
+            self.combo_vehicle.addItem(vehicle.label, vehicle.vid)
+        self.combo_vehicle.setCurrentIndex(max(0, self.combo_vehicle.findData(self.vehicles.active_id)))
+        self.combo_vehicle.blockSignals(False)
+
+    def _on_add_vehicle_clicked(self):
+        vehicle = self._add_vehicle()
+        self.vehicles.set_active(vehicle.vid)
+        self._refresh_vehicle_combo()
+        self._on_vehicle_selected()
+
+    def _on_remove_vehicle_clicked(self):
+        """Quita el vehículo activo: detiene su enlace y cierra su vuelo."""
+        vehicle = self.vehicle
+        if vehicle is self.vehicles.primary:
+            QMessageBox.information(
+                self, "Vehículos", "El vehículo principal no se puede quitar."
+            )
+            return
+        if (
+            QMessageBox.question(self, "Confirmar", f"¿Quitar {vehicle.name}?")
+            != QMessageBox.Yes
+        ):
+            return
+        self.vehicles.remove(vehicle.vid)
+        stopping = vehicle.stop()
+        try:
+            asyncio.create_task(stopping)
+        except RuntimeError:
+            stopping.close()
+        vehicle.bridge.drain()
+        vehicle.close()
+        vehicle.map_track.detach()
+        self._refresh_vehicle_combo()
+        self._on_vehicle_selected()
+
+    def _set_vehicle_status(self, vehicle: Vehicle, connected: bool, extra: str = ""):
+        """Estado del enlace de un vehículo (el encabezado muestra el activo)."""
+        vehicle.connected = connected
+        if vehicle is self.vehicle:
+            self._set_connection_status(connected, extra)
+
+    def _on_vehicle_selected(self, *_):
+        """
+        Cambia el vehículo activo: dashboard, gráficas, HUD y mapa pasan a
+        sus buffers (los demás siguen ingiriendo en segundo plano).
+        """
+        vid = self.combo_vehicle.currentData()
+        if vid is not None and vid in self.vehicles:
+            self.vehicles.set_active(vid)
+        vehicle = self.vehicle
+
+        self.prev_energy = None
+        self.energy_trend = 0
+        self._map_home_drawn = None
+        self._fleet_drawn = None
+        self.map_home_spot.setData(x=[], y=[])
+        self.map_uav_spot.setData(x=[], y=[])
+        if len(self.vehicles) < 2:
+            self.map_fleet_spot.setData(x=[], y=[])
+
+        self._set_connection_status(vehicle.connected, vehicle.source)
+        self.dash_vm.invalidate()
+        if vehicle.last_sample is not None:
+            self._render_sample(vehicle.last_sample)
+        if self.stack.currentIndex() == 2:
+            self._update_graphs()
+        elif self.stack.currentIndex() == 1:
+            self._set_page(1)
+            self._render_fleet()
+
     def _on_source_changed(self, text: str):
         """Muestra/oculta configuración avanzada según backend."""
-        if text == "MAVSDK":
-            self.mavsdk_adv_frame.show()
-            self.lora_adv_frame.hide()
-        elif text == "LoRa":
-            self.mavsdk_adv_frame.hide()
-            self.lora_adv_frame.show()
-        else:
-            self.mavsdk_adv_frame.hide()
-            self.lora_adv_frame.hide()
+        self.mavsdk_adv_frame.setVisible(text == "MAVSDK")
+        self.lora_adv_frame.setVisible(text == "LoRa")
+        self.replay_adv_frame.setVisible(text == "Replay")
+        self.synth_adv_frame.setVisible(text == "Sintético")
+
+    def _choose_replay_file(self):
+        """Elige la grabación a reproducir (queda en el campo Endpoint)."""
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Reproducir vuelo",
+            str(self.save_dir),
+            "Grabaciones (*.db *.csv *.bin);;Todos los archivos (*)",
+        )
+        if path:
+            self.edit_endpoint.setText(path)
+
+    def _on_replay_speed_changed(self, _index: int):
+        """La velocidad se puede cambiar durante la reproducción."""
+        if isinstance(self.vehicle.backend, ReplayBackend):
+            self.vehicle.backend.speed = self.combo_replay_speed.currentData() or 0.0
+
+    def _on_synth_speed_changed(self, _index: int):
+        """Igual que en la reproducción: se cambia sin reconectar."""
+        if isinstance(self.vehicle.backend, SyntheticBackend):
+            self.vehicle.backend.speed = self.combo_synth_speed.currentData() or 0.0
 
     # ------------------------------------------------------------------
     # PÁGINA: CONFIGURACIÓN (RENDIMIENTO, ALERTAS, COLOR PRINCIPAL)
@@ -2407,7 +3113,7 @@ class MainWindow(QMainWindow):
         row_graph.addStretch()
         self.combo_graph_profile = QComboBox()
         self.combo_graph_profile.addItems([
-            "Nivel 1 – Máxima precisión (sin downsampling)",
+            "Nivel 1 – Máxima precisión (mín/máx por pixel)",
             "Nivel 2 – Alta precisión",
             "Nivel 3 – Equilibrado",
             "Nivel 4 – Rendimiento medio",
@@ -2420,14 +3126,14 @@ class MainWindow(QMainWindow):
 
         # Mapa
         row_map = QHBoxLayout()
-        lbl_map = QLabel("Mapa (puntos en trayectoria y refresco):")
+        lbl_map = QLabel("Mapa (puntos dibujados y refresco):")
         lbl_map.setProperty("role", "unit")
         row_map.addWidget(lbl_map)
         row_map.addStretch()
         self.combo_map_profile = QComboBox()
         self.combo_map_profile.addItems([
-            "Nivel 1 – Trayectoria corta",
-            "Nivel 2 – 400–600 puntos",
+            "Nivel 1 – 400 puntos",
+            "Nivel 2 – 600 puntos",
             "Nivel 3 – 800 puntos",
             "Nivel 4 – 1000 puntos (recomendado)",
             "Nivel 5 – 1500 puntos",
@@ -2456,6 +3162,14 @@ class MainWindow(QMainWindow):
         row_db.addWidget(self.combo_db_profile)
         cl.addLayout(row_db)
 
+        # Estado del escritor de BD (contrapresión)
+        self.lbl_db_stats = QLabel("BD: en cola 0 • escritas 0 • commit -- ms")
+        self.lbl_db_stats.setProperty("role", "unit")
+        cl.addWidget(self.lbl_db_stats)
+        self.db_stats_timer = QTimer(self)
+        self.db_stats_timer.timeout.connect(self._update_db_stats)
+        self.db_stats_timer.start(1000)
+
         sep2 = QFrame()
         sep2.setFrameShape(QFrame.HLine)
         cl.addWidget(sep2)
@@ -2684,7 +3398,11 @@ class MainWindow(QMainWindow):
             self.cam_timer.setInterval(self.camera_update_ms)
 
     def _on_graph_profile_changed(self, idx: int):
-        """Ajusta frecuencia y downsampling de gráficas."""
+        """
+        Ajusta frecuencia y downsampling de gráficas.
+        graph_max_points es el tope de puntos por curva; el ancho en pixeles
+        de cada gráfica también lo limita (ver _update_graphs).
+        """
         if not hasattr(self, "_graph_profile_periods"):
             return
         idx = max(0, min(5, idx))
@@ -2707,8 +3425,33 @@ class MainWindow(QMainWindow):
         idx = max(0, min(5, idx))
         self.db_commit_per_sample = self._db_profile_commit_flags[idx]
         self.db_timer_interval_ms = self._db_profile_intervals[idx]
-        if hasattr(self, "db_timer"):
-            self.db_timer.setInterval(self.db_timer_interval_ms)
+        self.db_synchronous = self._db_profile_synchronous[idx]
+        for vehicle in self.vehicles:
+            vehicle.db.set_commit_policy(
+                max_latency_ms=self.db_timer_interval_ms, synchronous=self.db_synchronous
+            )
+        if hasattr(self, "flight_log_timer"):
+            self.flight_log_timer.setInterval(self.db_timer_interval_ms)
+
+    def _flush_flight_log(self):
+        """Vuelca a disco lo que las bitácoras binarias tengan en su búfer."""
+        for vehicle in self.vehicles:
+            if vehicle.flight_log is not None:
+                vehicle.flight_log.flush()
+
+    def _update_db_stats(self):
+        """Muestra profundidad de cola y tiempos del escritor de BD."""
+        st = self.vehicle.db.stats()
+        txt = (
+            f"BD: en cola {st['pending']} (máx {st['max_pending']}) • "
+            f"escritas {st['written']} • commit {st['last_commit_ms']:.1f} ms "
+            f"(máx {st['max_commit_ms']:.1f})"
+        )
+        if st["dropped"] or st["failed"]:
+            txt += f" • descartadas {st['dropped'] + st['failed']}"
+        if not st["healthy"]:
+            txt += f" • error de escritura: {st['error'] or 'escritor detenido'}"
+        self.dash_vm.set_text(self.lbl_db_stats, txt)
 
     # ------------------------------------------------------------------
     # ANIMACIONES DE SEÑAL / CONEXIÓN
@@ -2726,6 +3469,7 @@ class MainWindow(QMainWindow):
         lvl = min(self._signal_pulse_level, self._signal_pulse_target)
         self.signal_widget.set_level(lvl)
         self.signal_widget_conn.set_level(lvl)
+        self.dash_vm.invalidate(self.signal_widget, self.signal_widget_conn)
         if self._signal_pulse_level >= self._signal_pulse_target:
             self.signal_pulse_timer.stop()
 
@@ -2772,79 +3516,133 @@ class MainWindow(QMainWindow):
         self._connecting_fake_level = (self._connecting_fake_level + 1) % 5
         self.signal_widget.set_level(self._connecting_fake_level)
         self.signal_widget_conn.set_level(self._connecting_fake_level)
+        self.dash_vm.invalidate(self.signal_widget, self.signal_widget_conn)
 
     def _on_connect_clicked(self):
-        """Manejador del botón Conectar."""
+        """Manejador del botón Conectar (conecta el vehículo activo)."""
+        vehicle = self.vehicle
         src = self.combo_source.currentText()
-        self.source_name = src
         endpoint = self.edit_endpoint.text().strip()
-        self._last_endpoint = endpoint
-        self._reconnect_attempts = 0
+        vehicle.endpoint = endpoint
+        vehicle.reconnect_attempts = 0
 
-        # Detener backend previo si existe
-        if self.backend is not None and hasattr(self.backend, "stop"):
+        # Detener backend previo del vehículo si existe
+        if vehicle.backend is not None:
             try:
-                asyncio.create_task(self.backend.stop())
+                asyncio.create_task(vehicle.stop())
             except RuntimeError:
                 pass
 
+        # Reproducir la propia base: el vuelo elegido en el historial o el
+        # último grabado (antes de abrir el vuelo nuevo de esta conexión)
+        replay_flight = None
+        if src == "Replay" and endpoint:
+            if Path(endpoint).resolve() == self.db.db_path.resolve():
+                replay_flight = self._selected_flight()
+                if replay_flight is None:
+                    _, rows = self.db.flights()
+                    replay_flight = rows[0][0] if rows else None
+
+        # Cada conexión es un vuelo nuevo en la partición del vehículo
+        # (+ bitácora binaria)
+        vehicle.start_flight(src)
+
         # Crear backend según la fuente seleccionada
         if src == "DEMO":
-            self.backend = BackendTelemetria(force_demo=True)
+            backend = BackendTelemetria(force_demo=True)
         elif src == "MAVSDK":
-            self.backend = BackendTelemetria(force_demo=False)
-            if hasattr(self.backend, "system_id"):
-                self.backend.system_id = self.spin_mav_system_id.value()
-            if hasattr(self.backend, "component_id"):
-                self.backend.component_id = self.spin_mav_comp_id.value()
-            if hasattr(self.backend, "connection_timeout_s"):
-                self.backend.connection_timeout_s = float(self.spin_mav_timeout.value())
+            backend = BackendTelemetria(force_demo=False)
+            if hasattr(backend, "system_id"):
+                backend.system_id = self.spin_mav_system_id.value()
+            if hasattr(backend, "component_id"):
+                backend.component_id = self.spin_mav_comp_id.value()
+            if hasattr(backend, "connection_timeout_s"):
+                backend.connection_timeout_s = float(self.spin_mav_timeout.value())
+            if hasattr(backend, "stream_rates_hz"):
+                fast = float(self.spin_mav_rate_pos.value())
+                slow = float(self.spin_mav_rate_slow.value())
+                backend.stream_rates_hz.update(
+                    position=fast,
+                    velocity_ned=fast,
+                    attitude_euler=float(self.spin_mav_rate_att.value()),
+                    battery=slow,
+                    gps_info=slow,
+                    flight_mode=slow,
+                    in_air=slow,
+                )
+        elif src == "Replay":
+            backend = ReplayBackend(
+                endpoint,
+                speed=self.combo_replay_speed.currentData(),
+                flight=replay_flight,
+            )
+        elif src == "Sintético":
+            backend = SyntheticBackend(
+                self.combo_synth_pattern.currentText(),
+                rate_hz=float(self.spin_synth_rate.value()),
+                speed=self.combo_synth_speed.currentData(),
+                noise=float(self.spin_synth_noise.value()),
+                dropout=float(self.spin_synth_dropout.value()) / 100.0,
+            )
         else:  # LoRa
             try:
                 baud = int(self.combo_lora_baud.currentText())
             except ValueError:
                 baud = 57600
-            self.backend = LoRaBackend(port=endpoint or "COM3", baud=baud)
-            if hasattr(self.backend, "buffer_size"):
-                self.backend.buffer_size = int(self.spin_lora_buffer.value())
-            if hasattr(self.backend, "retry_delay_s"):
-                self.backend.retry_delay_s = float(self.spin_lora_retry_delay.value())
+            backend = LoRaBackend(port=endpoint or "COM3", baud=baud)
+            if hasattr(backend, "buffer_size"):
+                backend.buffer_size = int(self.spin_lora_buffer.value())
+            if hasattr(backend, "retry_delay_s"):
+                backend.retry_delay_s = float(self.spin_lora_retry_delay.value())
 
+        vehicle.backend = backend
         self._start_connecting_animation()
+        self._refresh_vehicle_combo()
 
         try:
-            asyncio.create_task(self._run_backend(endpoint))
+            vehicle.task = asyncio.create_task(self._run_backend(vehicle, endpoint))
         except RuntimeError:
             # Si se ejecuta sin loop de asyncio, el usuario deberá lanzar el backend externamente.
             pass
 
-    async def _run_backend(self, endpoint: str):
+    async def _run_backend(self, vehicle: Vehicle, endpoint: str):
         """
-        Corrutina que se encarga de conectar el backend y consumir las muestras.
+        Corrutina que se encarga de conectar el backend de un vehículo y
+        consumir sus muestras (una por vehículo, todas en el mismo bucle).
         Implementa política de reconexión automática básica.
         """
+        backend = vehicle.backend
         attempts = 0
-        while True:
+        while vehicle.backend is backend:
             try:
-                await self.backend.connect(endpoint)
-                self._set_connection_status(True, self.source_name)
+                await backend.connect(endpoint)
+                self._set_vehicle_status(vehicle, True, vehicle.source)
                 attempts = 0
-                async for sample in self.backend.samples():
-                    self.signals.sample.emit(sample)
+                push = vehicle.bridge.push
+                async for sample in backend.samples():
+                    push(sample)
+                if vehicle.backend is not backend:
+                    break   # se reemplazó o se quitó el vehículo
+                if isinstance(backend, ReplayBackend):
+                    # Fin de la grabación: no es una caída del enlace
+                    self._set_vehicle_status(vehicle, False, "fin de reproducción")
+                    break
                 # Si el generador termina sin excepción, lo tratamos como desconexión
                 raise RuntimeError("Enlace finalizado")
             except Exception as e:
-                self._set_connection_status(False, "error")
+                if vehicle.backend is not backend:
+                    break
+                self._set_vehicle_status(vehicle, False, "error")
                 if not self.auto_reconnect_enabled:
-                    QMessageBox.critical(self, "Error de backend", str(e))
+                    QMessageBox.critical(self, f"Error de backend ({vehicle.name})", str(e))
                     break
                 attempts += 1
-                self._reconnect_attempts = attempts
+                vehicle.reconnect_attempts = attempts
                 max_attempts = self.reconnect_max_attempts
                 if max_attempts > 0 and attempts > max_attempts:
                     QMessageBox.critical(
                         self,
-                        "Error de backend",
+                        f"Error de backend ({vehicle.name})",
                         f"Fallo de conexión tras {attempts} intentos: {e}",
                     )
                     break
@@ -2854,35 +3652,70 @@ class MainWindow(QMainWindow):
     # MANEJO DE TELEMETRÍA ENTRANTE
     # ------------------------------------------------------------------
 
-    def _handle_sample(self, s: TelemetrySample):
+    def _drain_samples(self):
         """
-        Lógica principal al recibir una muestra:
-        - Actualiza buffers de gráficas.
-        - Actualiza HUD y estado rápido.
-        - Actualiza texto de “Contrato”.
-        - Actualiza mapa de trayectoria.
-        - Aplica alertas y seguridad.
-        - Guarda la muestra en la base de datos.
+        Tick de UI: drena el puente de cada vehículo.
+        - Trabajo de buffers / BD para cada muestra de cada lote.
+        - Trabajo de widgets una sola vez, con la muestra más reciente del
+          vehículo activo.
         """
-        self.last_sample = s
+        active = self.vehicle
+        latest = None
+        others = False
+        for vehicle in self.vehicles:
+            batch = vehicle.bridge.drain()
+            if not batch:
+                continue
+
+            vehicle.ingest(TelemetryBatch.from_samples(batch), smooth=self.graph_smooth)
+
+            # Un commit por lote, hecho por el hilo escritor (no bloquea)
+            if self.db_commit_per_sample:
+                vehicle.db.flush()
+            if vehicle is active:
+                latest = batch[-1]
+            else:
+                others = True
+
+        if latest is None:
+            # Solo llegaron datos de otros vehículos: basta con el mapa
+            if others and self._should_update_map(time.monotonic() * 1000.0):
+                self._render_fleet()
+            return
 
         # Reset del timeout de enlace (heartbeat)
         self._reset_link_timeout_timer()
 
-        # Tiempo relativo de la muestra
-        t_val = getattr(s, "time_s", None)
-        if t_val is None:
-            t_val = self.time_buf[-1] + 1 if self.time_buf else 0.0
+        self._render_sample(latest)
 
-        # Cálculo de tiempo de vuelo (suma solo cuando está en aire)
-        in_air = bool(getattr(s, "in_air", False))
-        if self.last_time_s is not None:
-            dt = max(0.0, t_val - self.last_time_s)
-            if dt < 10.0 and in_air:
-                self.flight_time_s += dt
-        self.last_time_s = t_val
+    def _handle_sample(self, s: TelemetrySample):
+        """
+        Procesa una muestra aislada del vehículo activo de forma síncrona
+        (ingesta + render). El flujo normal pasa por el puente (_drain_samples).
+        """
+        self._ingest_sample(s)
+        if self.db_commit_per_sample:
+            self.vehicle.db.flush()
+        self._reset_link_timeout_timer()
+        self._render_sample(s)
+
+    def _ingest_sample(self, s: TelemetrySample):
+        """Ingesta de una sola muestra (lote de 1)."""
+        self._ingest_batch(TelemetryBatch.from_samples((s,)))
 
-        self.time_buf.append(t_val)
+    def _ingest_batch(self, batch: TelemetryBatch):
+        """Ingesta de un lote en el vehículo activo (ver Vehicle.ingest)."""
+        self.vehicle.ingest(batch, smooth=self.graph_smooth)
+
+    def _render_sample(self, s: TelemetrySample):
+        """
+        Trabajo de widgets con la muestra más reciente del lote:
+        - Actualiza HUD y estado rápido.
+        - Actualiza texto de “Contrato”.
+        - Redibuja gráficas y mapa (según pestaña y periodo).
+        - Aplica alertas y seguridad.
+        """
+        in_air = bool(getattr(s, "in_air", False))
 
         # Variables interesantes
         alt = getattr(s, "rel_alt_m", 0.0) or 0.0
@@ -2905,21 +3738,14 @@ class MainWindow(QMainWindow):
         vy = getattr(s, "vy_ms", 0.0) or 0.0
         vz = getattr(s, "vz_ms", 0.0) or 0.0
 
-        # Buffers para gráficas
-        self.alt_buf.append(alt)
-        self.spd_buf.append(spd)
-        self.volt_buf.append(vbat)
-        self.temp_buf.append(tmp)
-        self.pres_buf.append(pres)
-        self.hum_buf.append(hum)
-
         # --- Dashboard: batería / valores rápidos -------------------
-        self.bat_widget.set_level(bat_pct)
-        self.lbl_bat_val.setText(f"{vbat:.2f} V" if vbat > 0 else "-- V")
+        vm = self.dash_vm
+        vm.set_value(self.bat_widget, round(bat_pct, 1), self.bat_widget.set_level)
+        vm.set_text(self.lbl_bat_val, f"{vbat:.2f} V" if vbat > 0 else "-- V")
 
-        self.lbl_alt_val.setText(f"{alt:.1f}")
-        self.lbl_spd_val.setText(f"{spd:.1f}")
-        self.lbl_tmp_val.setText(f"{tmp:.1f}")
+        vm.set_text(self.lbl_alt_val, f"{alt:.1f}")
+        vm.set_text(self.lbl_spd_val, f"{spd:.1f}")
+        vm.set_text(self.lbl_tmp_val, f"{tmp:.1f}")
 
         t_theme = THEMES[self.current_theme]
 
@@ -2935,8 +3761,8 @@ class MainWindow(QMainWindow):
             batt_color = t_theme["text_main"]
             batt_level = 0
 
-        self.lbl_bat_val.setStyleSheet(
-            f"color:{batt_color}; font-weight:700; font-size:18px;"
+        vm.set_style(
+            self.lbl_bat_val, f"color:{batt_color}; font-weight:700; font-size:18px;"
         )
 
         if self.alert_enable_batt and batt_level > self.last_batt_alert_level:
@@ -2968,8 +3794,8 @@ class MainWindow(QMainWindow):
             color_alt = t_theme["accent_color"]
             alt_over = False
 
-        self.lbl_alt_val.setStyleSheet(
-            f"color:{color_alt}; font-weight:800; font-size:24px;"
+        vm.set_style(
+            self.lbl_alt_val, f"color:{color_alt}; font-weight:800; font-size:24px;"
         )
 
         if self.alert_enable_alt:
@@ -2992,8 +3818,8 @@ class MainWindow(QMainWindow):
 
         spd_over = spd > self.alert_spd_max
         spd_color = t_theme["danger_color"] if spd_over else base_spd_color
-        self.lbl_spd_val.setStyleSheet(
-            f"color:{spd_color}; font-weight:700; font-size:22px;"
+        vm.set_style(
+            self.lbl_spd_val, f"color:{spd_color}; font-weight:700; font-size:22px;"
         )
 
         if self.alert_enable_spd:
@@ -3016,8 +3842,8 @@ class MainWindow(QMainWindow):
 
         temp_over = tmp > self.alert_temp_max
         tmp_color = t_theme["danger_color"] if temp_over else base_tmp_color
-        self.lbl_tmp_val.setStyleSheet(
-            f"color:{tmp_color}; font-weight:700; font-size:22px;"
+        vm.set_style(
+            self.lbl_tmp_val, f"color:{tmp_color}; font-weight:700; font-size:22px;"
         )
 
         if self.alert_enable_temp:
@@ -3033,10 +3859,10 @@ class MainWindow(QMainWindow):
                 self.temp_alert_active = False
 
         # Tiempo de vuelo en formato hh:mm:ss
-        hrs = int(self.flight_time_s // 3600)
-        mins = int((self.flight_time_s % 3600) // 60)
-        secs = int(self.flight_time_s % 60)
-        self.lbl_flight_time_val.setText(f"{hrs:02d}:{mins:02d}:{secs:02d}")
+        hrs = int(self.vehicle.flight_time_s // 3600)
+        mins = int((self.vehicle.flight_time_s % 3600) // 60)
+        secs = int(self.vehicle.flight_time_s % 60)
+        vm.set_text(self.lbl_flight_time_val, f"{hrs:02d}:{mins:02d}:{secs:02d}")
 
         # ------------------ ENERGÍA ESPECÍFICA + FPV ------------------
         v_mod = sqrt(vx * vx + vy * vy + vz * vz)
@@ -3073,13 +3899,15 @@ class MainWindow(QMainWindow):
         # Líneas de estado tipo “Contrato”
         modo = getattr(s, "flight_mode", "--") or "--"
         en_aire_txt = "Sí" if in_air else "No"
-        self.lbl_status_line1.setText(
-            f"GPS: {sats} sats | Modo: {modo} | En aire: {en_aire_txt} | Fuente: {self.source_name}"
+        vm.set_text(
+            self.lbl_status_line1,
+            f"GPS: {sats} sats | Modo: {modo} | En aire: {en_aire_txt} | Fuente: {self.vehicle.source}",
         )
 
-        self.lbl_status_line2.setText(
+        vm.set_text(
+            self.lbl_status_line2,
             f"temp:{tmp:.1f},hum:{hum:.1f},pres:{pres:.2f},"
-            f"lat:{lat:.4f},lon:{lon:.4f},speed:{spd:.1f},acc:{acc:.1f}"
+            f"lat:{lat:.4f},lon:{lon:.4f},speed:{spd:.1f},acc:{acc:.1f}",
         )
 
         # Alertas basadas en GPS
@@ -3097,12 +3925,14 @@ class MainWindow(QMainWindow):
                 self.gps_alert_active = False
 
             if gps_bad:
-                self.lbl_status_line1.setStyleSheet(
-                    f"font-size: 12px; color: {t_theme['warning_color']};"
+                vm.set_style(
+                    self.lbl_status_line1,
+                    f"font-size: 12px; color: {t_theme['warning_color']};",
                 )
             else:
-                self.lbl_status_line1.setStyleSheet(
-                    f"font-size: 12px; color: {THEMES[self.current_theme]['text_main']};"
+                vm.set_style(
+                    self.lbl_status_line1,
+                    f"font-size: 12px; color: {THEMES[self.current_theme]['text_main']};",
                 )
 
         # Intensidad de señal (aprox a partir de sats)
@@ -3115,8 +3945,8 @@ class MainWindow(QMainWindow):
             level = 2
         elif sats >= 1:
             level = 1
-        self.signal_widget.set_level(level)
-        self.signal_widget_conn.set_level(level)
+        vm.set_value(self.signal_widget, level, self.signal_widget.set_level)
+        vm.set_value(self.signal_widget_conn, level, self.signal_widget_conn.set_level)
 
         # Tiempo actual para control de refresco
         now_ms = time.monotonic() * 1000.0
@@ -3126,22 +3956,17 @@ class MainWindow(QMainWindow):
             self._update_graphs()
 
         # Etiquetas bajo las gráficas
-        self.lbl_alt_graph_val.setText(f"{alt:.1f} m")
-        self.lbl_spd_graph_val.setText(f"{spd:.1f} m/s")
-        self.lbl_vbat_graph_val.setText(f"{vbat:.2f} V")
-        self.lbl_tmp_graph_val.setText(f"{tmp:.1f} °C")
-        self.lbl_pres_graph_val.setText(f"{pres:.1f} hPa")
-        self.lbl_hum_graph_val.setText(f"{hum:.1f} %")
+        vm.set_text(self.lbl_alt_graph_val, f"{alt:.1f} m")
+        vm.set_text(self.lbl_spd_graph_val, f"{spd:.1f} m/s")
+        vm.set_text(self.lbl_vbat_graph_val, f"{vbat:.2f} V")
+        vm.set_text(self.lbl_tmp_graph_val, f"{tmp:.1f} °C")
+        vm.set_text(self.lbl_pres_graph_val, f"{pres:.1f} hPa")
+        vm.set_text(self.lbl_hum_graph_val, f"{hum:.1f} %")
 
         # Mapa / trayectoria
         if self._should_update_map(now_ms):
             self._update_map(lat, lon, alt, spd)
 
-        # Guardar en BD
-        self.db.append(self.source_name, s)
-        if self.db_commit_per_sample:
-            self.db.flush()
-
     def _should_update_graphs(self, now_ms: float) -> bool:
         """
         Controla si se deben redibujar las gráficas:
@@ -3178,111 +4003,134 @@ class MainWindow(QMainWindow):
             return True
         return False
 
+    def _graph_curves(self):
+        """
+        Tríos (clave, gráfica, curva); la clave es el canal en graph_series.
+        """
+        return [
+            ("alt", self.plot_alt, self.curve_alt),
+            ("spd", self.plot_spd, self.curve_spd),
+            ("vbat", self.plot_vbat, self.curve_vbat),
+            ("tmp", self.plot_tmp, self.curve_tmp),
+            ("pres", self.plot_pres, self.curve_pres),
+            ("hum", self.plot_hum, self.curve_hum),
+        ]
+
     def _update_graphs(self):
-        """Actualiza las curvas de las gráficas en la pestaña correspondiente."""
+        """
+        Actualiza las curvas de las gráficas en la pestaña correspondiente.
+        Los datos salen como vistas del anillo NumPy (sin copiar a listas).
+        """
         if self.graph_paused:
             return
-        if not self.time_buf:
+        if not self.vehicle.graph_series:
             return
 
-        x_full = list(self.time_buf)
-
-        def apply_smooth(vals: List[float]) -> List[float]:
-            if not self.graph_smooth or len(vals) < 5:
-                return vals
-            w = 5
-            sm = []
-            for i in range(len(vals)):
-                i0 = max(0, i - w + 1)
-                window = vals[i0:i + 1]
-                sm.append(sum(window) / len(window))
-            return sm
-
-        alt_vals = apply_smooth(list(self.alt_buf))
-        spd_vals = apply_smooth(list(self.spd_buf))
-        vbat_vals = apply_smooth(list(self.volt_buf))
-        tmp_vals = apply_smooth(list(self.temp_buf))
-        pres_vals = apply_smooth(list(self.pres_buf))
-        hum_vals = apply_smooth(list(self.hum_buf))
-
-        step = 1
-        if self.graph_max_points and len(x_full) > self.graph_max_points:
-            step = max(1, len(x_full) // self.graph_max_points)
-
-        x = x_full[::step]
-        alt_y = alt_vals[::step]
-        spd_y = spd_vals[::step]
-        vbat_y = vbat_vals[::step]
-        tmp_y = tmp_vals[::step]
-        pres_y = pres_vals[::step]
-        hum_y = hum_vals[::step]
-
-        if self.graph_enabled.get("alt", True):
-            self.curve_alt.setData(x, alt_y)
-        else:
-            self.curve_alt.clear()
-
-        if self.graph_enabled.get("spd", True):
-            self.curve_spd.setData(x, spd_y)
-        else:
-            self.curve_spd.clear()
-
-        if self.graph_enabled.get("vbat", True):
-            self.curve_vbat.setData(x, vbat_y)
-        else:
-            self.curve_vbat.clear()
-
-        if self.graph_enabled.get("tmp", True):
-            self.curve_tmp.setData(x, tmp_y)
-        else:
-            self.curve_tmp.clear()
-
-        if self.graph_enabled.get("pres", True):
-            self.curve_pres.setData(x, pres_y)
-        else:
-            self.curve_pres.clear()
+        x_full = self.vehicle.graph_series.view("t")
+
+        # Serie suavizada incremental (ya calculada muestra a muestra)
+        source = self.vehicle.graph_series
+        if self.graph_smooth:
+            if len(self.vehicle.graph_smoother) != len(x_full):
+                self.vehicle.graph_smoother.rebuild(self.vehicle.graph_series)
+            source = self.vehicle.graph_smoother
+
+        # Decimación min/máx por pixel: el costo queda acotado por el ancho
+        # de cada gráfica. graph_max_points = 0 -> sin tope extra (solo el ancho).
+        # Si el rango visible tiene muchas más muestras que pixeles (o ya no
+        # cabe en el anillo crudo) se dibuja desde la pirámide de agregados.
+        for key, plot, curve in self._graph_curves():
+            if not self.graph_enabled.get(key, True):
+                curve.clear()
+                continue
+            y = source.view(key)
+            vb = plot.getPlotItem().getViewBox()
+            buckets = buckets_for_width(vb.width() or plot.width(), self.graph_max_points)
+            t_from, t_to = self._graph_visible_range(vb)
+            lo, hi = 0, len(x_full)
+            if t_from is not None:
+                lo = int(np.searchsorted(x_full, t_from, side="left"))
+                hi = max(lo, int(np.searchsorted(x_full, t_to, side="right")))
+
+            raw_covers = lo > 0 or self.vehicle.graph_pyramid.total <= len(x_full)
+            if source is self.vehicle.graph_smoother or (raw_covers and hi - lo <= 4 * buckets):
+                x, y = minmax_decimate(x_full[lo:hi], y[lo:hi], buckets)
+            else:
+                x, y = self.vehicle.graph_pyramid.envelope(key, buckets, t_from, t_to)
+            curve.setData(x, y)
 
-        if self.graph_enabled.get("hum", True):
-            self.curve_hum.setData(x, hum_y)
-        else:
-            self.curve_hum.clear()
+    @staticmethod
+    def _graph_visible_range(vb) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Rango X visible de una gráfica si el usuario hizo zoom manual;
+        (None, None) si está en auto-rango (se muestra todo el vuelo).
+        """
+        if vb.autoRangeEnabled()[0]:
+            return None, None
+        x0, x1 = vb.viewRange()[0]
+        return float(x0), float(x1)
 
     def _set_map_max_points(self, max_points: int):
-        """Cambia el máximo de puntos de trayectoria en el mapa."""
+        """
+        Cambia el presupuesto de puntos dibujados en el mapa. La trayectoria
+        completa se conserva; solo cambia cuánto se simplifica al dibujar.
+        """
         max_points = max(10, int(max_points))
         self.map_max_points = max_points
-        self.map_positions = deque(self.map_positions, maxlen=self.map_max_points)
+        for vehicle in self.vehicles:
+            vehicle.map_track.set_max_points(self.map_max_points)
+
+    def _render_fleet(self):
+        """
+        Trayectorias y posición actual de los demás vehículos (superpuestas
+        al activo). Las posiciones van en un solo ScatterPlotItem y solo se
+        reenvían si cambiaron.
+        """
+        if len(self.vehicles) < 2:
+            return
+        active = self.vehicle
+        xs, ys, brushes = [], [], []
+        for vehicle in self.vehicles:
+            if vehicle is active:
+                continue
+            vehicle.map_track.render()
+            last = vehicle.map_track.last
+            if last is not None:
+                ys.append(last[0])
+                xs.append(last[1])
+                brushes.append(self._vehicle_color(vehicle))
+        fleet = (tuple(xs), tuple(ys), tuple(brushes))
+        if fleet != self._fleet_drawn:
+            self.map_fleet_spot.setData(x=xs, y=ys, brush=[pg.mkBrush(b) for b in brushes])
+            self._fleet_drawn = fleet
 
     def _update_map(self, lat: float, lon: float, alt: float, spd: float):
         """
         Actualiza la página de mapa con la trayectoria:
-        - Guarda posiciones (lat/lon).
-        - Actualiza curva y puntos de home / UAV.
-        - Auto-zoom suave.
+        - Las posiciones (lat/lon) se guardan en _ingest_sample.
+        - Solo se reenvían a la curva los bloques nuevos de la trayectoria.
+        - Puntos de UAV (cada vez) y home (solo si cambió).
+        - Re-encuadre solo cuando el UAV sale de la región visible.
         """
         if lat == 0.0 and lon == 0.0:
             return
+        if not self.vehicle.map_track:
+            return
 
-        if self.map_home is None:
-            self.map_home = (lat, lon)
-
-        self.map_positions.append((lat, lon))
-
-        lats = [p[0] for p in self.map_positions]
-        lons = [p[1] for p in self.map_positions]
-
-        self.map_curve.setData(lons, lats)
+        self.vehicle.map_track.render()
         self.map_uav_spot.setData(x=[lon], y=[lat])
 
-        if self.map_home is not None:
-            home_lat, home_lon = self.map_home
+        if self.vehicle.map_home is not None and self.vehicle.map_home != self._map_home_drawn:
+            home_lat, home_lon = self.vehicle.map_home
             self.map_home_spot.setData(x=[home_lon], y=[home_lat])
+            self._map_home_drawn = self.vehicle.map_home
 
-        if len(self.map_positions) >= 2:
-            self.map_plot.autoRange(padding=0.12)
+        self.vehicle.map_track.ensure_visible(self.map_plot.plotItem.vb, lat, lon)
+        self._render_fleet()
 
-        self.lbl_map_status.setText(
-            f"Lat: {lat:.5f}  Lon: {lon:.5f}  Alt: {alt:.1f} m  Vel: {spd:.1f} m/s"
+        self.dash_vm.set_text(
+            self.lbl_map_status,
+            f"Lat: {lat:.5f}  Lon: {lon:.5f}  Alt: {alt:.1f} m  Vel: {spd:.1f} m/s",
         )
 
     # ------------------------------------------------------------------
@@ -3324,11 +4172,16 @@ class MainWindow(QMainWindow):
 
         # Fondo del mapa
         self.map_plot.setBackground(THEMES[self.current_theme]["graph_bg"])
+        primary = self.vehicles.primary
+        primary.map_track.set_pen(self._vehicle_pen(primary))
 
         self.btn_theme.setText(
             "Modo claro" if self.current_theme == "dark" else "Modo oscuro"
         )
 
+        # Los estilos se reescriben abajo: el dashboard debe re-aplicarse completo
+        self.dash_vm.invalidate()
+
         # Colores de líneas de estado
         accent = THEMES[self.current_theme]["accent_color"]
         self.lbl_status_line1.setStyleSheet(
@@ -3338,8 +4191,8 @@ class MainWindow(QMainWindow):
             f"font-size: 12px; color: {accent};"
         )
 
-        if self.last_sample is not None:
-            s = self.last_sample
+        if self.vehicle.last_sample is not None:
+            s = self.vehicle.last_sample
             tmp = getattr(s, "temp_c", 0.0) or 0.0
             hum = getattr(s, "hum_pct", 0.0) or 0.0
             pres = getattr(s, "pres_hpa", 0.0) or 0.0
@@ -3352,7 +4205,7 @@ class MainWindow(QMainWindow):
             sats = getattr(s, "num_sat", 0) or 0
             en_aire_txt = "Sí" if in_air else "No"
             self.lbl_status_line1.setText(
-                f"GPS: {sats} sats | Modo: {modo} | En aire: {en_aire_txt} | Fuente: {self.source_name}"
+                f"GPS: {sats} sats | Modo: {modo} | En aire: {en_aire_txt} | Fuente: {self.vehicle.source}"
             )
             self.lbl_status_line2.setText(
                 f"temp:{tmp:.1f},hum:{hum:.1f},pres:{pres:.2f},"
@@ -3419,6 +4272,7 @@ class MainWindow(QMainWindow):
         self._set_connection_status(False, "timeout")
         self.signal_widget.set_level(0)
         self.signal_widget_conn.set_level(0)
+        self.dash_vm.invalidate(self.signal_widget, self.signal_widget_conn)
         if self.alert_style == "popup":
             QMessageBox.warning(
                 self,
@@ -3435,7 +4289,7 @@ class MainWindow(QMainWindow):
         Se llama periódicamente para actualizar el cuadro de la cámara.
         La cámara solo se anima cuando el Dashboard está visible.
         """
-        active_backend = self.backend is not None
+        active_backend = self.vehicle.backend is not None
         active = active_backend and hasattr(self, "stack") and self.stack.currentIndex() == 0
         self.cam_widget.update_image(active)
 
@@ -3547,12 +4401,14 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """
         Se llama al cerrar la ventana.
-        Cierra la base de datos y detiene el backend de forma ordenada.
+        Detiene los backends y cierra las bases de datos de forma ordenada.
         """
+        for vehicle in self.vehicles:
+            stopping = vehicle.stop()
+            try:
+                asyncio.create_task(stopping)
+            except RuntimeError:
+                stopping.close()
+            vehicle.close()
         self.db.close()
-        try:
-            if self.backend is not None and hasattr(self.backend, "stop"):
-                asyncio.create_task(self.backend.stop())
-        except RuntimeError:
-            pass
         event.accept()
\ No newline at end of file
@@ -0,0 +1,415 @@
+"""
+Capa de trayectoria del mapa: vuelo completo con simplificación espacial.
+
+Todas las posiciones del vuelo se guardan en un arreglo NumPy que crece
+por duplicación (no se descarta nada). Lo que se dibuja es una versión
+simplificada por grilla: de cada corrida de puntos que cae en la misma
+celda se conserva solo el primero. El tamaño de celda se deriva del zoom
+actual (≈ 2 pixeles, cuantizado a potencias de 2 para no recalcular en
+cada paso de zoom) y se agranda hasta que los puntos dibujados caben en
+el presupuesto `max_points`.
+
+- Cada muestra nueva cuesta O(1): se compara su celda con la del último
+  punto conservado y, si cambió, se añade al bloque de dibujo activo.
+- Solo al cambiar de nivel de zoom (o al salir del área recortada) se
+  recalcula la simplificación, vectorizada en O(n).
+- Los puntos dibujados viven en bloques preasignados con una curva cada
+  uno; solo el bloque activo se reenvía a pyqtgraph.
+
+Se eligió la grilla (en lugar de Douglas-Peucker) porque admite inserción
+incremental y un recálculo completamente vectorizado.
+"""
+
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pyqtgraph as pg
+
+# Puntos por bloque de dibujo
+CHUNK_POINTS = 256
+# Tamaño de celda objetivo, en pixeles de pantalla
+CELL_PX = 2.0
+
+
+class _Chunk:
+    """Bloque de puntos dibujados (fila 0 = lon, fila 1 = lat) y su curva."""
+
+    __slots__ = ("xy", "n", "item", "dirty")
+
+    def __init__(self, size: int):
+        # +1: espacio para la punta viva (posición actual del UAV)
+        self.xy = np.empty((2, size + 1), dtype=np.float64)
+        self.n = 0
+        self.item: Optional[pg.PlotCurveItem] = None
+        self.dirty = False
+
+
+class TrajectoryLayer:
+    """
+    Trayectoria lat/lon completa con simplificación adaptativa al zoom.
+
+    - append(lat, lon): O(1), guarda la posición y la simplifica al vuelo.
+    - render(): envía a pyqtgraph solo los bloques de dibujo modificados.
+    - ensure_visible(vb, lat, lon): re-encuadra si el punto salió de la vista.
+    - max_points: presupuesto de puntos dibujados (no limita lo guardado).
+    """
+
+    def __init__(self, max_points: int = 1000, chunk_points: int = CHUNK_POINTS):
+        self.chunk_points = max(2, int(chunk_points))
+        self.max_points = max(10, int(max_points))
+
+        # Vuelo completo
+        self._xy = np.empty((2, 4096), dtype=np.float64)
+        self._total = 0
+        self._bounds: Optional[List[float]] = None   # [lon_min, lon_max, lat_min, lat_max]
+
+        # Simplificación
+        self._base_cell = 0.0        # celda pedida por el zoom
+        self._cell = 0.0             # celda efectiva (>= base, por presupuesto)
+        self._last_cell: Optional[Tuple[float, float]] = None
+        self._last_kept = -1         # índice (en el vuelo) del último punto conservado
+        self._drawn = 0              # puntos dibujados (sin contar cortes)
+        self._cull: Optional[Tuple[float, float, float, float]] = None
+
+        # Dibujo
+        self._chunks: List[_Chunk] = []
+        self._used = 0               # bloques en uso (el último es el activo)
+        self._plot = None
+        self._vb = None
+        self._pen = None
+
+    # --- Datos ---------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __bool__(self) -> bool:
+        return self._total > 0
+
+    @property
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """(lon_min, lon_max, lat_min, lat_max) del vuelo completo."""
+        return tuple(self._bounds) if self._bounds is not None else None
+
+    @property
+    def last(self) -> Optional[Tuple[float, float]]:
+        """Última posición (lat, lon)."""
+        if not self._total:
+            return None
+        i = self._total - 1
+        return float(self._xy[1, i]), float(self._xy[0, i])
+
+    @property
+    def drawn_points(self) -> int:
+        """Puntos que se están dibujando tras la simplificación."""
+        return self._drawn
+
+    def append(self, lat: float, lon: float):
+        """Añade una posición (O(1) amortizado)."""
+        i = self._total
+        if i == self._xy.shape[1]:
+            grown = np.empty((2, 2 * i), dtype=np.float64)
+            grown[:, :i] = self._xy
+            self._xy = grown
+        self._xy[0, i] = lon
+        self._xy[1, i] = lat
+        self._total = i + 1
+
+        b = self._bounds
+        if b is None:
+            self._bounds = [lon, lon, lat, lat]
+        else:
+            if lon < b[0]:
+                b[0] = lon
+            elif lon > b[1]:
+                b[1] = lon
+            if lat < b[2]:
+                b[2] = lat
+            elif lat > b[3]:
+                b[3] = lat
+
+        cell = self._cell_of(lon, lat)
+        if cell != self._last_cell:
+            self._last_cell = cell
+            self._last_kept = i
+            self._push_drawn(lon, lat)
+            if self._drawn > self.max_points:
+                # Se excedió el presupuesto: celda más gruesa
+                self._rebuild(self._base_cell, coarser_than=self._cell)
+        elif self._used:
+            # Solo cambia la punta viva del bloque activo
+            self._chunks[self._used - 1].dirty = True
+
+    def extend(self, lats: np.ndarray, lons: np.ndarray):
+        """Añade muchas posiciones de una vez (p. ej. un vuelo grabado)."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        m = len(lats)
+        if m == 0:
+            return
+        n = self._total
+        if n + m > self._xy.shape[1]:
+            grown = np.empty((2, max(2 * self._xy.shape[1], n + m)), dtype=np.float64)
+            grown[:, :n] = self._xy[:, :n]
+            self._xy = grown
+        self._xy[0, n:n + m] = lons
+        self._xy[1, n:n + m] = lats
+        self._total = n + m
+        lo = [float(lons.min()), float(lats.min())]
+        hi = [float(lons.max()), float(lats.max())]
+        if self._bounds is None:
+            self._bounds = [lo[0], hi[0], lo[1], hi[1]]
+        else:
+            b = self._bounds
+            self._bounds = [min(b[0], lo[0]), max(b[1], hi[0]),
+                            min(b[2], lo[1]), max(b[3], hi[1])]
+        self._rebuild(self._base_cell)
+
+    def set_max_points(self, max_points: int):
+        self.max_points = max(10, int(max_points))
+        self._rebuild(self._base_cell)
+
+    def positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Copia (lats, lons) del vuelo completo."""
+        n = self._total
+        return self._xy[1, :n].copy(), self._xy[0, :n].copy()
+
+    def clear(self):
+        self._total = 0
+        self._bounds = None
+        self._last_cell = None
+        self._last_kept = -1
+        self._reset_drawn()
+
+    # --- Simplificación ------------------------------------------------
+
+    def _cell_of(self, lon: float, lat: float) -> Tuple[float, float]:
+        if self._cell <= 0.0:
+            return lon, lat
+        return math.floor(lon / self._cell), math.floor(lat / self._cell)
+
+    def _desired_cell(self) -> float:
+        """Celda (en grados) de ~CELL_PX pixeles para el zoom actual."""
+        if self._vb is None:
+            return 0.0
+        (x0, x1), (y0, y1) = self._vb.viewRange()
+        width = max(1.0, float(self._vb.width()) or 800.0)
+        height = max(1.0, float(self._vb.height()) or 600.0)
+        per_px = max((x1 - x0) / width, (y1 - y0) / height)
+        if not per_px > 0.0:
+            return 0.0
+        # Potencia de 2 para no recalcular con cada paso de la rueda
+        return 2.0 ** math.floor(math.log2(per_px * CELL_PX))
+
+    def _view_cull_rect(self) -> Optional[Tuple[float, float, float, float]]:
+        """Vista actual ampliada una pantalla hacia cada lado."""
+        if self._vb is None:
+            return None
+        (x0, x1), (y0, y1) = self._vb.viewRange()
+        dx, dy = x1 - x0, y1 - y0
+        return x0 - dx, x1 + dx, y0 - dy, y1 + dy
+
+    def _fallback_cell(self) -> float:
+        """Celda inicial cuando no hay zoom de referencia."""
+        if self._bounds is None:
+            return 1e-6
+        lon_min, lon_max, lat_min, lat_max = self._bounds
+        span = max(lon_max - lon_min, lat_max - lat_min)
+        return max(span / self.max_points, 1e-9)
+
+    def _rebuild(self, cell: float, coarser_than: float = 0.0):
+        """
+        Recalcula (vectorizado) los puntos dibujados. `cell` es la celda que
+        pide el zoom; se duplica hasta caber en el presupuesto (y, si se da
+        `coarser_than`, hasta superar esa celda).
+        """
+        self._base_cell = cell
+        self._cull = self._view_cull_rect()
+        n = self._total
+        self._reset_drawn()
+        if coarser_than > 0.0:
+            cell = max(cell, 2.0 * coarser_than)
+        elif cell <= 0.0 and n > self.max_points:
+            cell = self._fallback_cell()
+        self._cell = cell
+        if n == 0:
+            self._last_cell = None
+            return
+
+        x = self._xy[0, :n]
+        y = self._xy[1, :n]
+
+        # Recorte: puntos dentro del área ampliada y sus vecinos inmediatos
+        near = np.ones(n, dtype=bool)
+        if self._cull is not None:
+            cx0, cx1, cy0, cy1 = self._cull
+            inside = (x >= cx0) & (x <= cx1) & (y >= cy0) & (y <= cy1)
+            near = inside.copy()
+            near[1:] |= inside[:-1]
+            near[:-1] |= inside[1:]
+            near[-1] = True
+
+        while True:
+            if cell > 0.0:
+                ix = np.floor(x / cell)
+                iy = np.floor(y / cell)
+                keep = np.empty(n, dtype=bool)
+                keep[0] = True
+                keep[1:] = (ix[1:] != ix[:-1]) | (iy[1:] != iy[:-1])
+            else:
+                keep = np.ones(n, dtype=bool)
+            idx = np.flatnonzero(keep & near)
+            if len(idx) <= self.max_points:
+                break
+            cell = 2.0 * cell if cell > 0.0 else self._fallback_cell()
+        self._cell = cell
+
+        if len(idx) == 0:
+            self._last_cell = self._cell_of(float(x[-1]), float(y[-1]))
+            self._last_kept = n - 1
+            return
+
+        # Cortes (NaN) donde se descartaron tramos fuera del área
+        far = np.cumsum(~near)
+        gaps = np.flatnonzero(far[idx[1:] - 1] - far[idx[:-1]] > 0) + 1
+        lon = np.insert(x[idx], gaps, np.nan)
+        lat = np.insert(y[idx], gaps, np.nan)
+        for a in range(0, len(lon), self.chunk_points):
+            self._push_block(lon[a:a + self.chunk_points], lat[a:a + self.chunk_points])
+        self._drawn = len(idx)
+
+        last = int(idx[-1])
+        self._last_kept = last
+        self._last_cell = self._cell_of(float(x[last]), float(y[last]))
+
+    def _reset_drawn(self):
+        for c in self._chunks:
+            c.n = 0
+            c.dirty = True
+        self._used = 0
+        self._drawn = 0
+
+    def _active_chunk(self) -> _Chunk:
+        """Bloque con espacio libre (reutiliza los vaciados por _rebuild)."""
+        if self._used and self._chunks[self._used - 1].n < self.chunk_points:
+            return self._chunks[self._used - 1]
+        if self._used < len(self._chunks):
+            new = self._chunks[self._used]
+        else:
+            new = _Chunk(self.chunk_points)
+            self._chunks.append(new)
+        if self._used:
+            # Repetir el último punto para que los bloques queden unidos
+            prev = self._chunks[self._used - 1]
+            new.xy[:, 0] = prev.xy[:, prev.n - 1]
+            new.n = 1
+        self._used += 1
+        return new
+
+    def _push_drawn(self, lon: float, lat: float):
+        c = self._active_chunk()
+        c.xy[0, c.n] = lon
+        c.xy[1, c.n] = lat
+        c.n += 1
+        c.dirty = True
+        self._drawn += 1
+
+    def _push_block(self, lon: np.ndarray, lat: np.ndarray):
+        c = self._active_chunk()
+        m = min(len(lon), self.chunk_points - c.n)
+        c.xy[0, c.n:c.n + m] = lon[:m]
+        c.xy[1, c.n:c.n + m] = lat[:m]
+        c.n += m
+        c.dirty = True
+        if m < len(lon):
+            self._push_block(lon[m:], lat[m:])
+
+    # --- Dibujo --------------------------------------------------------
+
+    def attach(self, plot, pen):
+        """Asocia la capa a un PlotWidget y sigue sus cambios de zoom."""
+        self._plot = plot
+        self._vb = plot.plotItem.vb
+        self._pen = pen
+        for c in self._chunks:
+            c.item = None
+            c.dirty = True
+        self._vb.sigRangeChanged.connect(self._on_range_changed)
+
+    def detach(self):
+        """Quita las curvas del PlotWidget (la trayectoria se conserva)."""
+        if self._plot is None:
+            return
+        self._vb.sigRangeChanged.disconnect(self._on_range_changed)
+        for c in self._chunks:
+            if c.item is not None:
+                self._plot.removeItem(c.item)
+                c.item = None
+            c.dirty = True
+        self._plot = None
+        self._vb = None
+
+    def set_pen(self, pen):
+        self._pen = pen
+        for c in self._chunks:
+            if c.item is not None:
+                c.item.setPen(pen)
+
+    def _on_range_changed(self, *args):
+        """Re-simplifica solo si cambió el nivel de zoom o se salió del recorte."""
+        if not self._total:
+            return
+        cell = self._desired_cell()
+        cull = self._cull
+        if cell != self._base_cell:
+            self._rebuild(cell)
+        elif cull is not None:
+            (x0, x1), (y0, y1) = self._vb.viewRange()
+            if x0 < cull[0] or x1 > cull[1] or y0 < cull[2] or y1 > cull[3]:
+                self._rebuild(cell)
+        self.render()
+
+    def render(self):
+        """Envía a pyqtgraph solo los bloques nuevos o modificados."""
+        if self._plot is None:
+            return
+        if self._base_cell == 0.0 and self._total and self._vb.width() > 0:
+            self._rebuild(self._desired_cell())
+
+        last_used = self._used - 1
+        tip = self._total - 1
+        for k, c in enumerate(self._chunks):
+            if not c.dirty:
+                continue
+            if c.item is None:
+                c.item = pg.PlotCurveItem(pen=self._pen, connect="finite")
+                self._plot.addItem(c.item)
+            n = c.n
+            if k == last_used and tip > self._last_kept:
+                # Punta viva: une el último punto conservado con el UAV
+                c.xy[0, n] = self._xy[0, tip]
+                c.xy[1, n] = self._xy[1, tip]
+                n += 1
+            c.item.setData(c.xy[0, :n], c.xy[1, :n])
+            c.dirty = False
+
+    def ensure_visible(self, vb, lat: float, lon: float, padding: float = 0.12) -> bool:
+        """
+        Re-encuadra la vista a los límites del vuelo solo si el punto
+        (lat, lon) quedó fuera de la región visible.
+        """
+        if self._bounds is None or self._total < 2:
+            return False
+        (x0, x1), (y0, y1) = vb.viewRange()
+        if x0 <= lon <= x1 and y0 <= lat <= y1:
+            return False
+        lon_min, lon_max, lat_min, lat_max = self._bounds
+        # Evita rangos nulos (UAV quieto)
+        eps = 1e-6
+        vb.setRange(
+            xRange=(lon_min - eps, lon_max + eps),
+            yRange=(lat_min - eps, lat_max + eps),
+            padding=padding,
+        )
+        return True
@@ -0,0 +1,274 @@
+"""
+Almacén multirresolución (pirámide) para el historial largo de gráficas.
+
+Nivel 1x = anillo crudo (SeriesRing de la ventana principal). Sobre él se
+mantienen niveles agregados de 10x, 100x y 1000x muestras por cubeta, cada
+uno con mínimo, máximo y media por métrica. Se alimentan de forma
+incremental (una muestra a la vez, O(1), o un lote vectorizado): cuando
+se completa una cubeta de un nivel, ésta alimenta al siguiente.
+
+Para dibujar un vuelo completo se elige el nivel más fino que todavía
+conserva el inicio del rango visible (en vuelos largos los niveles finos
+ya descartaron lo más antiguo) y cuyo número de cubetas en ese rango cabe
+en el presupuesto de puntos, y se dibuja la envolvente mín/máx de esas
+cubetas precalculadas.
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+from interfaz.series import SeriesRing
+
+PYRAMID_STATS = ("min", "max", "mean")
+
+
+class _Accumulator:
+    """Cubeta en construcción de un nivel."""
+
+    __slots__ = ("children", "count", "t0", "t1", "mn", "mx", "sm")
+
+    def __init__(self, n_metrics: int):
+        self.mn = np.empty(n_metrics, dtype=np.float64)
+        self.mx = np.empty(n_metrics, dtype=np.float64)
+        self.sm = np.zeros(n_metrics, dtype=np.float64)
+        self.reset()
+
+    def reset(self):
+        self.children = 0   # hijos agregados (muestras o cubetas del nivel anterior)
+        self.count = 0      # muestras crudas totales
+        self.t0 = 0.0
+        self.t1 = 0.0
+        self.sm[:] = 0.0
+
+    def add(self, t0: float, t1: float, count: int,
+            mn: np.ndarray, mx: np.ndarray, sm: np.ndarray, children: int = 1):
+        if self.children == 0:
+            self.t0 = t0
+            self.mn[:] = mn
+            self.mx[:] = mx
+        else:
+            np.minimum(self.mn, mn, out=self.mn)
+            np.maximum(self.mx, mx, out=self.mx)
+        self.t1 = t1
+        self.sm += sm
+        self.count += count
+        self.children += children
+
+
+class SeriesPyramid:
+    """
+    Pirámide de agregados mín/máx/media para varias métricas sincronizadas.
+
+    - push(t, values): O(1) por muestra (values en el orden de `metrics`).
+    - extend(t, block): lote (n_métricas, n_muestras) vectorizado.
+    - envelope(metric, budget, t_from, t_to): envolvente (x, y) lista para
+      graficar desde el nivel agregado más fino que cabe en `budget`.
+    """
+
+    def __init__(self, metrics: Sequence[str], factors: Sequence[int] = (10, 100, 1000),
+                 capacity: int = 10_000):
+        factors = tuple(int(f) for f in factors)
+        if not factors or any(b % a for a, b in zip(factors, factors[1:])):
+            raise ValueError("Cada factor debe ser múltiplo del anterior")
+        self.metrics = tuple(metrics)
+        self.factors = factors
+        self.capacity = int(capacity)
+        self.total = 0   # muestras crudas recibidas
+
+        channels = ("t",) + tuple(
+            f"{m}:{stat}" for m in self.metrics for stat in PYRAMID_STATS
+        )
+        n = len(self.metrics)
+        self._levels = [SeriesRing(channels, capacity=self.capacity) for _ in factors]
+        self._acc = [_Accumulator(n) for _ in factors]
+        # Niveles cuyo anillo ya descartó cubetas (no cubren el inicio del vuelo)
+        self._truncated = [False] * len(factors)
+        # Hijos por cubeta en cada nivel (10 muestras, 10 cubetas de 10x, ...)
+        self._ratios = (factors[0],) + tuple(b // a for a, b in zip(factors, factors[1:]))
+        self._row = np.empty(len(channels), dtype=np.float64)
+
+    def clear(self):
+        self.total = 0
+        for ring, acc in zip(self._levels, self._acc):
+            ring.clear()
+            acc.reset()
+        self._truncated = [False] * len(self._levels)
+
+    def push(self, t: float, values: Sequence[float]):
+        """Agrega una muestra cruda."""
+        v = np.asarray(values, dtype=np.float64)
+        self.total += 1
+        self._feed(0, t, t, 1, v, v, v)
+
+    def extend(self, t: np.ndarray, block: np.ndarray):
+        """
+        Agrega un lote de muestras crudas: `t` (n,) y `block`
+        (n_métricas, n). Equivale a push() muestra a muestra.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        n = len(t)
+        if n == 0:
+            return
+        v = np.asarray(block, dtype=np.float64).T
+        self.total += n
+        self._feed_block(0, t, t, np.ones(n, dtype=np.int64), v, v, v)
+
+    def _feed_block(self, level: int, t0: np.ndarray, t1: np.ndarray, count: np.ndarray,
+                    mn: np.ndarray, mx: np.ndarray, sm: np.ndarray):
+        """
+        Versión por lotes de _feed: `mn`, `mx`, `sm` tienen forma
+        (n_hijos, n_métricas). Completa la cubeta en construcción, reduce
+        los grupos completos de un golpe y deja el resto en construcción.
+        """
+        acc = self._acc[level]
+        ratio = self._ratios[level]
+        n = len(t0)
+        done = []   # cubetas completas: (t0, t1, count, mn, mx, sm)
+
+        i = 0
+        if acc.children:
+            i = min(ratio - acc.children, n)
+            acc.add(t0[0], t1[i - 1], int(count[:i].sum()), mn[:i].min(axis=0),
+                    mx[:i].max(axis=0), sm[:i].sum(axis=0), children=i)
+            if acc.children == ratio:
+                done.append((
+                    np.array([acc.t0]), np.array([acc.t1]), np.array([acc.count]),
+                    acc.mn[None].copy(), acc.mx[None].copy(), acc.sm[None].copy(),
+                ))
+                acc.reset()
+
+        m = (n - i) // ratio
+        if m:
+            j = i + m * ratio
+            shape = (m, ratio, mn.shape[1])
+            done.append((
+                t0[i:j:ratio], t1[i + ratio - 1:j:ratio], count[i:j].reshape(m, ratio).sum(axis=1),
+                mn[i:j].reshape(shape).min(axis=1), mx[i:j].reshape(shape).max(axis=1),
+                sm[i:j].reshape(shape).sum(axis=1),
+            ))
+            i = j
+
+        if i < n:
+            acc.add(t0[i], t1[-1], int(count[i:].sum()), mn[i:].min(axis=0),
+                    mx[i:].max(axis=0), sm[i:].sum(axis=0), children=n - i)
+
+        if not done:
+            return
+        b_t0, b_t1, b_count, b_mn, b_mx, b_sm = (
+            np.concatenate(col) if len(done) > 1 else col[0] for col in zip(*done)
+        )
+        rows = np.empty((len(self._row), len(b_t0)), dtype=np.float64)
+        rows[0] = 0.5 * (b_t0 + b_t1)
+        rows[1::3] = b_mn.T
+        rows[2::3] = b_mx.T
+        rows[3::3] = (b_sm / b_count[:, None]).T
+        ring = self._levels[level]
+        if len(ring) + rows.shape[1] > ring.capacity:
+            self._truncated[level] = True
+        ring.extend(rows)
+
+        if level + 1 < len(self._levels):
+            self._feed_block(level + 1, b_t0, b_t1, b_count, b_mn, b_mx, b_sm)
+
+    def _feed(self, level: int, t0: float, t1: float, count: int,
+              mn: np.ndarray, mx: np.ndarray, sm: np.ndarray):
+        acc = self._acc[level]
+        acc.add(t0, t1, count, mn, mx, sm)
+        if acc.children < self._ratios[level]:
+            return
+
+        row = self._row
+        row[0] = 0.5 * (acc.t0 + acc.t1)
+        row[1::3] = acc.mn
+        row[2::3] = acc.mx
+        row[3::3] = acc.sm / acc.count
+        ring = self._levels[level]
+        if len(ring) == ring.capacity:
+            self._truncated[level] = True
+        ring.append(row)
+
+        if level + 1 < len(self._levels):
+            self._feed(level + 1, acc.t0, acc.t1, acc.count, acc.mn, acc.mx, acc.sm)
+        acc.reset()
+
+    def level_size(self, level: int) -> int:
+        return len(self._levels[level])
+
+    def _level_arrays(self, level: int, metric: str, stat: str):
+        ring = self._levels[level]
+        return ring.view("t"), ring.view(f"{metric}:{stat}")
+
+    def _partial(self, level: int, metric: str) -> Optional[Tuple[float, float, float, float]]:
+        """Cubeta en construcción (t, mín, máx, media) para no perder el extremo vivo."""
+        acc = self._acc[level]
+        if acc.children == 0:
+            return None
+        i = self.metrics.index(metric)
+        return 0.5 * (acc.t0 + acc.t1), acc.mn[i], acc.mx[i], acc.sm[i] / acc.count
+
+    def choose_level(self, budget: int, t_from: Optional[float] = None,
+                     t_to: Optional[float] = None) -> int:
+        """
+        Nivel más fino que cubre el inicio de [t_from, t_to] y cuyo número
+        de cubetas en ese rango cabe en `budget`; si ninguno, el más grueso.
+        """
+        budget = max(1, int(budget))
+        for level in range(len(self._levels)):
+            t = self._levels[level].view("t")
+            if not self._covers(level, t, t_from):
+                continue
+            lo, hi = _range_slice(t, t_from, t_to)
+            if hi - lo <= budget:
+                return level
+        return len(self._levels) - 1
+
+    def _covers(self, level: int, t: np.ndarray, t_from: Optional[float]) -> bool:
+        """¿El nivel conserva las cubetas desde `t_from` (None: desde el inicio)?"""
+        if not self._truncated[level]:
+            return True
+        return t_from is not None and len(t) > 0 and t[0] <= t_from
+
+    def envelope(self, metric: str, budget: int, t_from: Optional[float] = None,
+                 t_to: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Envolvente mín/máx de `metric` en el rango pedido: cada cubeta aporta
+        dos puntos (t, mín) y (t, máx). Incluye la cubeta en construcción.
+        """
+        level = self.choose_level(budget, t_from, t_to)
+        t, mn = self._level_arrays(level, metric, "min")
+        _, mx = self._level_arrays(level, metric, "max")
+        lo, hi = _range_slice(t, t_from, t_to)
+        t, mn, mx = t[lo:hi], mn[lo:hi], mx[lo:hi]
+
+        part = self._partial(level, metric)
+        if part is not None and (t_to is None or part[0] <= t_to):
+            t = np.append(t, part[0])
+            mn = np.append(mn, part[1])
+            mx = np.append(mx, part[2])
+
+        x = np.repeat(t, 2)
+        y = np.empty(2 * len(t), dtype=np.float64)
+        y[0::2] = mn
+        y[1::2] = mx
+        return x, y
+
+    def means(self, metric: str, budget: int, t_from: Optional[float] = None,
+              t_to: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Serie de medias por cubeta (mismo nivel que envelope())."""
+        level = self.choose_level(budget, t_from, t_to)
+        t, mean = self._level_arrays(level, metric, "mean")
+        lo, hi = _range_slice(t, t_from, t_to)
+        t, mean = t[lo:hi], mean[lo:hi]
+        part = self._partial(level, metric)
+        if part is not None and (t_to is None or part[0] <= t_to):
+            t = np.append(t, part[0])
+            mean = np.append(mean, part[3])
+        return t, mean
+
+
+def _range_slice(t: np.ndarray, t_from: Optional[float], t_to: Optional[float]) -> Tuple[int, int]:
+    """Índices [lo, hi) de `t` (creciente) dentro de [t_from, t_to]."""
+    lo = 0 if t_from is None else int(np.searchsorted(t, t_from, side="left"))
+    hi = len(t) if t_to is None else int(np.searchsorted(t, t_to, side="right"))
+    return lo, max(lo, hi)
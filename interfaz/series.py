@@ -0,0 +1,108 @@
+"""
+Almacén de series en anillo para las gráficas de telemetría.
+
+Cada canal (tiempo y métricas) vive en un arreglo NumPy float64 contiguo y
+preasignado. El anillo está "espejado": cada valor se escribe dos veces
+(posición i y posición i + capacidad), de modo que la ventana con las
+últimas n muestras siempre es un tramo contiguo del arreglo y puede
+entregarse a pyqtgraph como vista, sin copias ni conversiones a listas.
+"""
+
+from typing import Dict, Sequence
+
+import numpy as np
+
+
+class SeriesRing:
+    """
+    Anillo preasignado de varias series sincronizadas (una fila por canal).
+
+    - append(values): O(1), escribe una muestra en todos los canales.
+    - view(canal): vista contigua (sin copia) con las muestras en orden
+      cronológico, de la más antigua a la más reciente.
+
+    Las vistas apuntan a memoria que el anillo reutiliza: son válidas hasta
+    la siguiente escritura. Si se necesita conservarlas, usar .copy().
+    """
+
+    def __init__(self, channels: Sequence[str], capacity: int = 100_000):
+        if not channels:
+            raise ValueError("SeriesRing necesita al menos un canal")
+        self.channels = tuple(channels)
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.channels)}
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros((len(self.channels), 2 * self.capacity), dtype=np.float64)
+        self._head = 0      # siguiente posición de escritura en [0, capacity)
+        self._count = 0     # muestras válidas (<= capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def clear(self):
+        """Vacía el anillo (sin liberar memoria)."""
+        self._head = 0
+        self._count = 0
+
+    def append(self, values: Sequence[float]):
+        """Añade una muestra; `values` sigue el orden de `channels`."""
+        h = self._head
+        self._data[:, h] = values
+        self._data[:, h + self.capacity] = values
+        self._head = h + 1 if h + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def extend(self, block: np.ndarray):
+        """
+        Añade un bloque de muestras de forma vectorizada.
+        `block` tiene forma (n_canales, n_muestras).
+        """
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[0] != len(self.channels):
+            raise ValueError("El bloque debe tener forma (n_canales, n_muestras)")
+        n = block.shape[1]
+        if n == 0:
+            return
+        cap = self.capacity
+        if n >= cap:
+            # Solo cuentan las últimas `capacity` muestras
+            block = block[:, -cap:]
+            self._data[:, :cap] = block
+            self._data[:, cap:] = block
+            self._head = 0
+            self._count = cap
+            return
+        h = self._head
+        first = min(n, cap - h)
+        self._data[:, h:h + first] = block[:, :first]
+        self._data[:, h + cap:h + cap + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self._data[:, :rest] = block[:, first:]
+            self._data[:, cap:cap + rest] = block[:, first:]
+        self._head = (h + n) % cap
+        self._count = min(cap, self._count + n)
+
+    def _start(self) -> int:
+        return (self._head - self._count) % self.capacity
+
+    def view(self, channel: str) -> np.ndarray:
+        """Vista contigua (sin copia) de un canal en orden cronológico."""
+        i = self._index[channel]
+        start = self._start()
+        return self._data[i, start:start + self._count]
+
+    def views(self) -> np.ndarray:
+        """Vista (n_canales, n_muestras) de todos los canales."""
+        start = self._start()
+        return self._data[:, start:start + self._count]
+
+    def last(self, channel: str) -> float:
+        """Último valor de un canal (lanza IndexError si está vacío)."""
+        if not self._count:
+            raise IndexError("SeriesRing vacío")
+        i = self._index[channel]
+        return float(self._data[i, (self._head - 1) % self.capacity])
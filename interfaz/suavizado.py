@@ -0,0 +1,237 @@
+"""
+Motor de suavizado para las gráficas de telemetría.
+
+Filtros causales (solo usan muestras pasadas, igual que se ven en vivo):
+- Media móvil ("ma"): suma acumulada, O(n) vectorizado.
+- Media móvil exponencial ("ema"): recurrencia evaluada por bloques, O(n).
+- Mediana móvil ("median"): ventanas deslizantes de NumPy.
+
+SmoothingEngine mantiene la serie suavizada en su propio anillo y la
+actualiza de forma incremental, independiente del largo del buffer: la
+media móvil lleva una suma corrida (O(1) por muestra), la EMA solo su
+último valor y la mediana su ventana (O(ventana)). Los lotes (extend) se
+suavizan vectorizados con los mismos filtros de arriba. El recálculo
+completo solo ocurre al cambiar de filtro o de ventana.
+"""
+
+from typing import Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from interfaz.series import SeriesRing
+
+SMOOTHING_MODES = ("ma", "ema", "median")
+
+# Tamaño de bloque para la EMA vectorizada. Con ventana >= 2, (1 - alpha)
+# es >= 1/3, así que (1 - alpha) ** -64 cabe de sobra en float64.
+_EMA_BLOCK = 64
+
+
+def ema_alpha(window: int) -> float:
+    """Factor alpha equivalente a una media móvil de `window` muestras."""
+    return 2.0 / (max(1, int(window)) + 1.0)
+
+
+def moving_average(x: np.ndarray, window: int) -> np.ndarray:
+    """Media móvil causal; al inicio promedia solo las muestras disponibles."""
+    x = np.asarray(x, dtype=np.float64)
+    w = max(1, int(window))
+    if w == 1 or len(x) == 0:
+        return x.copy()
+    c = np.cumsum(x)
+    out = np.empty_like(x)
+    head = min(w, len(x))
+    out[:head] = c[:head] / np.arange(1, head + 1)
+    if len(x) > w:
+        out[w:] = (c[w:] - c[:-w]) / w
+    return out
+
+
+def ema(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    EMA causal y[k] = y[k-1] + alpha * (x[k] - y[k-1]), con y[0] = x[0].
+    Dentro de cada bloque la recurrencia se resuelve en forma cerrada con
+    una suma acumulada; solo se itera en Python una vez por bloque.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+    if n == 0 or alpha >= 1.0:
+        return x.copy()
+    alpha = max(1e-6, float(alpha))
+    r = 1.0 - alpha
+    k = np.arange(_EMA_BLOCK, dtype=np.float64)
+    pw = r ** k
+    inv = r ** -k
+    out = np.empty_like(x)
+    prev = x[0]
+    for s in range(0, n, _EMA_BLOCK):
+        xb = x[s:s + _EMA_BLOCK]
+        m = len(xb)
+        acc = np.cumsum(xb * inv[:m]) * pw[:m]
+        yb = r * pw[:m] * prev + alpha * acc
+        out[s:s + m] = yb
+        prev = yb[-1]
+    return out
+
+
+def median_filter(x: np.ndarray, window: int) -> np.ndarray:
+    """Mediana móvil causal; al inicio usa solo las muestras disponibles."""
+    x = np.asarray(x, dtype=np.float64)
+    w = max(1, int(window))
+    n = len(x)
+    if w == 1 or n == 0:
+        return x.copy()
+    out = np.empty_like(x)
+    head = min(w - 1, n)
+    for i in range(head):
+        out[i] = np.median(x[:i + 1])
+    if n >= w:
+        out[w - 1:] = np.median(sliding_window_view(x, w), axis=1)
+    return out
+
+
+def smooth(x: np.ndarray, mode: str, window: int) -> np.ndarray:
+    """Aplica el filtro `mode` a una serie completa."""
+    if mode == "ma":
+        return moving_average(x, window)
+    if mode == "ema":
+        return ema(x, ema_alpha(window))
+    if mode == "median":
+        return median_filter(x, window)
+    raise ValueError(f"Modo de suavizado desconocido: {mode!r}")
+
+
+class SmoothingEngine:
+    """
+    Serie suavizada incremental para varios canales sincronizados.
+
+    - push(values): O(1) por muestra (ma, ema), O(ventana) en median.
+    - extend(block): lote (n_canales, n_muestras) vectorizado.
+    - rebuild(raw): recálculo vectorizado a partir del anillo crudo.
+    - view(canal): vista contigua de la serie suavizada.
+    """
+
+    def __init__(self, channels: Sequence[str], capacity: int,
+                 mode: str = "ma", window: int = 5):
+        if mode not in SMOOTHING_MODES:
+            raise ValueError(f"Modo de suavizado desconocido: {mode!r}")
+        self.channels = tuple(channels)
+        self.mode = mode
+        self.window = max(1, int(window))
+        self._out = SeriesRing(self.channels, capacity=capacity)
+        self._reset_state()
+
+    def _reset_state(self):
+        # Ventana circular de las últimas muestras crudas (ma / median)
+        self._win = np.zeros((self.window, len(self.channels)), dtype=np.float64)
+        self._win_pos = 0
+        self._win_count = 0
+        # Suma corrida de la ventana (ma); se resincroniza en cada vuelta
+        self._win_sum = np.zeros(len(self.channels), dtype=np.float64)
+        self._ema_prev = None
+
+    def __len__(self) -> int:
+        return len(self._out)
+
+    def configure(self, mode: str, window: int):
+        """Cambia filtro / ventana. Requiere rebuild() para recalcular."""
+        if mode not in SMOOTHING_MODES:
+            raise ValueError(f"Modo de suavizado desconocido: {mode!r}")
+        self.mode = mode
+        self.window = max(1, int(window))
+        self._reset_state()
+
+    def push(self, values: Sequence[float]):
+        """Añade una muestra cruda (orden de `channels`) y guarda la suavizada."""
+        if self.mode == "ema":
+            v = np.asarray(values, dtype=np.float64)
+            if self._ema_prev is None:
+                y = v
+            else:
+                y = self._ema_prev + ema_alpha(self.window) * (v - self._ema_prev)
+            self._ema_prev = y
+            self._out.append(y)
+            return
+
+        pos = self._win_pos
+        if self._win_count == self.window:
+            self._win_sum -= self._win[pos]
+        else:
+            self._win_count += 1
+        self._win[pos] = values
+        self._win_sum += self._win[pos]
+        self._win_pos = (pos + 1) % self.window
+        if self._win_pos == 0:
+            # Evita que el error de redondeo de la suma corrida se acumule
+            self._win_sum = self._win.sum(axis=0)
+        if self.mode == "ma":
+            self._out.append(self._win_sum / self._win_count)
+        else:
+            self._out.append(np.median(self._win[:self._win_count], axis=0))
+
+    def extend(self, block: np.ndarray):
+        """
+        Añade un lote crudo (n_canales, n_muestras) de forma vectorizada.
+        Equivale a push() muestra a muestra: la ventana pendiente (o el
+        último valor de la EMA) se antepone al lote antes de filtrar.
+        """
+        block = np.asarray(block, dtype=np.float64)
+        n = block.shape[1]
+        if n == 0:
+            return
+        if self.mode == "ema":
+            head = block[:, :1] if self._ema_prev is None else self._ema_prev[:, None]
+            alpha = ema_alpha(self.window)
+            out = np.empty_like(block)
+            for i in range(len(self.channels)):
+                out[i] = ema(np.concatenate((head[i], block[i])), alpha)[1:]
+            self._ema_prev = out[:, -1].copy()
+            self._out.extend(out)
+            return
+
+        full = np.concatenate((self._window_tail().T, block), axis=1)
+        k = full.shape[1] - n
+        out = np.empty_like(block)
+        for i in range(len(self.channels)):
+            out[i] = smooth(full[i], self.mode, self.window)[k:]
+        self._out.extend(out)
+        self._set_window(full[:, -min(self.window, full.shape[1]):].T)
+
+    def _window_tail(self) -> np.ndarray:
+        """Ventana cruda pendiente (n, n_canales), de la más antigua a la más nueva."""
+        if self._win_count < self.window:
+            return self._win[:self._win_count]
+        return np.roll(self._win, -self._win_pos, axis=0)
+
+    def _set_window(self, tail: np.ndarray):
+        """Carga la ventana (n <= ventana, n_canales) en orden cronológico."""
+        m = len(tail)
+        self._win[:m] = tail
+        self._win_pos = m % self.window
+        self._win_count = m
+        self._win_sum = tail.sum(axis=0)
+
+    def rebuild(self, raw: SeriesRing):
+        """Recalcula toda la serie suavizada a partir del anillo crudo."""
+        self._out.clear()
+        self._reset_state()
+        n = len(raw)
+        if n == 0:
+            return
+        block = np.empty((len(self.channels), n), dtype=np.float64)
+        for i, ch in enumerate(self.channels):
+            block[i] = smooth(raw.view(ch), self.mode, self.window)
+        self._out.extend(block)
+
+        # Estado incremental coherente con el final de la serie
+        if self.mode == "ema":
+            self._ema_prev = block[:, -1].copy()
+        else:
+            tail = min(self.window, n)
+            self._set_window(
+                np.stack([raw.view(ch)[-tail:] for ch in self.channels], axis=1)
+            )
+
+    def view(self, channel: str) -> np.ndarray:
+        return self._out.view(channel)
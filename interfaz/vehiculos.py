@@ -0,0 +1,304 @@
+"""
+Registro de vehículos: un pipeline de telemetría independiente por aeronave.
+
+Cada Vehicle reúne lo que la ventana principal tenía una sola vez: el
+backend y la tarea asyncio que lo consume, el puente de muestras, los
+buffers de gráficas (anillo, pirámide de agregados, suavizado), la
+trayectoria del mapa, el tiempo de vuelo y su partición del historial
+(un HistorialDB propio sobre la misma base principal, o sea un archivo
+de vuelo y un hilo escritor por vehículo) con su bitácora binaria.
+
+Todos los backends corren en el mismo bucle de eventos. La UI drena los
+puentes de todos los vehículos en el mismo tick: la ingesta (buffers, BD,
+bitácora) se hace para cada uno, los widgets solo para el vehículo
+activo, y el mapa superpone todas las trayectorias. Con 8 vehículos a
+10 Hz llegan ~1-2 muestras por tick de 16 ms en total, así que el costo
+por tick lo domina el dibujo del vehículo activo, no el número de
+vehículos.
+"""
+
+import threading
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from telemetria.telemetria import TelemetryBatch, TelemetrySample
+from telemetria.historial import HistorialDB
+from telemetria.bitacora import FlightLogWriter
+from interfaz.series import SeriesRing
+from interfaz.suavizado import SmoothingEngine
+from interfaz.piramide import SeriesPyramid
+from interfaz.mapa import TrajectoryLayer
+
+# Canales del almacén de series de gráficas (orden fijo)
+GRAPH_CHANNELS = ("t", "alt", "spd", "vbat", "tmp", "pres", "hum")
+# Campo de TelemetrySample de cada canal (tras "t")
+GRAPH_FIELDS = ("rel_alt_m", "groundspeed_ms", "voltage_v", "temp_c", "pres_hpa", "hum_pct")
+
+# Color de la trayectoria de los vehículos 2, 3, ... (el 1 usa el acento del tema)
+VEHICLE_COLORS = (
+    "#0A84FF", "#30D158", "#BF5AF2", "#FFD60A", "#FF2D55", "#5AC8FA", "#A2845E", "#8E8E93",
+)
+
+
+class SampleBridge:
+    """
+    Puente por lotes entre los backends y el hilo de UI.
+    Los backends empujan muestras a un anillo acotado y la UI lo drena en
+    un tick periódico (alineado a frame), de modo que el trabajo de widgets
+    se hace una vez por lote y no una vez por muestra.
+    Si la UI se atrasa, el anillo descarta las muestras más antiguas.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(1, int(capacity))
+        self._ring: deque = deque(maxlen=self.capacity)
+        self._lock = threading.Lock()
+
+        # Métricas del puente
+        self.pushed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_batch = 0
+
+    def push(self, sample: TelemetrySample):
+        """Encola una muestra (llamado desde el backend)."""
+        with self._lock:
+            if len(self._ring) == self.capacity:
+                self.dropped += 1
+            self._ring.append(sample)
+            self.pushed += 1
+
+    def drain(self) -> List[TelemetrySample]:
+        """Devuelve y vacía todas las muestras pendientes (más antigua primero)."""
+        with self._lock:
+            if not self._ring:
+                return []
+            batch = list(self._ring)
+            self._ring.clear()
+        self.batches += 1
+        self.max_batch = max(self.max_batch, len(batch))
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+
+class Vehicle:
+    """
+    Pipeline de un vehículo: enlace, buffers, trayectoria y vuelo en curso.
+
+    `db` es su partición del historial. `owns_db` indica si el vehículo
+    la cierra al quitarse (el vehículo 1 escribe en la base de la ventana,
+    que también sirve al historial).
+    """
+
+    def __init__(self, vid: int, name: str, db: HistorialDB, owns_db: bool,
+                 graph_capacity: int = 100_000, map_max_points: int = 1000,
+                 smooth_mode: str = "ma", smooth_window: int = 5,
+                 bridge_capacity: int = 4096):
+        self.vid = vid
+        self.name = name
+        self.db = db
+        self.owns_db = owns_db
+
+        # Enlace
+        self.source = "DEMO"
+        self.endpoint = ""
+        self.backend = None
+        self.task = None                 # asyncio.Task que consume el backend
+        self.connected = False
+        self.reconnect_attempts = 0
+        self.bridge = SampleBridge(capacity=bridge_capacity)
+
+        # Buffers de gráficas
+        self.graph_series = SeriesRing(GRAPH_CHANNELS, capacity=graph_capacity)
+        self.graph_pyramid = SeriesPyramid(GRAPH_CHANNELS[1:])
+        self.graph_smoother = SmoothingEngine(
+            GRAPH_CHANNELS[1:], capacity=graph_capacity, mode=smooth_mode, window=smooth_window,
+        )
+
+        # Mapa
+        self.map_track = TrajectoryLayer(max_points=map_max_points)
+        self.map_home: Optional[Tuple[float, float]] = None
+
+        # Vuelo
+        self.flight_log: Optional[FlightLogWriter] = None
+        self.flight_time_s = 0.0
+        self.last_time_s: Optional[float] = None
+        self.last_sample: Optional[TelemetrySample] = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name} ({self.source})" if self.backend is not None else self.name
+
+    def start_flight(self, source: str) -> int:
+        """Abre un vuelo nuevo en su partición, con su bitácora binaria."""
+        self.source = source
+        flight_id = self.db.start_flight(source, self.name)
+        if self.flight_log is not None:
+            self.flight_log.close()
+        self.flight_log = FlightLogWriter(self.db.flight_file(flight_id, ".bin"), source)
+        return flight_id
+
+    def clear_history(self, keep: Sequence[int] = ()):
+        """
+        Limpia el historial de su partición (HistorialDB.clear). La bitácora
+        del vuelo en curso se cierra antes (clear() borra los archivos del
+        vuelo anterior) y se reabre sobre el vuelo que queda en curso.
+        """
+        recording = self.flight_log is not None
+        if recording:
+            self.flight_log.close()
+            self.flight_log = None
+        try:
+            self.db.clear(keep=keep)
+        finally:
+            flight_id = self.db.current_flight
+            if recording and flight_id is not None:
+                self.flight_log = FlightLogWriter(self.db.flight_file(flight_id, ".bin"), self.source)
+
+    def ingest(self, batch: TelemetryBatch, smooth: bool = False):
+        """
+        Trabajo por lote (sin tocar widgets), columna a columna:
+        - Tiempo de vuelo acumulado.
+        - Buffers de gráficas (un extend vectorizado).
+        - Trayectoria del mapa.
+        - Registro en la base de datos y la bitácora.
+        """
+        n = len(batch)
+        if not n:
+            return
+        self.last_sample = batch.sample(n - 1)
+
+        # Tiempo relativo de cada muestra (sin tiempo: sigue a la anterior + 1 s)
+        t_col = batch.column("time_s")
+        if None in t_col:
+            prev = self.graph_series.last("t") if self.graph_series else -1.0
+            fixed = []
+            for v in t_col:
+                prev = prev + 1 if v is None else v
+                fixed.append(prev)
+            t = np.asarray(fixed, dtype=np.float64)
+        else:
+            t = np.asarray(t_col, dtype=np.float64)
+
+        # Tiempo de vuelo (suma solo cuando está en aire y el salto es < 10 s)
+        in_air = np.fromiter((bool(v) for v in batch.column("in_air")), dtype=bool, count=n)
+        prev_t = t[0] if self.last_time_s is None else self.last_time_s
+        dt = np.diff(t, prepend=prev_t).clip(min=0.0)
+        self.flight_time_s += float(dt[(dt < 10.0) & in_air].sum())
+        self.last_time_s = float(t[-1])
+
+        # Buffers para gráficas (orden de GRAPH_CHANNELS)
+        block = np.empty((len(GRAPH_CHANNELS), n), dtype=np.float64)
+        block[0] = t
+        for row, name in enumerate(GRAPH_FIELDS, start=1):
+            block[row] = batch.array(name, fill=0.0)
+        self.graph_series.extend(block)
+        self.graph_pyramid.extend(t, block[1:])
+        if smooth:
+            self.graph_smoother.extend(block[1:])
+
+        # Trayectoria (se guarda siempre; el redibujo depende de la pestaña)
+        for lat, lon in zip(batch.column("lat_deg"), batch.column("lon_deg")):
+            lat = lat or 0.0
+            lon = lon or 0.0
+            if not (lat == 0.0 and lon == 0.0):
+                if self.map_home is None:
+                    self.map_home = (lat, lon)
+                self.map_track.append(lat, lon)
+
+        # Guardar en BD (un elemento de cola por lote) y bitácora
+        self.db.append_batch(self.source, batch)
+        if self.flight_log is not None:
+            self.flight_log.append_batch(batch)
+
+    def stop(self):
+        """
+        Suelta el backend y la tarea que lo consume, y devuelve la corrutina
+        que los detiene. Se suelta en el momento (no al correr la corrutina)
+        para que un backend nuevo asignado después no se detenga por error.
+        """
+        backend, task = self.backend, self.task
+        self.backend = None
+        self.task = None
+        self.connected = False
+        return _stop_link(backend, task)
+
+    def close(self):
+        """Cierra la bitácora y, si es propia, la partición del historial."""
+        if self.flight_log is not None:
+            self.flight_log.close()
+            self.flight_log = None
+        if self.owns_db:
+            self.db.close()
+
+
+async def _stop_link(backend, task):
+    if backend is not None and hasattr(backend, "stop"):
+        await backend.stop()
+    if task is not None and not task.done():
+        task.cancel()
+
+
+class VehicleRegistry:
+    """
+    Vehículos de la sesión, en orden de alta, y cuál es el activo (el que
+    muestran dashboard, gráficas y HUD). El primero no se puede quitar.
+    """
+
+    def __init__(self):
+        self._vehicles: Dict[int, Vehicle] = {}
+        self._next_id = 1
+        self.active_id: Optional[int] = None
+
+    def next_id(self) -> int:
+        vid = self._next_id
+        self._next_id += 1
+        return vid
+
+    def add(self, vehicle: Vehicle) -> Vehicle:
+        self._vehicles[vehicle.vid] = vehicle
+        if self.active_id is None:
+            self.active_id = vehicle.vid
+        return vehicle
+
+    def remove(self, vid: int) -> Vehicle:
+        if vid == self.primary.vid:
+            raise ValueError("No se puede quitar el vehículo principal")
+        vehicle = self._vehicles.pop(vid)
+        if self.active_id == vid:
+            self.active_id = self.primary.vid
+        return vehicle
+
+    def get(self, vid: int) -> Vehicle:
+        return self._vehicles[vid]
+
+    @property
+    def primary(self) -> Vehicle:
+        return next(iter(self._vehicles.values()))
+
+    @property
+    def active(self) -> Vehicle:
+        return self._vehicles[self.active_id]
+
+    def set_active(self, vid: int) -> Vehicle:
+        if vid not in self._vehicles:
+            raise KeyError(f"Vehículo desconocido: {vid}")
+        self.active_id = vid
+        return self._vehicles[vid]
+
+    def active_flights(self) -> List[int]:
+        """Vuelos que algún vehículo está grabando."""
+        return [v.db.current_flight for v in self if v.db.current_flight is not None]
+
+    def __iter__(self) -> Iterator[Vehicle]:
+        return iter(list(self._vehicles.values()))
+
+    def __len__(self) -> int:
+        return len(self._vehicles)
+
+    def __contains__(self, vid: int) -> bool:
+        return vid in self._vehicles
@@ -0,0 +1,339 @@
+"""
+Bitácora binaria de vuelo: registros de tamaño fijo, solo anexar.
+
+Complementa al historial SQLite para grabar a alta frecuencia. Cada
+TelemetrySample ocupa un registro de RECORD_SIZE bytes (little-endian):
+reales en float64/float32, estado en enteros de 1 byte y un mapa de bits
+de nulos para los campos Optional. No se guarda raw_line ni se formatean
+fechas: la hora de recepción va como segundos Unix (float64).
+
+Formato de archivo:
+    cabecera (HEADER_SIZE bytes): magic, versión, tamaño de registro,
+                                  hora Unix de inicio, fuente
+    registros RECORD_DTYPE uno tras otro
+
+La escritura empaqueta con struct en un búfer y lo vuelca a disco por
+bloques. La lectura (FlightLogReader) mapea el archivo en memoria como
+arreglo estructurado de NumPy, sin copiar ni parsear.
+"""
+
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from telemetria.telemetria import TelemetryBatch, TelemetrySample
+
+MAGIC = b"UAVLOG\x00\x01"
+VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<8sHHd32s")   # magic, versión, registro, inicio, fuente
+
+# Campos de TelemetrySample en el registro: (nombre, tipo NumPy)
+LOG_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("time_s", "<f8"),
+    ("lat_deg", "<f8"),
+    ("lon_deg", "<f8"),
+    ("abs_alt_m", "<f4"),
+    ("rel_alt_m", "<f4"),
+    ("roll_deg", "<f4"),
+    ("pitch_deg", "<f4"),
+    ("yaw_deg", "<f4"),
+    ("vx_ms", "<f4"),
+    ("vy_ms", "<f4"),
+    ("vz_ms", "<f4"),
+    ("groundspeed_ms", "<f4"),
+    ("voltage_v", "<f4"),
+    ("battery_percent", "<f4"),
+    ("temp_c", "<f4"),
+    ("hum_pct", "<f4"),
+    ("pres_hpa", "<f4"),
+    ("rad_mwcm2", "<f4"),
+    ("acc_ms2", "<f4"),
+    ("flight_mode", "u1"),
+    ("in_air", "u1"),
+    ("gps_fix_type", "u1"),
+    ("num_sat", "u1"),
+)
+LOG_FIELD_NAMES = tuple(name for name, _ in LOG_FIELDS)
+
+RECORD_DTYPE = np.dtype(
+    [("recv_unix", "<f8"), ("nulls", "<u4")] + [(n, t) for n, t in LOG_FIELDS]
+)
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+# Mismo diseño que RECORD_DTYPE, para empaquetar sin NumPy por muestra
+_STRUCT_CODES = {"<f8": "d", "<f4": "f", "u1": "B"}
+_RECORD = struct.Struct("<dI" + "".join(_STRUCT_CODES[t] for _, t in LOG_FIELDS))
+assert _RECORD.size == RECORD_SIZE
+
+# Modos de vuelo codificados en 1 byte (nombres de MAVSDK + fuentes propias)
+FLIGHT_MODES = (
+    "UNKNOWN", "READY", "TAKEOFF", "HOLD", "MISSION", "RETURN_TO_LAUNCH", "LAND",
+    "OFFBOARD", "FOLLOW_ME", "MANUAL", "ALTCTL", "POSCTL", "ACRO", "STABILIZED",
+    "RATTITUDE", "DEMO", "LORA",
+)
+_MODE_CODE: Dict[str, int] = {m: i for i, m in enumerate(FLIGHT_MODES)}
+MODE_OTHER = 255   # modo no listado (se lee como "UNKNOWN")
+
+_FLOAT_FIELDS = tuple(n for n, t in LOG_FIELDS if t != "u1")
+
+
+def _header(start_unix: float, fuente: str) -> bytes:
+    raw = _HEADER.pack(MAGIC, VERSION, RECORD_SIZE, start_unix,
+                       fuente.encode("utf-8")[:32])
+    return raw.ljust(HEADER_SIZE, b"\x00")
+
+
+class FlightLogWriter:
+    """
+    Escritor de bitácora binaria (solo anexar).
+
+    append(sample) empaqueta el registro en un búfer preasignado; el búfer
+    se vuelca al archivo cada `buffer_records` registros o con flush().
+    """
+
+    def __init__(self, path: Path, fuente: str = "", buffer_records: int = 256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        if not new:
+            _read_header(self.path)   # valida que sea una bitácora compatible
+            # Descarta un registro a medio escribir (corte de energía, etc.)
+            size = self.path.stat().st_size
+            tail = (size - HEADER_SIZE) % RECORD_SIZE
+            if tail:
+                with open(self.path, "r+b") as f:
+                    f.truncate(size - tail)
+        self._f = open(self.path, "ab")
+        if new:
+            self._f.write(_header(time.time(), fuente))
+        self.buffer_records = max(1, int(buffer_records))
+        self._buf = bytearray(RECORD_SIZE * self.buffer_records)
+        self._n = 0
+        self.records = 0
+
+    def append(self, s: TelemetrySample, recv_unix: Optional[float] = None):
+        """Añade una muestra (sin formatear texto ni tocar disco salvo al llenar el búfer)."""
+        nulls = 0
+        values = []
+        bit = 1
+        for name in _FLOAT_FIELDS:
+            v = getattr(s, name, None)
+            if v is None:
+                nulls |= bit
+                v = 0.0
+            values.append(v)
+            bit <<= 1
+
+        mode = getattr(s, "flight_mode", None)
+        if mode is None:
+            nulls |= bit
+            code = 0
+        else:
+            code = _MODE_CODE.get(mode, MODE_OTHER)
+        bit <<= 1
+        ints = [code]
+        for name in ("in_air", "gps_fix_type", "num_sat"):
+            v = getattr(s, name, None)
+            if v is None:
+                nulls |= bit
+                v = 0
+            ints.append(int(v) & 0xFF)
+            bit <<= 1
+
+        _RECORD.pack_into(
+            self._buf, self._n * RECORD_SIZE,
+            time.time() if recv_unix is None else recv_unix, nulls, *values, *ints,
+        )
+        self._n += 1
+        self.records += 1
+        if self._n == self.buffer_records:
+            self.flush()
+
+    def append_batch(self, batch: TelemetryBatch, recv_unix: Optional[float] = None):
+        """
+        Añade un lote de una vez: arma los registros como arreglo
+        estructurado (columna a columna, con NumPy) y los escribe tras lo
+        que hubiera en el búfer.
+        """
+        n = len(batch)
+        if not n:
+            return
+        rec = np.zeros(n, dtype=RECORD_DTYPE)
+        rec["recv_unix"] = time.time() if recv_unix is None else recv_unix
+        nulls = np.zeros(n, dtype=np.uint32)
+        bit = 1
+        for name in _FLOAT_FIELDS:
+            mask = batch.null_mask(name)
+            nulls[mask] |= np.uint32(bit)
+            rec[name] = batch.array(name, fill=0.0)
+            bit <<= 1
+
+        modes = batch.column("flight_mode")
+        rec["flight_mode"] = [0 if m is None else _MODE_CODE.get(m, MODE_OTHER) for m in modes]
+        nulls[batch.null_mask("flight_mode")] |= np.uint32(bit)
+        bit <<= 1
+        for name in ("in_air", "gps_fix_type", "num_sat"):
+            rec[name] = [0 if v is None else int(v) & 0xFF for v in batch.column(name)]
+            nulls[batch.null_mask(name)] |= np.uint32(bit)
+            bit <<= 1
+        rec["nulls"] = nulls
+
+        self.flush()
+        self._f.write(rec.tobytes())
+        self.records += n
+
+    def flush(self):
+        """Vuelca el búfer al archivo."""
+        if self._n:
+            self._f.write(memoryview(self._buf)[:self._n * RECORD_SIZE])
+            self._n = 0
+        self._f.flush()
+
+    def close(self):
+        if self._f.closed:
+            return
+        self.flush()
+        self._f.close()
+
+
+def _read_header(path: Path) -> Tuple[float, str]:
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE:
+        raise ValueError(f"{path}: bitácora incompleta")
+    magic, version, rec_size, start, fuente = _HEADER.unpack_from(raw)
+    if magic != MAGIC or version != VERSION or rec_size != RECORD_SIZE:
+        raise ValueError(f"{path}: formato de bitácora no compatible")
+    return start, fuente.rstrip(b"\x00").decode("utf-8", "replace")
+
+
+class FlightLogReader:
+    """
+    Lectura de una bitácora mapeada en memoria.
+
+    - records: arreglo estructurado (RECORD_DTYPE) sobre el archivo.
+    - column(nombre): vista de un campo; column(nombre, nan=True) devuelve
+      float64 con NaN donde el campo era nulo.
+    - sample(i): reconstruye el TelemetrySample i.
+    - index_at(t) / sample_at(t) / window(...): acceso por tiempo con
+      búsqueda binaria, O(log n).
+
+    Un registro a medio escribir al final del archivo se ignora.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.start_unix, self.fuente = _read_header(self.path)
+        n = (self.path.stat().st_size - HEADER_SIZE) // RECORD_SIZE
+        if n > 0:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                                     offset=HEADER_SIZE, shape=(n,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._order: Optional[np.ndarray] = None
+        self._sorted_t: Optional[np.ndarray] = None
+
+    def _time_index(self) -> np.ndarray:
+        """
+        Tiempos ordenados para la búsqueda binaria. Si time_s ya es creciente
+        (lo normal) es la propia columna mapeada; si no (reinicio del reloj
+        del enlace), se ordena una vez y se guarda la permutación.
+        """
+        if self._sorted_t is None:
+            t = self.records["time_s"]
+            if len(t) < 2 or bool(np.all(t[1:] >= t[:-1])):
+                self._sorted_t = t
+            else:
+                self._order = np.argsort(t, kind="stable")
+                self._sorted_t = t[self._order]
+        return self._sorted_t
+
+    @property
+    def t_range(self) -> Tuple[float, float]:
+        """(t_min, t_max) del vuelo; (0, 0) si está vacío."""
+        t = self._time_index()
+        if not len(t):
+            return 0.0, 0.0
+        return float(t[0]), float(t[-1])
+
+    def index_at(self, t: float) -> int:
+        """Registro vigente en el instante `t` (el último con time_s <= t)."""
+        if not len(self.records):
+            raise IndexError("Bitácora vacía")
+        st = self._time_index()
+        pos = max(0, int(np.searchsorted(st, t, side="right")) - 1)
+        return int(self._order[pos]) if self._order is not None else pos
+
+    def sample_at(self, t: float) -> TelemetrySample:
+        return self.sample(self.index_at(t))
+
+    def window(self, name: str, t_from: Optional[float] = None,
+               t_to: Optional[float] = None, nan: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """(tiempos, valores) de `name` en [t_from, t_to], en orden temporal."""
+        st = self._time_index()
+        lo = 0 if t_from is None else int(np.searchsorted(st, t_from, side="left"))
+        hi = len(st) if t_to is None else int(np.searchsorted(st, t_to, side="right"))
+        hi = max(lo, hi)
+        if self._order is None:
+            rec = self.records[lo:hi]
+        else:
+            rec = self.records[self._order[lo:hi]]
+        values = rec[name]
+        if nan and name in _FLOAT_FIELDS:
+            bit = np.uint32(1 << LOG_FIELD_NAMES.index(name))
+            values = values.astype(np.float64)
+            values[(rec["nulls"] & bit) != 0] = np.nan
+        return st[lo:hi], values
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def null_mask(self, name: str) -> np.ndarray:
+        """True donde el campo `name` era None."""
+        bit = np.uint32(1 << LOG_FIELD_NAMES.index(name))
+        return (self.records["nulls"] & bit) != 0
+
+    def column(self, name: str, nan: bool = False) -> np.ndarray:
+        col = self.records[name]
+        if not nan:
+            return col
+        out = col.astype(np.float64)
+        out[self.null_mask(name)] = np.nan
+        return out
+
+    def sample(self, i: int) -> TelemetrySample:
+        rec = self.records[i]
+        nulls = int(rec["nulls"])
+        kwargs = {}
+        for bit, name in enumerate(LOG_FIELD_NAMES):
+            if nulls & (1 << bit):
+                kwargs[name] = None
+                continue
+            v = rec[name]
+            if name == "flight_mode":
+                kwargs[name] = FLIGHT_MODES[v] if v < len(FLIGHT_MODES) else "UNKNOWN"
+            elif name == "in_air":
+                kwargs[name] = bool(v)
+            elif name in ("gps_fix_type", "num_sat"):
+                kwargs[name] = int(v)
+            else:
+                kwargs[name] = float(v)
+        if kwargs.get("time_s") is None:
+            kwargs["time_s"] = 0.0
+        return TelemetrySample(**kwargs)
+
+    def close(self):
+        """
+        Suelta todas las referencias al mapeo para poder borrar o mover el
+        archivo (en Windows un archivo mapeado no se puede eliminar). El
+        mapeo no se cierra a la fuerza: NumPy no protege las vistas y
+        accederlas tras mmap.close() rompe el proceso. Se libera en cuanto
+        no queden vistas vivas; quien grafique datos debe copiarlos.
+        """
+        self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._sorted_t = None   # suele ser una vista del mapeo
+        self._order = None
@@ -0,0 +1,215 @@
+"""
+Exportación del historial por streaming.
+
+Las filas se leen por bloques (fetchmany) y se escriben a disco a medida
+que llegan: la memoria queda acotada por el tamaño de bloque, no por el
+largo del historial. Pensado para correr en un hilo de trabajo, con
+callback de progreso y cancelación (threading.Event).
+
+Formatos:
+- CSV (siempre disponible).
+- Parquet y Arrow IPC (requieren pyarrow): un record batch por bloque,
+  con columnas tipadas según el esquema de `samples`.
+- NPZ (fallback solo con NumPy): un arreglo tipado por columna; los
+  enteros con nulos llevan además una máscara `<columna>__null`.
+
+Se escribe primero a `<destino>.part` y se renombra al terminar; si se
+cancela o falla, el archivo parcial se elimina.
+"""
+
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from telemetria.historial import QUERY_COLUMNS
+
+# pyarrow opcional (Parquet / Arrow IPC)
+PYARROW_OK = True
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pq
+except Exception:
+    PYARROW_OK = False
+
+# Tipo de cada columna de `samples` ("int", "float" o "str")
+SAMPLE_TYPES: Dict[str, str] = {
+    "id": "int",
+    "created_iso": "str",
+    "fuente": "str",
+    "raw_line": "str",
+    "modo": "str",
+    "en_aire": "int",
+    "gps_fix": "int",
+    "sats": "int",
+}
+for _col in QUERY_COLUMNS:
+    SAMPLE_TYPES.setdefault(_col, "float")
+
+# Extensión -> formato
+EXPORT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".arrow": "arrow", ".npz": "npz"}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ExportCancelled(Exception):
+    """La exportación se canceló antes de terminar."""
+
+
+def export_columns(columns: Optional[Sequence[str]] = None) -> List[str]:
+    """Columnas efectivas de una exportación (todas si no se indican)."""
+    return list(columns) if columns else list(QUERY_COLUMNS)
+
+
+def write_csv(path, columns: Sequence[str], chunks: Iterable[List[Tuple]],
+              total: int = 0, progress: Optional[ProgressCallback] = None,
+              cancel: Optional[threading.Event] = None) -> int:
+    """
+    Escribe `chunks` (bloques de filas) como CSV en `path`.
+    Devuelve el número de filas escritas; lanza ExportCancelled si `cancel`
+    se activa a mitad de camino.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".part")
+    written = 0
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8-sig") as f:
+            w = csv.writer(f)
+            w.writerow(columns)
+            for rows in chunks:
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelled()
+                w.writerows(rows)
+                written += len(rows)
+                if progress is not None:
+                    progress(written, total)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def export_csv(db, path, columns: Optional[Sequence[str]] = None,
+               t_from: Optional[float] = None, t_to: Optional[float] = None,
+               source: Optional[str] = None, flight: Optional[int] = None,
+               chunk_size: int = 5000, progress: Optional[ProgressCallback] = None,
+               cancel: Optional[threading.Event] = None) -> int:
+    """Exporta de HistorialDB a CSV en un solo paso (mismo hilo)."""
+    cols = export_columns(columns)
+    total = db.count(t_from, t_to, source, flight=flight)
+    chunks = db.iter_query(cols, t_from, t_to, source, flight=flight, chunk_size=chunk_size)
+    return write_csv(path, cols, chunks, total, progress, cancel)
+
+
+def available_formats() -> List[str]:
+    """Formatos que se pueden escribir con las dependencias instaladas."""
+    if PYARROW_OK:
+        return ["csv", "parquet", "arrow", "npz"]
+    return ["csv", "npz"]
+
+
+def format_for_path(path) -> str:
+    """Formato según la extensión del archivo (CSV por defecto)."""
+    return EXPORT_FORMATS.get(Path(path).suffix.lower(), "csv")
+
+
+def _arrow_schema(columns: Sequence[str]):
+    types = {"int": pa.int64(), "float": pa.float64(), "str": pa.string()}
+    return pa.schema([(c, types[SAMPLE_TYPES[c]]) for c in columns])
+
+
+def _numpy_columns(columns: Sequence[str], rows: List[Tuple]) -> Dict[str, np.ndarray]:
+    """Bloque de filas -> arreglos tipados por columna (NaN / máscara para nulos)."""
+    out: Dict[str, np.ndarray] = {}
+    for i, col in enumerate(columns):
+        values = [r[i] for r in rows]
+        kind = SAMPLE_TYPES[col]
+        if kind == "float":
+            out[col] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+        elif kind == "int":
+            mask = np.array([v is None for v in values], dtype=bool)
+            out[col] = np.array([0 if v is None else v for v in values], dtype=np.int64)
+            out[col + "__null"] = mask
+        else:
+            out[col] = np.array(["" if v is None else v for v in values], dtype=np.str_)
+    return out
+
+
+def write_columnar(path, columns: Sequence[str], chunks: Iterable[List[Tuple]],
+                   fmt: str, total: int = 0, progress: Optional[ProgressCallback] = None,
+                   cancel: Optional[threading.Event] = None) -> int:
+    """
+    Escribe `chunks` en formato columnar (`parquet`, `arrow` o `npz`).
+    Parquet / Arrow escriben un batch por bloque; NPZ junta los bloques ya
+    tipados y guarda al final.
+    """
+    if fmt in ("parquet", "arrow") and not PYARROW_OK:
+        raise RuntimeError("Exportar a Parquet/Arrow requiere pyarrow (pip install pyarrow)")
+    if fmt not in ("parquet", "arrow", "npz"):
+        raise ValueError(f"Formato columnar desconocido: {fmt!r}")
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".part")
+    written = 0
+    writer = None
+    schema = _arrow_schema(columns) if fmt != "npz" else None
+    parts: Dict[str, List[np.ndarray]] = {}
+    try:
+        if fmt == "parquet":
+            writer = pq.ParquetWriter(str(tmp), schema, compression="zstd")
+        elif fmt == "arrow":
+            writer = pa_ipc.new_file(str(tmp), schema)
+
+        for rows in chunks:
+            if cancel is not None and cancel.is_set():
+                raise ExportCancelled()
+            if fmt == "npz":
+                for name, arr in _numpy_columns(columns, rows).items():
+                    parts.setdefault(name, []).append(arr)
+            else:
+                data = zip(*rows)
+                batch = pa.record_batch(
+                    [pa.array(col, type=field.type) for col, field in zip(data, schema)],
+                    schema=schema,
+                )
+                writer.write_batch(batch)
+            written += len(rows)
+            if progress is not None:
+                progress(written, total)
+
+        if writer is not None:
+            writer.close()
+            writer = None
+        else:
+            if not parts:
+                parts = {k: [v] for k, v in _numpy_columns(columns, []).items()}
+            with open(tmp, "wb") as f:
+                np.savez(f, **{name: np.concatenate(arrs) for name, arrs in parts.items()})
+        os.replace(tmp, path)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def export_file(db, path, columns: Optional[Sequence[str]] = None,
+                t_from: Optional[float] = None, t_to: Optional[float] = None,
+                source: Optional[str] = None, flight: Optional[int] = None,
+                chunk_size: int = 5000, progress: Optional[ProgressCallback] = None,
+                cancel: Optional[threading.Event] = None) -> int:
+    """Exporta de HistorialDB en el formato que indica la extensión de `path`."""
+    fmt = format_for_path(path)
+    if fmt == "csv":
+        return export_csv(db, path, columns, t_from, t_to, source, flight,
+                          chunk_size, progress, cancel)
+    cols = export_columns(columns)
+    total = db.count(t_from, t_to, source, flight=flight)
+    chunks = db.iter_query(cols, t_from, t_to, source, flight=flight, chunk_size=chunk_size)
+    return write_columnar(path, cols, chunks, fmt, total, progress, cancel)
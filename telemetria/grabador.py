@@ -0,0 +1,269 @@
+"""
+Grabación sin interfaz gráfica (estación de tierra mínima).
+
+Corre cualquier backend de `telemetria.telemetria` (o la reproducción de
+`telemetria.replay`, o el generador de `telemetria.sintetico`) sobre
+asyncio simple y guarda cada muestra en el historial SQLite y/o en la
+bitácora binaria, igual que la interfaz pero sin importar Qt ni
+pyqtgraph. NumPy solo se carga si se graba bitácora o se usa el
+sintético.
+
+Uso:
+    python -m telemetria.grabador --fuente lora --endpoint /dev/ttyUSB0
+    python -m telemetria.grabador --fuente mavsdk --endpoint udp://:14540 --sin-bd
+    python -m telemetria.grabador --fuente demo --duracion 60
+    python -m telemetria.grabador --fuente sintetico --hz 100 --velocidad 0 --duracion 30
+
+Ctrl+C (o SIGTERM) termina limpio: vacía la bitácora, confirma lo
+pendiente en la base y cierra el vuelo.
+"""
+
+import argparse
+import asyncio
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+
+from telemetria.historial import SYNCHRONOUS_LEVELS, HistorialDB
+from telemetria.telemetria import MAVSDK_TOPICS, BackendTelemetria, LoRaBackend
+
+# Nombre de fuente (como en la interfaz) por opción de línea de comandos
+FUENTES = {"demo": "DEMO", "mavsdk": "MAVSDK", "lora": "LoRa", "replay": "Replay",
+           "sintetico": "Sintético"}
+
+
+def _make_backend(args):
+    if args.fuente == "demo":
+        return BackendTelemetria(force_demo=True)
+    if args.fuente == "mavsdk":
+        backend = BackendTelemetria(force_demo=False)
+        backend.stream_rates_hz.update(args.tasa)
+        return backend
+    if args.fuente == "lora":
+        return LoRaBackend(port=args.endpoint or "COM3", baud=args.baud)
+    if args.fuente == "sintetico":
+        from telemetria.sintetico import SyntheticBackend
+
+        return SyntheticBackend(args.patron, rate_hz=args.hz, speed=args.velocidad,
+                                noise=args.ruido, dropout=args.perdidas)
+    from telemetria.replay import ReplayBackend
+
+    return ReplayBackend(args.endpoint, speed=args.velocidad)
+
+
+class Grabador:
+    """
+    Bucle de ingesta: backend -> historial / bitácora.
+
+    Reintenta la conexión como la interfaz (intervalo fijo, intentos
+    máximos; 0 = sin límite) y vuelca la bitácora una vez por segundo.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.fuente = FUENTES[args.fuente]
+        self.backend = None
+        self.db: Optional[HistorialDB] = None
+        self.log = None
+        self.samples = 0
+        self._stop = asyncio.Event()
+
+    def open(self):
+        save_dir = Path(self.args.dir)
+        flight_id = None
+        if not self.args.sin_bd:
+            self.db = HistorialDB(save_dir / "telemetria_ui.db",
+                                  max_latency_ms=self.args.commit_ms,
+                                  synchronous=self.args.sincronico)
+            flight_id = self.db.start_flight(self.fuente)
+        if not self.args.sin_bitacora:
+            from telemetria.bitacora import FlightLogWriter
+
+            if self.db is not None:
+                path = self.db.flight_file(flight_id, ".bin")
+            else:
+                stamp = time.strftime("%Y%m%d_%H%M%S")
+                path = save_dir / "vuelos" / f"vuelo_{stamp}.bin"
+            self.log = FlightLogWriter(path, self.fuente)
+        return flight_id
+
+    def stop(self):
+        self._stop.set()
+        if self.backend is not None:
+            asyncio.ensure_future(self.backend.stop())
+
+    async def _ingest(self):
+        attempts = 0
+        while not self._stop.is_set():
+            self.backend = _make_backend(self.args)
+            try:
+                await self.backend.connect(self.args.endpoint)
+                _log(f"Conectado ({self.fuente})")
+                attempts = 0
+                if hasattr(self.backend, "batches"):
+                    # Generador por bloques: un encolado por bloque
+                    async for batch in self.backend.batches():
+                        if self.db is not None:
+                            self.db.append_batch(self.fuente, batch)
+                        if self.log is not None:
+                            self.log.append_batch(batch)
+                        self.samples += len(batch)
+                        if self._stop.is_set():
+                            break
+                else:
+                    async for s in self.backend.samples():
+                        if self.db is not None:
+                            self.db.append(self.fuente, s)
+                        if self.log is not None:
+                            self.log.append(s)
+                        self.samples += 1
+                        if self._stop.is_set():
+                            break
+                if self._stop.is_set() or self.args.fuente == "replay":
+                    break
+                raise RuntimeError("Enlace finalizado")
+            except Exception as e:
+                attempts += 1
+                _log(f"Error de backend: {e}")
+                if self.args.reintentos > 0 and attempts > self.args.reintentos:
+                    _log(f"Fallo de conexión tras {attempts} intentos")
+                    break
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.args.reintento_s)
+                except asyncio.TimeoutError:
+                    pass
+        self._stop.set()
+
+    async def _housekeeping(self):
+        """Vuelca la bitácora cada segundo e imprime estadísticas si se pidió."""
+        last_stats = time.monotonic()
+        last_samples = 0
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+            if self.log is not None:
+                self.log.flush()
+            now = time.monotonic()
+            if self.args.stats > 0 and now - last_stats >= self.args.stats:
+                rate = (self.samples - last_samples) / (now - last_stats)
+                msg = f"{self.samples} muestras ({rate:.1f}/s)"
+                if self.db is not None:
+                    st = self.db.stats()
+                    msg += (f" • BD: pendientes {st['pending']}, escritas {st['written']}, "
+                            f"descartadas {st['dropped']}")
+                    if not st["healthy"]:
+                        msg += f" • error de escritura: {st['error'] or 'escritor detenido'}"
+                _log(msg)
+                last_stats, last_samples = now, self.samples
+
+    async def run(self):
+        tasks = [asyncio.ensure_future(self._ingest()),
+                 asyncio.ensure_future(self._housekeeping())]
+        if self.args.duracion > 0:
+            asyncio.get_running_loop().call_later(self.args.duracion, self.stop)
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for t in tasks:
+                t.cancel()
+            if self.backend is not None:
+                await self.backend.stop()
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+        if self.db is not None:
+            self.db.close()
+
+
+def _log(msg: str):
+    print(f"[{time.strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def _rate(text: str):
+    topic, sep, hz = text.partition("=")
+    if not sep or topic not in MAVSDK_TOPICS:
+        raise argparse.ArgumentTypeError(
+            f"se espera TOPICO=HZ con TOPICO en {', '.join(MAVSDK_TOPICS)}"
+        )
+    try:
+        return topic, float(hz)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tasa no numérica: {hz!r}") from None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m telemetria.grabador",
+        description="Graba telemetría sin interfaz gráfica (historial SQLite y/o bitácora binaria).",
+    )
+    p.add_argument("--fuente", choices=sorted(FUENTES), default="demo",
+                   help="backend de telemetría (por defecto: demo)")
+    p.add_argument("--endpoint", default="udp://:14540",
+                   help="endpoint MAVSDK, puerto serie LoRa o archivo a reproducir")
+    p.add_argument("--tasa", type=_rate, action="append", default=[], metavar="TOPICO=HZ",
+                   help="tasa MAVSDK por tópico, repetible (0 = no suscribirse); "
+                        f"tópicos: {', '.join(MAVSDK_TOPICS)}")
+    p.add_argument("--baud", type=int, default=57600, help="baudrate LoRa")
+    p.add_argument("--velocidad", type=float, default=1.0,
+                   help="velocidad de reproducción o del sintético (0 = máxima)")
+    p.add_argument("--patron", default="circulo",
+                   choices=("circulo", "barrido", "ocho"), help="trayectoria del sintético")
+    p.add_argument("--hz", type=float, default=10.0, help="muestras por segundo del sintético")
+    p.add_argument("--ruido", type=float, default=1.0,
+                   help="escala del ruido del sintético (0 = sin ruido)")
+    p.add_argument("--perdidas", type=float, default=0.0,
+                   help="fracción de muestras sintéticas perdidas (0-1)")
+    p.add_argument("--dir", default="datos_vuelo", help="carpeta de datos")
+    p.add_argument("--sin-bd", action="store_true", help="no grabar el historial SQLite")
+    p.add_argument("--sin-bitacora", action="store_true", help="no grabar la bitácora binaria")
+    p.add_argument("--commit-ms", type=int, default=1000,
+                   help="latencia máxima de commit del historial (ms)")
+    p.add_argument("--sincronico", choices=SYNCHRONOUS_LEVELS, default="NORMAL",
+                   help="durabilidad de cada commit (PRAGMA synchronous; FULL = fsync)")
+    p.add_argument("--duracion", type=float, default=0.0,
+                   help="segundos a grabar (0 = hasta Ctrl+C)")
+    p.add_argument("--reintentos", type=int, default=0,
+                   help="intentos de reconexión (0 = sin límite)")
+    p.add_argument("--reintento-s", type=float, default=5.0,
+                   help="espera entre reintentos (s)")
+    p.add_argument("--stats", type=float, default=10.0,
+                   help="imprime estadísticas cada N s (0 = nunca)")
+    return p
+
+
+async def _main(args) -> int:
+    rec = Grabador(args)
+    flight_id = rec.open()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, rec.stop)
+        except (NotImplementedError, RuntimeError):
+            pass   # Windows: Ctrl+C llega como KeyboardInterrupt
+    _log(f"Grabando {rec.fuente}" + (f" en el vuelo {flight_id}" if flight_id else ""))
+    try:
+        await rec.run()
+    finally:
+        rec.close()
+    _log(f"Fin: {rec.samples} muestras")
+    return 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.sin_bd and args.sin_bitacora:
+        print("Nada que grabar: se indicó --sin-bd y --sin-bitacora", file=sys.stderr)
+        return 2
+    try:
+        return asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,720 @@
+"""
+Historial de telemetría en SQLite con escritor en segundo plano.
+
+HistorialDB.append() no toca el disco: arma la fila y la deja en una cola
+(queue.SimpleQueue, sin bloqueo para el productor). Un hilo escritor
+dedicado, con su propia conexión, agrupa las filas y hace un único
+executemany + commit por grupo ("group commit"):
+
+- Se confirma cuando el grupo llega a `max_batch` filas o cuando la fila
+  más antigua lleva `max_latency_s` esperando (a menor latencia, menos
+  datos en cola ante un cierre inesperado del programa).
+- `synchronous` decide qué tan durable es cada commit ante un corte de
+  energía o del sistema: con WAL, "NORMAL" no hace fsync en el commit
+  (solo en los checkpoints) y puede perder los últimos grupos confirmados,
+  sin corromper la base; "FULL" hace fsync en cada commit, a costa de
+  latencia de escritura.
+- flush() pide un commit inmediato sin esperar; flush(wait=True) espera
+  a que todo lo encolado esté en disco, como mucho `sync_timeout_ms`.
+  Las lecturas del hilo de la interfaz nunca esperan más que eso: si el
+  disco se atasca leen lo ya confirmado. Las operaciones que necesitan al
+  escritor al día (eliminar, archivar, limpiar) lanzan TimeoutError.
+- Si el disco se atasca, la cola absorbe las filas hasta `max_pending`;
+  por encima de ese límite las filas nuevas se descartan y se cuentan.
+  stats() expone la profundidad de la cola y los tiempos de commit.
+- Un error de escritura no detiene al escritor: el grupo se cuenta como
+  fallido, la conexión se reabre si quedó inutilizable y stats() lo
+  reporta (healthy / error) hasta el siguiente commit correcto.
+
+Las lecturas (historial, exportación) usan una conexión aparte: con WAL
+no bloquean al escritor.
+
+Cada conexión del usuario abre un vuelo (start_flight): un archivo SQLite
+propio en `<carpeta>/vuelos/vuelo_NNNNN.db`, registrado en la tabla
+`vuelos` de la base principal. Archivar o eliminar un vuelo es mover o
+borrar su archivo (O(1)), sin DELETE + VACUUM sobre todo el historial.
+Antes del primer vuelo (y para datos de versiones previas) se usa la
+tabla `samples` de la base principal.
+
+Varios HistorialDB pueden compartir la misma base principal (uno por
+vehículo): cada uno escribe su propio archivo de vuelo con su propio
+hilo escritor, y el catálogo registra a qué vehículo pertenece cada vuelo.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from itertools import repeat
+from operator import attrgetter
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from telemetria.telemetria import TelemetryBatch, TelemetrySample
+
+SAMPLE_COLUMNS = (
+    "created_iso", "fuente", "raw_line", "t_s", "lat", "lon", "alt_msl", "alt_rel",
+    "roll", "pitch", "yaw", "vn", "ve", "vd", "v", "vbat", "bat_pct", "modo", "en_aire",
+    "gps_fix", "sats", "temp", "hum", "pres", "rad", "acc",
+)
+
+_SCHEMA_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS samples (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_iso TEXT,
+        fuente TEXT,
+        raw_line TEXT,
+        t_s REAL,
+        lat REAL,
+        lon REAL,
+        alt_msl REAL,
+        alt_rel REAL,
+        roll REAL,
+        pitch REAL,
+        yaw REAL,
+        vn REAL,
+        ve REAL,
+        vd REAL,
+        v REAL,
+        vbat REAL,
+        bat_pct REAL,
+        modo TEXT,
+        en_aire INTEGER,
+        gps_fix INTEGER,
+        sats INTEGER,
+        temp REAL,
+        hum REAL,
+        pres REAL,
+        rad REAL,
+        acc REAL
+    )
+    """,
+    # Índices para consultas por rango de tiempo / fecha / fuente
+    "CREATE INDEX IF NOT EXISTS idx_samples_t_s ON samples (t_s)",
+    "CREATE INDEX IF NOT EXISTS idx_samples_created ON samples (created_iso)",
+    "CREATE INDEX IF NOT EXISTS idx_samples_fuente ON samples (fuente)",
+)
+
+_CATALOG_SQL = """
+    CREATE TABLE IF NOT EXISTS vuelos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        inicio_iso TEXT,
+        fin_iso TEXT,
+        fuente TEXT,
+        archivo TEXT,
+        archivado INTEGER DEFAULT 0,
+        vehiculo TEXT
+    )
+"""
+
+# Valores aceptados para PRAGMA synchronous del escritor
+SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+# Archivos que acompañan a cada vuelo (se archivan / borran con él)
+FLIGHT_COMPANIONS = (".bin",)
+
+FLIGHT_COLUMNS = ("id", "inicio_iso", "fin_iso", "fuente", "archivo", "archivado", "vehiculo")
+
+# Columnas que se pueden pedir en query() (incluye la clave)
+QUERY_COLUMNS = ("id",) + SAMPLE_COLUMNS
+
+# Campos de TelemetrySample en el orden de SAMPLE_COLUMNS (tras created_iso y fuente)
+_ROW_FIELDS = (
+    "raw_line", "time_s", "lat_deg", "lon_deg", "abs_alt_m", "rel_alt_m", "roll_deg",
+    "pitch_deg", "yaw_deg", "vx_ms", "vy_ms", "vz_ms", "groundspeed_ms", "voltage_v",
+    "battery_percent", "flight_mode", "in_air", "gps_fix_type", "num_sat", "temp_c",
+    "hum_pct", "pres_hpa", "rad_mwcm2", "acc_ms2",
+)
+_ROW_VALUES = attrgetter(*_ROW_FIELDS)
+_IN_AIR = _ROW_FIELDS.index("in_air")
+assert len(_ROW_FIELDS) + 2 == len(SAMPLE_COLUMNS)
+
+_INSERT_SQL = (
+    f"INSERT INTO samples ({', '.join(SAMPLE_COLUMNS)}) "
+    f"VALUES ({','.join('?' * len(SAMPLE_COLUMNS))})"
+)
+
+
+class _Command:
+    """Orden para el hilo escritor (se ejecuta tras confirmar lo pendiente)."""
+
+    __slots__ = ("fn", "done", "error")
+
+    def __init__(self, fn: Optional[Callable[[sqlite3.Connection], None]] = None):
+        self.fn = fn
+        self.done = threading.Event()
+        self.error: Optional[BaseException] = None
+
+
+_STOP = object()
+
+
+class HistorialDB:
+    """
+    Encapsula el acceso a SQLite para guardar y leer historial de telemetría.
+    Esta base de datos es propia de la interfaz (independiente del backend).
+    """
+
+    def __init__(self, db_path: Path, max_latency_ms: int = 1000,
+                 max_batch: int = 500, synchronous: str = "NORMAL",
+                 max_pending: int = 100_000, sync_timeout_ms: int = 2000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_latency_s = max(0.0, max_latency_ms / 1000.0)
+        self.max_batch = max(1, int(max_batch))
+        self.synchronous = _synchronous(synchronous)
+        self.max_pending = max(1, int(max_pending))
+        self.sync_timeout_s = max(0.0, sync_timeout_ms / 1000.0)
+
+        self.flights_dir = self.db_path.parent / "vuelos"
+
+        # Base principal: catálogo de vuelos + tabla samples previa
+        self._catalog = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._catalog.execute("PRAGMA journal_mode=WAL;")
+        self._catalog.execute(_CATALOG_SQL)
+        cols = {r[1] for r in self._catalog.execute("PRAGMA table_info(vuelos)")}
+        if "vehiculo" not in cols:   # catálogo de una versión previa
+            self._catalog.execute("ALTER TABLE vuelos ADD COLUMN vehiculo TEXT")
+        self._catalog.commit()
+
+        # Conexión de lectura del almacén actual (hilo de la interfaz)
+        self.current_flight: Optional[int] = None
+        self._store_path = self.db_path
+        self._conn = _open_store(self.db_path)
+
+        # Cola productor -> escritor
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._reset_counters()
+        self._iso_sec = -1
+        self._iso_str = ""
+
+        self._writer = threading.Thread(
+            target=self._writer_loop, name="HistorialDB-writer", daemon=True
+        )
+        self._closed = False
+        self._writer.start()
+
+    # --- Productor (hilo de la interfaz) -------------------------------
+
+    def append(self, fuente: str, s: TelemetrySample):
+        """Encola un nuevo registro (no bloquea ni toca el disco)."""
+        pending = self.pending
+        if pending >= self.max_pending:
+            self.dropped += 1
+            return
+        self._update_iso()
+        v = _ROW_VALUES(s)   # todos los campos en una llamada
+        row = (self._iso_str, fuente, v[0] or "", v[1] or 0.0, *v[2:_IN_AIR],
+               int(bool(v[_IN_AIR])), *v[_IN_AIR + 1:])
+        self.enqueued += 1
+        if pending >= self.max_pending_seen:
+            self.max_pending_seen = pending + 1
+        self._queue.put(row)
+
+    def append_batch(self, fuente: str, batch: TelemetryBatch):
+        """
+        Encola un lote completo como un solo elemento de la cola: las filas
+        se arman columna a columna (zip) y el escritor las suma a su grupo.
+        Si el lote no cabe bajo `max_pending`, se descarta entero.
+        """
+        n = len(batch)
+        if not n:
+            return
+        pending = self.pending
+        if pending + n > self.max_pending:
+            self.dropped += n
+            return
+        self._update_iso()
+        cols = [batch.column(name) for name in _ROW_FIELDS]
+        cols[0] = [v or "" for v in cols[0]]
+        cols[1] = [v or 0.0 for v in cols[1]]
+        cols[_IN_AIR] = [int(bool(v)) for v in cols[_IN_AIR]]
+        rows = list(zip(repeat(self._iso_str, n), repeat(fuente, n), *cols))
+        self.enqueued += n
+        if pending + n > self.max_pending_seen:
+            self.max_pending_seen = pending + n
+        self._queue.put(rows)
+
+    def _update_iso(self):
+        # created_iso cambia una vez por segundo: se formatea solo entonces
+        now = int(time.time())
+        if now != self._iso_sec:
+            self._iso_sec = now
+            self._iso_str = datetime.utcfromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S")
+
+    def flush(self, wait: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Pide al escritor que confirme ya lo pendiente.
+        Con wait=True espera a que esté en disco (como mucho `timeout` s);
+        devuelve False si no alcanzó.
+        """
+        if self._closed:
+            return True
+        return self._run(None, wait, timeout)
+
+    def set_commit_policy(self, max_latency_ms: Optional[int] = None,
+                          max_batch: Optional[int] = None,
+                          synchronous: Optional[str] = None):
+        """Ajusta el compromiso latencia / durabilidad del group commit."""
+        if max_latency_ms is not None:
+            self.max_latency_s = max(0.0, max_latency_ms / 1000.0)
+        if max_batch is not None:
+            self.max_batch = max(1, int(max_batch))
+        if synchronous is not None and _synchronous(synchronous) != self.synchronous:
+            self.synchronous = _synchronous(synchronous)
+
+            def _apply(conn):
+                if conn is not None:
+                    conn.execute(f"PRAGMA synchronous={self.synchronous};")
+            self._run(_apply, wait=False)
+
+    def _run(self, fn, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        cmd = _Command(fn)
+        self._queue.put(cmd)
+        if not wait:
+            return True
+        if not self._writer.is_alive() or not cmd.done.wait(timeout):
+            return False
+        if cmd.error is not None:
+            raise cmd.error
+        return True
+
+    def _sync(self, fn=None):
+        """
+        Corre `fn` en el escritor tras confirmar lo pendiente y espera como
+        mucho `sync_timeout_ms`. Lanza TimeoutError si el escritor no llega.
+        """
+        if not self._run(fn, True, self.sync_timeout_s):
+            raise TimeoutError(
+                f"El escritor del historial no respondió en {self.sync_timeout_s:.1f} s"
+            )
+
+    def _sync_for_read(self):
+        # Espera acotada: si no alcanza, se lee lo ya confirmado (WAL)
+        self.flush(wait=True, timeout=self.sync_timeout_s)
+
+    # --- Métricas de contrapresión -------------------------------------
+
+    def _reset_counters(self):
+        # Cada contador tiene un único hilo que lo escribe, así que no hace
+        # falta un lock: productor (enqueued, dropped, max_pending_seen) y
+        # escritor (written, failed, commits, tiempos).
+        self.enqueued = 0
+        self.dropped = 0
+        self.max_pending_seen = 0
+        self.written = 0
+        self.failed = 0
+        self.commits = 0
+        self.last_commit_ms = 0.0
+        self.max_commit_ms = 0.0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def pending(self) -> int:
+        """Filas encoladas que aún no llegan a disco."""
+        return self.enqueued - self.written - self.failed
+
+    def stats(self) -> dict:
+        commits = self.commits
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending_seen,
+            "written": self.written,
+            "commits": commits,
+            "avg_batch": self.written / commits if commits else 0.0,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "last_commit_ms": self.last_commit_ms,
+            "max_commit_ms": self.max_commit_ms,
+            "healthy": self._writer.is_alive() and self.last_error is None,
+            "errors": self.errors,
+            "error": self.last_error,
+        }
+
+    # --- Hilo escritor -------------------------------------------------
+
+    def _connect_writer(self, path: Path) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(path))
+        conn.execute("PRAGMA journal_mode=WAL;")
+        # Con WAL, NORMAL no hace fsync en el commit (solo en checkpoints):
+        # un corte de energía puede perder los últimos commits. FULL hace
+        # fsync en cada commit.
+        conn.execute(f"PRAGMA synchronous={self.synchronous};")
+        return conn
+
+    def _writer_loop(self):
+        self._wconn: Optional[sqlite3.Connection] = None
+        self._wpath = self._store_path
+        batch: List[Tuple] = []
+        first_at = 0.0
+        try:
+            self._writer_conn()
+        except Exception as e:   # se reintenta en el primer commit
+            self._writer_error(e)
+        try:
+            while True:
+                timeout = None
+                if batch:
+                    timeout = max(0.0, first_at + self.max_latency_s - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    item = None
+
+                if item is None:
+                    # Venció la latencia máxima del grupo
+                    self._commit(batch)
+                    continue
+                if isinstance(item, (tuple, list)):
+                    if not batch:
+                        first_at = time.monotonic()
+                    if isinstance(item, tuple):
+                        batch.append(item)
+                    else:
+                        batch.extend(item)   # lote de append_batch
+                    if len(batch) >= self.max_batch:
+                        self._commit(batch)
+                    continue
+
+                self._commit(batch)
+                if item is _STOP:
+                    break
+                try:
+                    if item.fn is not None:
+                        item.fn(self._wconn)
+                except BaseException as e:   # se re-lanza en quien esperaba
+                    item.error = e
+                    self._writer_error(e)
+                finally:
+                    item.done.set()
+        finally:
+            self._close_writer()
+
+    def _writer_conn(self) -> sqlite3.Connection:
+        """Conexión del escritor; si se perdió, la reabre sobre el almacén actual."""
+        if self._wconn is None:
+            self._wconn = self._connect_writer(self._wpath)
+        return self._wconn
+
+    def _close_writer(self):
+        conn, self._wconn = self._wconn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _writer_error(self, e: BaseException):
+        self.errors += 1
+        self.last_error = f"{type(e).__name__}: {e}"
+
+    def _commit(self, batch: List[Tuple]):
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        n = len(batch)
+        try:
+            conn = self._writer_conn()
+            conn.executemany(_INSERT_SQL, batch)
+            conn.commit()
+            self.written += n
+            self.last_error = None
+        except Exception as e:
+            self.failed += n
+            self._writer_error(e)
+            try:
+                if self._wconn is not None:
+                    self._wconn.rollback()
+            except Exception:
+                # Conexión inutilizable: se reabre en el próximo commit
+                self._close_writer()
+        batch.clear()
+        dt_ms = (time.perf_counter() - t0) * 1000.0
+        self.commits += 1
+        self.last_commit_ms = dt_ms
+        if dt_ms > self.max_commit_ms:
+            self.max_commit_ms = dt_ms
+
+    # --- Vuelos --------------------------------------------------------
+
+    def _flight_path(self, flight_id: int) -> Path:
+        row = self._catalog.execute(
+            "SELECT archivo FROM vuelos WHERE id = ?", (flight_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Vuelo desconocido: {flight_id}")
+        # Rutas relativas a la carpeta de la base principal
+        return self.db_path.parent / row[0]
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return os.path.relpath(path, self.db_path.parent)
+        except ValueError:   # otra unidad (Windows)
+            return str(Path(path).resolve())
+
+    def flight_file(self, flight_id: int, suffix: str) -> Path:
+        """Archivo asociado a un vuelo (p. ej. bitácora ".bin") junto a su .db."""
+        return self._flight_path(flight_id).with_suffix(suffix)
+
+    def start_flight(self, fuente: str, vehiculo: Optional[str] = None) -> int:
+        """
+        Abre un vuelo nuevo (archivo propio) y dirige ahí la escritura.
+        Lo encolado antes queda en el almacén anterior.
+        """
+        self.end_flight()
+        now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        cur = self._catalog.execute(
+            "INSERT INTO vuelos (inicio_iso, fuente, vehiculo) VALUES (?, ?, ?)",
+            (now, fuente, vehiculo),
+        )
+        flight_id = cur.lastrowid
+        self.flights_dir.mkdir(parents=True, exist_ok=True)
+        path = self.flights_dir / f"vuelo_{flight_id:05d}.db"
+        self._catalog.execute(
+            "UPDATE vuelos SET archivo = ? WHERE id = ?", (self._relative(path), flight_id)
+        )
+        self._catalog.commit()
+
+        # El esquema se crea aquí para que las lecturas funcionen de inmediato
+        conn = _open_store(path)
+        self._conn.close()
+        self._conn = conn
+        self._store_path = path
+        self.current_flight = flight_id
+
+        def _switch(_conn):
+            # Si no se puede abrir, el próximo commit reintenta sobre `path`
+            self._close_writer()
+            self._wpath = path
+            self._writer_conn()
+        self._run(_switch, wait=False)
+        return flight_id
+
+    def end_flight(self):
+        """Marca el fin del vuelo en curso (si hay uno)."""
+        if self.current_flight is None:
+            return
+        now = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self._catalog.execute(
+            "UPDATE vuelos SET fin_iso = ? WHERE id = ?", (now, self.current_flight)
+        )
+        self._catalog.commit()
+
+    def flights(self):
+        """Catálogo de vuelos, del más reciente al más antiguo."""
+        cur = self._catalog.execute(
+            f"SELECT {', '.join(FLIGHT_COLUMNS)} FROM vuelos ORDER BY id DESC"
+        )
+        return list(FLIGHT_COLUMNS), cur.fetchall()
+
+    def drop_flight(self, flight_id: int):
+        """Elimina un vuelo terminado: borra su archivo y su entrada (O(1))."""
+        if flight_id == self.current_flight:
+            raise ValueError("No se puede eliminar el vuelo en curso")
+        path = self._flight_path(flight_id)
+        self._sync()   # el escritor ya soltó los vuelos anteriores
+        self._catalog.execute("DELETE FROM vuelos WHERE id = ?", (flight_id,))
+        self._catalog.commit()
+        for p in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+            p.unlink(missing_ok=True)
+        for suffix in FLIGHT_COMPANIONS:
+            path.with_suffix(suffix).unlink(missing_ok=True)
+
+    def archive_flight(self, flight_id: int, dest_dir: Optional[Path] = None) -> Path:
+        """Mueve el archivo de un vuelo terminado a `dest_dir` (por defecto vuelos/archivo)."""
+        if flight_id == self.current_flight:
+            raise ValueError("No se puede archivar el vuelo en curso")
+        path = self._flight_path(flight_id)
+        self._sync()
+        dest_dir = Path(dest_dir) if dest_dir is not None else self.flights_dir / "archivo"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        dest = dest_dir / path.name
+        # Con el vuelo cerrado el WAL ya está integrado; solo se mueve el .db
+        os.replace(path, dest)
+        for suffix in ("-wal", "-shm"):
+            Path(f"{path}{suffix}").unlink(missing_ok=True)
+        for suffix in FLIGHT_COMPANIONS:
+            companion = path.with_suffix(suffix)
+            if companion.exists():
+                os.replace(companion, dest.with_suffix(suffix))
+        self._catalog.execute(
+            "UPDATE vuelos SET archivo = ?, archivado = 1 WHERE id = ?",
+            (self._relative(dest), flight_id),
+        )
+        self._catalog.commit()
+        return dest
+
+    # --- Lecturas ------------------------------------------------------
+
+    def _read(self, sql: str, params=(), flight: Optional[int] = None):
+        """
+        Ejecuta una lectura sobre el vuelo `flight` (None = almacén actual).
+        Devuelve (columnas, filas).
+        """
+        if flight is None or flight == self.current_flight:
+            self._sync_for_read()
+            cur = self._conn.execute(sql, params)
+            return [d[0] for d in cur.description], cur.fetchall()
+        uri = f"{self._flight_path(flight).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        try:
+            cur = conn.execute(sql, params)
+            return [d[0] for d in cur.description], cur.fetchall()
+        finally:
+            conn.close()
+
+    def get_all(self, flight: Optional[int] = None):
+        """Devuelve todas las filas de la tabla (para exportar)."""
+        return self._read("SELECT * FROM samples ORDER BY id ASC", flight=flight)
+
+    def get_latest(self, limit: int = 50, flight: Optional[int] = None):
+        """Devuelve las últimas `limit` filas (para vista rápida)."""
+        return self._read(
+            "SELECT * FROM samples ORDER BY id DESC LIMIT ?", (limit,), flight=flight
+        )
+
+    @staticmethod
+    def _where(t_from: Optional[float], t_to: Optional[float],
+               source: Optional[str]) -> Tuple[str, List]:
+        """Cláusula WHERE (con índices) para los filtros de query()."""
+        where = []
+        params: List = []
+        if t_from is not None:
+            where.append("t_s >= ?")
+            params.append(float(t_from))
+        if t_to is not None:
+            where.append("t_s <= ?")
+            params.append(float(t_to))
+        if source is not None:
+            where.append("fuente = ?")
+            params.append(source)
+        return (" WHERE " + " AND ".join(where) if where else ""), params
+
+    def _select(self, columns: Optional[Sequence[str]] = None,
+                t_from: Optional[float] = None, t_to: Optional[float] = None,
+                source: Optional[str] = None, limit: Optional[int] = None,
+                newest_first: bool = False) -> Tuple[List[str], str, List]:
+        """Arma el SELECT proyectado de query(); valida las columnas."""
+        cols = list(columns) if columns else list(QUERY_COLUMNS)
+        unknown = [c for c in cols if c not in QUERY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas: {', '.join(unknown)}")
+
+        where, params = self._where(t_from, t_to, source)
+        sql = f"SELECT {', '.join(cols)} FROM samples{where}"
+        sql += " ORDER BY id DESC" if newest_first else " ORDER BY id ASC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return cols, sql, params
+
+    def query(self, columns: Optional[Sequence[str]] = None,
+              t_from: Optional[float] = None, t_to: Optional[float] = None,
+              source: Optional[str] = None, limit: Optional[int] = None,
+              newest_first: bool = False, flight: Optional[int] = None):
+        """
+        Lee solo las columnas pedidas, filtrando por rango de t_s y fuente
+        (ambos con índice). Devuelve (columnas, filas) como get_latest().
+        """
+        _, sql, params = self._select(columns, t_from, t_to, source, limit, newest_first)
+        return self._read(sql, params, flight=flight)
+
+    def count(self, t_from: Optional[float] = None, t_to: Optional[float] = None,
+              source: Optional[str] = None, flight: Optional[int] = None) -> int:
+        """Número de filas que devolvería query() con esos filtros."""
+        where, params = self._where(t_from, t_to, source)
+        _, rows = self._read(f"SELECT COUNT(*) FROM samples{where}", params, flight=flight)
+        return int(rows[0][0])
+
+    def iter_query(self, columns: Optional[Sequence[str]] = None,
+                   t_from: Optional[float] = None, t_to: Optional[float] = None,
+                   source: Optional[str] = None, flight: Optional[int] = None,
+                   chunk_size: int = 5000) -> Iterator[List[Tuple]]:
+        """
+        Igual que query(), pero entrega las filas en bloques de `chunk_size`
+        (fetchmany) desde una conexión propia de solo lectura: la memoria no
+        crece con el historial. Se crea en el hilo de la interfaz y puede
+        recorrerse desde un hilo de trabajo.
+        """
+        _, sql, params = self._select(columns, t_from, t_to, source)
+        if flight is None or flight == self.current_flight:
+            self._sync_for_read()
+            path = self._store_path
+        else:
+            path = self._flight_path(flight)
+        return _iter_rows(path, sql, params, max(1, int(chunk_size)))
+
+    def clear(self, keep: Sequence[int] = ()):
+        """
+        Elimina todo el historial borrando archivos de vuelo, sin DELETE +
+        VACUUM. Si hay un vuelo en curso, continúa en un archivo nuevo.
+        `keep`: vuelos que se conservan (p. ej. los que otros HistorialDB
+        sobre la misma base están grabando).
+        """
+        if self.current_flight is not None:
+            fuente, vehiculo = self._catalog.execute(
+                "SELECT fuente, vehiculo FROM vuelos WHERE id = ?", (self.current_flight,)
+            ).fetchone()
+            self.start_flight(fuente, vehiculo)
+        keep = set(keep)
+        keep.add(self.current_flight)
+        for flight_id in [r[0] for r in self.flights()[1] if r[0] not in keep]:
+            self.drop_flight(flight_id)
+
+        # Tabla samples previa de la base principal
+        if self.current_flight is None:
+            def _drop_legacy(_conn):
+                conn = self._writer_conn()
+                conn.execute("DROP TABLE IF EXISTS samples")
+                for stmt in _SCHEMA_SQL:
+                    conn.execute(stmt)
+                conn.commit()
+            self._sync(_drop_legacy)
+        else:
+            self._catalog.execute("DROP TABLE IF EXISTS samples")
+            self._catalog.commit()
+
+    def close(self):
+        """Vacía la cola, detiene el escritor y cierra las conexiones."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+        self.end_flight()
+        self._conn.close()
+        self._catalog.close()
+
+
+def _synchronous(level: str) -> str:
+    level = str(level).upper()
+    if level not in SYNCHRONOUS_LEVELS:
+        raise ValueError(f"synchronous desconocido: {level!r}")
+    return level
+
+
+def _iter_rows(path: Path, sql: str, params: List, chunk_size: int) -> Iterator[List[Tuple]]:
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(sql, params)
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        conn.close()
+
+
+def _open_store(path: Path) -> sqlite3.Connection:
+    """Abre (y crea si hace falta) un archivo de muestras con su esquema."""
+    conn = sqlite3.connect(str(path), check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    for stmt in _SCHEMA_SQL:
+        conn.execute(stmt)
+    conn.commit()
+    return conn
@@ -0,0 +1,257 @@
+"""
+Reproducción de vuelos grabados como si fueran un enlace en vivo.
+
+ReplayBackend expone la misma interfaz que los demás backends
+(connect / samples / stop) y lee el vuelo por bloques, sin cargarlo
+entero en memoria. Fuentes admitidas:
+
+- Base SQLite de la interfaz (`telemetria_ui.db`): el vuelo indicado del
+  catálogo `vuelos`, el último si no se indica, o la tabla `samples`
+  previa si no hay vuelos.
+- Archivo de vuelo (`vuelos/vuelo_NNNNN.db`).
+- CSV exportado desde el historial (cabecera con nombres de columna).
+- Bitácora binaria (`.bin`).
+
+La velocidad es un factor sobre el tiempo de la muestra (`time_s`):
+1.0 reproduce en tiempo real, 10.0 diez veces más rápido y 0 (o None)
+tan rápido como se pueda consumir. Los bloques se leen en un hilo
+(asyncio.to_thread) para no bloquear el bucle de eventos.
+"""
+
+import asyncio
+import csv
+import sqlite3
+import time
+from itertools import islice
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from telemetria.telemetria import TelemetrySample
+
+# Columna del historial -> campo de TelemetrySample
+COLUMN_FIELDS: Dict[str, str] = {
+    "raw_line": "raw_line",
+    "t_s": "time_s",
+    "lat": "lat_deg",
+    "lon": "lon_deg",
+    "alt_msl": "abs_alt_m",
+    "alt_rel": "rel_alt_m",
+    "roll": "roll_deg",
+    "pitch": "pitch_deg",
+    "yaw": "yaw_deg",
+    "vn": "vx_ms",
+    "ve": "vy_ms",
+    "vd": "vz_ms",
+    "v": "groundspeed_ms",
+    "vbat": "voltage_v",
+    "bat_pct": "battery_percent",
+    "modo": "flight_mode",
+    "en_aire": "in_air",
+    "gps_fix": "gps_fix_type",
+    "sats": "num_sat",
+    "temp": "temp_c",
+    "hum": "hum_pct",
+    "pres": "pres_hpa",
+    "rad": "rad_mwcm2",
+    "acc": "acc_ms2",
+}
+_STR_FIELDS = ("raw_line", "flight_mode")
+_INT_FIELDS = ("gps_fix_type", "num_sat")
+
+REPLAY_SPEEDS = (("1×", 1.0), ("10×", 10.0), ("Máxima", 0.0))
+
+
+def _sample_from_row(columns: List[str], row) -> TelemetrySample:
+    """Fila (SQLite o CSV) -> TelemetrySample. En CSV los nulos llegan como ''."""
+    kwargs = {}
+    for col, v in zip(columns, row):
+        name = COLUMN_FIELDS.get(col)
+        if name is None or v is None or v == "":
+            continue
+        if name in _STR_FIELDS:
+            kwargs[name] = str(v)
+        elif name == "in_air":
+            kwargs[name] = bool(int(float(v)))
+        elif name in _INT_FIELDS:
+            kwargs[name] = int(float(v))
+        else:
+            kwargs[name] = float(v)
+    kwargs.setdefault("time_s", 0.0)
+    return TelemetrySample(**kwargs)
+
+
+def _sqlite_store(path: Path, flight: Optional[int]) -> Path:
+    """Archivo con la tabla `samples` a reproducir (resuelve el catálogo)."""
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        has_catalog = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='vuelos'"
+        ).fetchone()
+        if not has_catalog:
+            if flight is not None:
+                raise ValueError(f"{path.name} no tiene catálogo de vuelos")
+            return path
+        if flight is None:
+            row = conn.execute("SELECT archivo FROM vuelos ORDER BY id DESC LIMIT 1").fetchone()
+            if row is None:
+                return path   # solo la tabla samples previa
+        else:
+            row = conn.execute("SELECT archivo FROM vuelos WHERE id = ?", (flight,)).fetchone()
+            if row is None:
+                raise ValueError(f"No existe el vuelo {flight} en {path.name}")
+    finally:
+        conn.close()
+    store = Path(row[0])
+    if not store.is_absolute():
+        store = path.parent / store
+    if not store.exists():
+        raise ValueError(f"Falta el archivo del vuelo: {store}")
+    return store
+
+
+def _sqlite_chunks(path: Path, chunk_size: int) -> Iterator[List[TelemetrySample]]:
+    # check_same_thread=False: cada bloque puede leerse en un hilo distinto
+    # del pool de asyncio.to_thread (nunca dos a la vez).
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True,
+                           check_same_thread=False)
+    try:
+        columns = list(COLUMN_FIELDS)
+        cur = conn.execute(f"SELECT {', '.join(columns)} FROM samples ORDER BY id")
+        while True:
+            rows = cur.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield [_sample_from_row(columns, r) for r in rows]
+    finally:
+        conn.close()
+
+
+def _csv_chunks(path: Path, chunk_size: int) -> Iterator[List[TelemetrySample]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if not columns:
+            return
+        if "t_s" not in columns:
+            raise ValueError(f"{path.name}: el CSV no tiene la columna t_s")
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                break
+            yield [_sample_from_row(columns, r) for r in rows]
+
+
+def _log_chunks(path: Path, chunk_size: int) -> Iterator[List[TelemetrySample]]:
+    from telemetria.bitacora import FlightLogReader
+
+    reader = FlightLogReader(path)
+    try:
+        for start in range(0, len(reader), chunk_size):
+            stop = min(start + chunk_size, len(reader))
+            yield [reader.sample(i) for i in range(start, stop)]
+    finally:
+        reader.close()
+
+
+def _close_chunks(chunks: Iterator, read: "asyncio.Future") -> None:
+    """Cierra el lector cuando terminó la lectura que estaba en curso."""
+    if not read.cancelled():
+        read.exception()   # ya no la espera nadie
+    try:
+        chunks.close()
+    except ValueError:   # la lectura se canceló pero su hilo sigue corriendo
+        pass
+
+
+class ReplayBackend:
+    """
+    Reproduce un vuelo grabado a `speed`× (0 = sin esperas).
+
+    samples() termina al llegar al final del vuelo (o con stop()).
+    `emitted` cuenta las muestras entregadas.
+    """
+
+    def __init__(self, path: str = "", speed: Optional[float] = 1.0,
+                 flight: Optional[int] = None, chunk_size: int = 500) -> None:
+        self.path = path
+        self.speed = speed or 0.0
+        self.flight = flight
+        self.chunk_size = max(1, int(chunk_size))
+        self.emitted = 0
+        self._running: bool = False
+        self._chunks: Optional[Iterator[List[TelemetrySample]]] = None
+        self._first: Optional[List[TelemetrySample]] = None   # bloque leído en connect()
+
+    async def connect(self, endpoint: str = "", timeout_s: float = 10.0) -> None:
+        """Abre la grabación (`endpoint` es la ruta si no se dio al construir)."""
+        path = Path(self.path or endpoint)
+        if not path.is_file():
+            raise RuntimeError(f"No existe la grabación: {path}")
+        suffix = path.suffix.lower()
+        try:
+            if suffix == ".csv":
+                chunks = _csv_chunks(path, self.chunk_size)
+            elif suffix == ".bin":
+                chunks = _log_chunks(path, self.chunk_size)
+            else:
+                store = await asyncio.to_thread(_sqlite_store, path, self.flight)
+                chunks = _sqlite_chunks(store, self.chunk_size)
+            # Los lectores son generadores: el primer bloque se lee aquí para
+            # que un archivo inválido falle al conectar y no a mitad de samples()
+            self._first = await asyncio.to_thread(next, chunks, None)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            raise RuntimeError(f"No se pudo abrir {path.name}: {e}") from e
+        self._chunks = chunks
+        self.path = str(path)
+        self.emitted = 0
+        self._running = True
+
+    async def samples(self) -> AsyncIterator[TelemetrySample]:
+        if not self._running:
+            await self.connect(self.path)
+
+        chunks = self._chunks
+        batch, self._first = self._first, None
+        t_first: Optional[float] = None
+        t_prev = 0.0
+        wall0 = 0.0
+        speed = self.speed
+        read: Optional[asyncio.Future] = None
+        try:
+            while self._running:
+                if batch is None:
+                    # shield: si se cancela la tarea durante la lectura, el
+                    # bloque termina en su hilo y el generador se cierra
+                    # después (abajo)
+                    read = asyncio.ensure_future(asyncio.to_thread(next, chunks, None))
+                    batch = await asyncio.shield(read)
+                    if batch is None:
+                        break
+                for s in batch:
+                    if not self._running:
+                        break
+                    if self.speed > 0:
+                        t = s.time_s
+                        # Reinicio del reloj del enlace o cambio de velocidad:
+                        # se vuelve a anclar
+                        if t_first is None or t < t_prev or speed != self.speed:
+                            t_first = t
+                            wall0 = time.perf_counter()
+                            speed = self.speed
+                        t_prev = t
+                        delay = (t - t_first) / speed - (time.perf_counter() - wall0)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    self.emitted += 1
+                    yield s
+                batch = None
+        finally:
+            self._running = False
+            if read is not None and not read.done():
+                read.add_done_callback(lambda f: _close_chunks(chunks, f))
+            else:
+                chunks.close()
+
+    async def stop(self) -> None:
+        """Detiene la reproducción."""
+        self._running = False
@@ -0,0 +1,308 @@
+"""
+Telemetría sintética vectorizada para pruebas de carga.
+
+SyntheticGenerator arma bloques de N muestras con NumPy (una operación
+por campo y por bloque, no un cálculo escalar por muestra) y los entrega
+como TelemetryBatch. El estado que cruza bloques (tiempo, rumbo previo,
+carga consumida, generador aleatorio) vive en el objeto, así que cortar
+el vuelo en bloques de 1 o de 10 000 muestras da la misma trayectoria.
+
+Patrones (PATTERNS): "circulo", "barrido" (lawnmower, ida y vuelta sobre
+franjas paralelas) y "ocho" (lemniscata de Gerono). Sobre el patrón se
+agregan ruido gaussiano por sensor (`noise`, 1.0 = nominal), pérdidas de
+muestras (`dropout`, fracción que no llega), campos nulos sueltos
+(`null_rate`) y un modelo simple de batería: la corriente depende de la
+velocidad y del ascenso, la tensión de vacío cae con la carga consumida
+y la de la batería baja además I·R con la carga.
+
+SyntheticBackend expone la interfaz de los demás backends (connect /
+samples / stop) a `rate_hz` muestras por segundo de tiempo de vuelo;
+`speed` escala contra el reloj como en ReplayBackend (0 = sin esperas,
+tan rápido como lo consuma quien lee). batches() entrega los bloques tal
+cual, para alimentar HistorialDB.append_batch / FlightLogWriter.append_batch.
+
+No genera `raw_line` (como el camino MAVSDK): formatear texto por
+muestra sería lo más caro del generador.
+"""
+
+import asyncio
+import math
+import time
+from typing import AsyncIterator, Dict, Optional
+
+import numpy as np
+
+from telemetria.telemetria import SAMPLE_FIELDS, TelemetryBatch, TelemetrySample
+
+PATTERNS = ("circulo", "barrido", "ocho")
+
+_M_PER_DEG = 111_320.0
+_G = 9.81
+
+# Desviación típica del ruido nominal (noise=1.0) por campo
+_NOISE = {
+    "pos_m": 0.5,
+    "alt_m": 0.3,
+    "att_deg": 0.5,
+    "vel_ms": 0.1,
+    "vbat_v": 0.02,
+    "temp_c": 0.1,
+    "hum_pct": 0.3,
+    "pres_hpa": 0.05,
+    "rad_mwcm2": 0.005,
+    "acc_ms2": 0.05,
+}
+
+# Campos que null_rate puede dejar en None (sensores sueltos, no el reloj)
+_NULLABLE = ("lat_deg", "lon_deg", "abs_alt_m", "rel_alt_m", "groundspeed_ms",
+             "voltage_v", "temp_c", "hum_pct", "pres_hpa", "rad_mwcm2", "acc_ms2")
+
+
+class SyntheticGenerator:
+    """
+    Genera bloques de muestras sintéticas a `rate_hz` (tiempo de vuelo).
+
+    - size_m: radio del círculo / del ocho, o semiancho del barrido (m).
+    - speed_ms: velocidad sobre la trayectoria (m/s).
+    - battery_ah / cells: capacidad y celdas en serie del modelo de batería.
+    - seed: semilla del ruido (None = aleatoria).
+    """
+
+    def __init__(
+        self,
+        pattern: str = "circulo",
+        rate_hz: float = 10.0,
+        noise: float = 1.0,
+        dropout: float = 0.0,
+        null_rate: float = 0.0,
+        size_m: float = 50.0,
+        speed_ms: float = 5.0,
+        alt_m: float = 30.0,
+        lat0: float = 19.332,
+        lon0: float = -99.184,
+        battery_ah: float = 5.0,
+        cells: int = 4,
+        seed: Optional[int] = None,
+    ) -> None:
+        if pattern not in PATTERNS:
+            raise ValueError(f"Patrón desconocido {pattern!r}; opciones: {', '.join(PATTERNS)}")
+        if rate_hz <= 0:
+            raise ValueError("rate_hz debe ser positivo")
+        self.pattern = pattern
+        self.rate_hz = float(rate_hz)
+        self.noise = max(0.0, float(noise))
+        self.dropout = min(max(0.0, float(dropout)), 1.0)
+        self.null_rate = min(max(0.0, float(null_rate)), 1.0)
+        self.size_m = float(size_m)
+        self.speed_ms = float(speed_ms)
+        self.alt_m = float(alt_m)
+        self.lat0 = float(lat0)
+        self.lon0 = float(lon0)
+        self.battery_ah = float(battery_ah)
+        self.cells = int(cells)
+        self.rng = np.random.default_rng(seed)
+
+        self.index = 0                 # muestras generadas (incluye perdidas)
+        self.used_ah = 0.0             # carga consumida
+        self._heading: Optional[float] = None
+        self._m_per_deg_lon = _M_PER_DEG * math.cos(math.radians(self.lat0))
+
+    @property
+    def t(self) -> float:
+        """time_s de la próxima muestra."""
+        return self.index / self.rate_hz
+
+    # --- Trayectoria ----------------------------------------------------
+
+    def _path(self, t: np.ndarray):
+        """Posición (norte, este) en m y velocidad (vn, ve) en m/s."""
+        v = self.speed_ms
+        r = self.size_m
+        if self.pattern == "circulo":
+            w = v / r
+            c, s = np.cos(w * t), np.sin(w * t)
+            return r * c, r * s, -r * w * s, r * w * c
+        if self.pattern == "ocho":
+            w = v / r
+            return (r * np.sin(w * t), 0.5 * r * np.sin(2 * w * t),
+                    r * w * np.cos(w * t), r * w * np.cos(2 * w * t))
+
+        # Barrido: `legs` franjas de largo 2r separadas `gap`, recorridas de
+        # ida y luego de vuelta (la trayectoria es continua)
+        legs = 6
+        span = 2.0 * r
+        gap = span / (legs - 1)
+        total = legs * span + (legs - 1) * gap
+        s = np.mod(v * t, 2.0 * total)
+        back = s > total
+        s = np.where(back, 2.0 * total - s, s)
+        sign = np.where(back, -1.0, 1.0)
+
+        k = np.minimum(s // (span + gap), legs - 1)
+        along = s - k * (span + gap)
+        on_leg = along <= span
+        odd = np.mod(k, 2) == 1
+        east = np.where(on_leg, np.where(odd, span - along, along), np.where(odd, 0.0, span))
+        north = k * gap + np.where(on_leg, 0.0, along - span)
+        ve = np.where(on_leg, np.where(odd, -v, v), 0.0) * sign
+        vn = np.where(on_leg, 0.0, v) * sign
+        return north - r, east - r, vn, ve
+
+    # --- Bloque -----------------------------------------------------------
+
+    def block(self, n: int) -> TelemetryBatch:
+        """Las próximas `n` muestras (menos las perdidas por `dropout`)."""
+        n = int(n)
+        if n <= 0:
+            return TelemetryBatch.from_samples(())
+        rng = self.rng
+        dt = 1.0 / self.rate_hz
+        t = (self.index + np.arange(n)) * dt
+        self.index += n
+
+        def jitter(key: str) -> np.ndarray:
+            if self.noise == 0.0:
+                return np.zeros(n)
+            return rng.normal(0.0, self.noise * _NOISE[key], n)
+
+        north, east, vn, ve = self._path(t)
+
+        # Altitud: ondulación lenta sobre la altura de crucero
+        wz = 2.0 * math.pi / 60.0
+        rel_alt = self.alt_m + 3.0 * np.sin(wz * t)
+        vd = -3.0 * wz * np.cos(wz * t)
+        gs = np.sqrt(vn * vn + ve * ve)
+
+        # Rumbo y tasa de giro (continúa el rumbo del bloque anterior)
+        heading = np.arctan2(ve, vn)
+        prev = heading[0] if self._heading is None else self._heading
+        unwrapped = np.unwrap(np.concatenate(([prev], heading)))
+        turn_rate = np.diff(unwrapped) / dt
+        self._heading = float(heading[-1])
+
+        # Giro coordinado: alabeo y aceleración lateral
+        roll = np.clip(np.degrees(np.arctan(gs * turn_rate / _G)), -35.0, 35.0)
+        pitch = -np.degrees(np.arctan(0.04 * gs)) + np.degrees(np.arctan(0.1 * -vd))
+        acc = np.minimum(np.abs(gs * turn_rate), 2.0 * _G)
+
+        # Batería: corriente por velocidad y ascenso, caída de vacío + I·R
+        current = 8.0 + 0.4 * gs * gs + 4.0 * np.maximum(-vd, 0.0)
+        used = self.used_ah + np.cumsum(current) * (dt / 3600.0)
+        self.used_ah = float(used[-1])
+        soc = np.clip(1.0 - used / self.battery_ah, 0.0, 1.0)
+        ocv = self.cells * (3.45 + 0.75 * soc - 0.15 * np.exp(-15.0 * soc))
+        vbat = ocv - 0.02 * current
+
+        cols: Dict[str, object] = {
+            "time_s": t,
+            "lat_deg": self.lat0 + (north + jitter("pos_m")) / _M_PER_DEG,
+            "lon_deg": self.lon0 + (east + jitter("pos_m")) / self._m_per_deg_lon,
+            "abs_alt_m": 2240.0 + rel_alt + jitter("alt_m"),
+            "rel_alt_m": rel_alt + jitter("alt_m"),
+            "roll_deg": roll + jitter("att_deg"),
+            "pitch_deg": pitch + jitter("att_deg"),
+            "yaw_deg": np.mod(np.degrees(heading) + jitter("att_deg"), 360.0),
+            "vx_ms": vn + jitter("vel_ms"),
+            "vy_ms": ve + jitter("vel_ms"),
+            "vz_ms": vd + jitter("vel_ms"),
+            "groundspeed_ms": gs + jitter("vel_ms"),
+            "voltage_v": vbat + jitter("vbat_v"),
+            "battery_percent": 100.0 * soc,
+            "flight_mode": "DEMO",
+            "in_air": True,
+            "gps_fix_type": 3,
+            "num_sat": rng.integers(10, 15, n),
+            "temp_c": 24.0 + 0.8 * np.sin(0.05 * t) + jitter("temp_c"),
+            "hum_pct": 45.0 + 8.0 * np.cos(0.03 * t) + jitter("hum_pct"),
+            "pres_hpa": 1012.0 + 1.0 * np.sin(0.01 * t) + jitter("pres_hpa"),
+            "rad_mwcm2": 0.25 + 0.05 * np.sin(0.07 * t) + jitter("rad_mwcm2"),
+            "acc_ms2": acc + jitter("acc_ms2"),
+            "raw_line": None,
+        }
+
+        keep = None
+        if self.dropout > 0.0:
+            keep = rng.random(n) >= self.dropout
+            n = int(keep.sum())
+
+        columns = {}
+        for name in SAMPLE_FIELDS:
+            col = cols[name]
+            if isinstance(col, np.ndarray):
+                if keep is not None:
+                    col = col[keep]
+                columns[name] = col.tolist()
+            else:
+                columns[name] = (col,) * n
+
+        if self.null_rate > 0.0 and n:
+            for name in _NULLABLE:
+                values = columns[name]
+                for i in np.flatnonzero(rng.random(n) < self.null_rate).tolist():
+                    values[i] = None
+
+        return TelemetryBatch({k: tuple(v) for k, v in columns.items()}, n)
+
+
+class SyntheticBackend:
+    """
+    Backend sintético a `rate_hz` y `speed`× (0 = sin esperas).
+
+    Con espera, cada bloque cubre `tick_s` de reloj y se entrega cuando
+    le toca a su primera muestra; sin espera, se entregan bloques de
+    `block_size` y se cede el bucle de eventos entre bloque y bloque.
+    `emitted` cuenta las muestras entregadas.
+    """
+
+    def __init__(self, pattern: str = "circulo", rate_hz: float = 10.0,
+                 speed: Optional[float] = 1.0, block_size: int = 1000,
+                 tick_s: float = 0.05, **params) -> None:
+        self.generator = SyntheticGenerator(pattern, rate_hz, **params)
+        self.speed = speed or 0.0
+        self.block_size = max(1, int(block_size))
+        self.tick_s = max(0.001, float(tick_s))
+        self.emitted = 0
+        self._running: bool = False
+
+    async def connect(self, endpoint: str = "", timeout_s: float = 10.0) -> None:
+        """Sin enlace: solo habilita la generación."""
+        self._running = True
+
+    async def batches(self) -> AsyncIterator[TelemetryBatch]:
+        if not self._running:
+            await self.connect()
+
+        gen = self.generator
+        t_first: Optional[float] = None
+        wall0 = 0.0
+        speed = self.speed
+        while self._running:
+            if self.speed > 0:
+                # Cambio de velocidad: se vuelve a anclar el reloj
+                if t_first is None or speed != self.speed:
+                    t_first = gen.t
+                    wall0 = time.perf_counter()
+                    speed = self.speed
+                delay = (gen.t - t_first) / speed - (time.perf_counter() - wall0)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                n = max(1, round(gen.rate_hz * speed * self.tick_s))
+            else:
+                t_first = None
+                n = self.block_size
+            batch = gen.block(n)
+            if not self._running:
+                break
+            self.emitted += len(batch)
+            yield batch
+            if self.speed <= 0:
+                await asyncio.sleep(0)
+
+    async def samples(self) -> AsyncIterator[TelemetrySample]:
+        async for batch in self.batches():
+            for s in batch.samples():
+                yield s
+
+    async def stop(self) -> None:
+        """Detiene la generación."""
+        self._running = False
@@ -1,8 +1,12 @@
 import asyncio
 import math
 import time
-from dataclasses import dataclass
-from typing import AsyncIterator, Optional, Dict
+from dataclasses import dataclass, fields
+from collections import deque
+from operator import attrgetter
+from typing import AsyncIterator, Deque, Iterable, Iterator, List, Optional, Dict, Tuple
+
+from telemetria.trama_lora import LoRaMessage, LoRaStreamDecoder
 
 # MAVSDK opcional
 MAVSDK_OK = True
@@ -19,7 +23,7 @@ except Exception:
     SERIAL_OK = False
 
 
-@dataclass
+@dataclass(slots=True)
 class TelemetrySample:
     time_s: float
     # navegación / actitud / vel
@@ -52,6 +56,249 @@ class TelemetrySample:
     raw_line: Optional[str] = None
 
 
+SAMPLE_FIELDS = tuple(f.name for f in fields(TelemetrySample))
+_FIELD_INDEX: Dict[str, int] = {name: i for i, name in enumerate(SAMPLE_FIELDS)}
+
+# Todos los campos de una muestra en una sola llamada (tupla en orden de SAMPLE_FIELDS)
+sample_values = attrgetter(*SAMPLE_FIELDS)
+
+
+class TelemetryBatch:
+    """
+    Lote de N muestras guardado por columnas: una tupla por campo de
+    SAMPLE_FIELDS. Se arma con una sola transposición (zip) a partir de
+    las muestras y de ahí pasa directo a NumPy (array) o a executemany
+    (rows / column), sin releer atributo por atributo.
+    """
+
+    __slots__ = ("columns", "_n")
+
+    def __init__(self, columns: Dict[str, tuple], n: int):
+        self.columns = columns
+        self._n = n
+
+    @classmethod
+    def from_samples(cls, samples: Iterable) -> "TelemetryBatch":
+        rows = list(map(sample_values, samples))
+        if rows:
+            cols = zip(*rows)
+        else:
+            cols = ((),) * len(SAMPLE_FIELDS)
+        return cls(dict(zip(SAMPLE_FIELDS, cols)), len(rows))
+
+    def __len__(self) -> int:
+        return self._n
+
+    def column(self, name: str) -> tuple:
+        return self.columns[name]
+
+    def array(self, name: str, fill: float = math.nan, dtype="float64"):
+        """Columna como arreglo NumPy (None -> `fill`)."""
+        import numpy as np
+
+        col = self.columns[name]
+        return np.fromiter((fill if v is None else v for v in col), dtype=dtype, count=self._n)
+
+    def null_mask(self, name: str):
+        """True donde el campo era None."""
+        import numpy as np
+
+        return np.fromiter((v is None for v in self.columns[name]), dtype=bool, count=self._n)
+
+    def rows(self) -> Iterator[Tuple]:
+        """Tuplas por muestra, en el orden de SAMPLE_FIELDS."""
+        return zip(*self.columns.values())
+
+    def sample(self, i: int) -> TelemetrySample:
+        return TelemetrySample(*(col[i] for col in self.columns.values()))
+
+    def samples(self) -> Iterator[TelemetrySample]:
+        return (TelemetrySample(*row) for row in self.rows())
+
+
+class TelemetrySnapshot:
+    """
+    Foto inmutable del estado fusionado en un instante (camino MAVSDK).
+
+    Se lee igual que un TelemetrySample (s.lat_deg, getattr(s, ...)), pero
+    guarda solo dos tuplas: los valores en el orden de SAMPLE_FIELDS y,
+    para cada campo, el `time_s` de su última actualización (None si nunca
+    llegó). Crearla es copiar dos listas a tuplas, sin pasar por el
+    __init__ del dataclass. Los campos son propiedades sin setter: asignar
+    s.lat_deg = ... lanza AttributeError.
+    """
+
+    __slots__ = ("_values", "_stamps")
+
+    def __init__(self, values: tuple, stamps: tuple):
+        self._values = values
+        self._stamps = stamps
+
+    def updated_at(self, name: str) -> Optional[float]:
+        """time_s de la última actualización de `name` (None = nunca)."""
+        return self._stamps[_FIELD_INDEX[name]]
+
+    def age(self, name: str) -> Optional[float]:
+        """Antigüedad de `name` respecto a esta foto, en segundos."""
+        t = self._stamps[_FIELD_INDEX[name]]
+        return None if t is None else self._values[0] - t
+
+    def to_sample(self) -> TelemetrySample:
+        return TelemetrySample(*self._values)
+
+    def __repr__(self) -> str:
+        inner = ", ".join(f"{n}={v!r}" for n, v in zip(SAMPLE_FIELDS, self._values)
+                          if v is not None)
+        return f"TelemetrySnapshot({inner})"
+
+
+def _field_getter(i: int):
+    return property(lambda self: self._values[i])
+
+
+for _i, _name in enumerate(SAMPLE_FIELDS):
+    setattr(TelemetrySnapshot, _name, _field_getter(_i))
+assert SAMPLE_FIELDS[0] == "time_s"
+
+
+class _SnapshotMerger:
+    """
+    Estado fusionado de las suscripciones MAVSDK: cada tarea escribe sus
+    campos con set() y el bucle de posición publica snapshot(). Las fotos
+    ya entregadas no cambian aunque sigan llegando actualizaciones.
+    """
+
+    __slots__ = ("values", "stamps")
+
+    def __init__(self):
+        self.values: List = [None] * len(SAMPLE_FIELDS)
+        self.values[0] = 0.0
+        self.stamps: List[Optional[float]] = [None] * len(SAMPLE_FIELDS)
+
+    def set(self, t: float, **updates):
+        values, stamps = self.values, self.stamps
+        for name, v in updates.items():
+            i = _FIELD_INDEX[name]
+            values[i] = v
+            stamps[i] = t
+
+    def snapshot(self) -> TelemetrySnapshot:
+        return TelemetrySnapshot(tuple(self.values), tuple(self.stamps))
+
+
+def _velocity_fields(v) -> Dict:
+    gs = None
+    if None not in (v.north_m_s, v.east_m_s, v.down_m_s):
+        gs = (v.north_m_s**2 + v.east_m_s**2 + v.down_m_s**2) ** 0.5
+    return dict(vx_ms=v.north_m_s, vy_ms=v.east_m_s, vz_ms=v.down_m_s, groundspeed_ms=gs)
+
+
+# Tópicos MAVSDK: nombre -> (método set_rate_* o None, campos a partir del mensaje)
+MAVSDK_TOPICS = {
+    "position": ("set_rate_position", lambda p: dict(
+        lat_deg=p.latitude_deg,
+        lon_deg=p.longitude_deg,
+        abs_alt_m=p.absolute_altitude_m,
+        rel_alt_m=getattr(p, "relative_altitude_m", None),
+    )),
+    "attitude_euler": ("set_rate_attitude_euler", lambda a: dict(
+        roll_deg=a.roll_deg, pitch_deg=a.pitch_deg, yaw_deg=a.yaw_deg,
+    )),
+    "velocity_ned": ("set_rate_velocity_ned", _velocity_fields),
+    "battery": ("set_rate_battery", lambda b: dict(
+        voltage_v=b.voltage_v,
+        battery_percent=(
+            b.remaining_percent * 100.0 if b.remaining_percent is not None else None
+        ),
+    )),
+    "gps_info": ("set_rate_gps_info", lambda g: dict(
+        gps_fix_type=int(getattr(g.fix_type, "value", 0)), num_sat=g.num_satellites,
+    )),
+    "flight_mode": (None, lambda fm: dict(flight_mode=fm.name)),
+    "in_air": ("set_rate_in_air", lambda s: dict(in_air=bool(s))),
+}
+
+# Tasa pedida al autopiloto por tópico (Hz); 0 = no suscribirse
+DEFAULT_STREAM_RATES_HZ: Dict[str, float] = {
+    "position": 10.0,
+    "attitude_euler": 50.0,
+    "velocity_ned": 10.0,
+    "battery": 1.0,
+    "gps_info": 1.0,
+    "flight_mode": 1.0,
+    "in_air": 1.0,
+}
+
+# Tópicos que publican una muestra nueva al llegar (el resto solo actualiza)
+DEFAULT_EMIT_TOPICS = ("position", "attitude_euler")
+
+
+class _MavsdkStreams:
+    """
+    Dueño de las suscripciones MAVSDK de una conexión.
+
+    start() fija la tasa de cada tópico (set_rate_*) y lanza una tarea por
+    tópico; cada tarea vuelca sus campos en el _SnapshotMerger y, si el
+    tópico emite, marca `changed`. stop() cancela y espera todas las
+    tareas. Si una suscripción falla, el error queda en `error` y se
+    despierta al consumidor.
+    """
+
+    def __init__(self, telemetry, state: "_SnapshotMerger", clock,
+                 rates_hz: Dict[str, float], emit_topics):
+        self.telemetry = telemetry
+        self.state = state
+        self.clock = clock
+        self.rates_hz = rates_hz
+        self.emit_topics = frozenset(emit_topics)
+        self.changed = asyncio.Event()
+        self.error: Optional[BaseException] = None
+        self.rate_errors: Dict[str, str] = {}
+        self.tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        for topic, (set_rate, _) in MAVSDK_TOPICS.items():
+            hz = self.rates_hz.get(topic, 0.0)
+            if hz <= 0:
+                continue
+            if set_rate is not None and hasattr(self.telemetry, set_rate):
+                try:
+                    await getattr(self.telemetry, set_rate)(hz)
+                except Exception as e:
+                    # Algunos autopilotos rechazan la tasa: se sigue con la suya
+                    self.rate_errors[topic] = str(e)
+            task = asyncio.create_task(self._run(topic), name=f"mavsdk-{topic}")
+            task.add_done_callback(self._on_done)
+            self.tasks.append(task)
+
+    async def _run(self, topic: str):
+        to_fields = MAVSDK_TOPICS[topic][1]
+        state, clock, changed = self.state, self.clock, self.changed
+        emits = topic in self.emit_topics
+        async for msg in getattr(self.telemetry, topic)():
+            state.set(clock(), **to_fields(msg))
+            if emits:
+                changed.set()
+
+    def _on_done(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        exc = task.exception()
+        if exc is None:
+            exc = RuntimeError(f"Se cerró la suscripción MAVSDK {task.get_name()}")
+        if self.error is None:
+            self.error = exc
+        self.changed.set()
+
+    async def stop(self):
+        tasks, self.tasks = self.tasks, []
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self.changed.set()
+
+
 # ----------------------------------------------------------------------
 #  BackendTelemetria: DEMO o MAVSDK
 # ----------------------------------------------------------------------
@@ -73,6 +320,11 @@ class BackendTelemetria:
 
         self._running: bool = False
 
+        # MAVSDK: tasa por tópico y tópicos que publican muestra
+        self.stream_rates_hz: Dict[str, float] = dict(DEFAULT_STREAM_RATES_HZ)
+        self.emit_topics = DEFAULT_EMIT_TOPICS
+        self._streams: Optional[_MavsdkStreams] = None
+
     async def connect(self, endpoint: str, timeout_s: float = 10.0) -> None:
         """
         Conectarse al backend:
@@ -178,100 +430,221 @@ class BackendTelemetria:
             return  # por si alguien sale del while
 
         # ---------------------- MAVSDK real ----------------------
-        last = TelemetrySample(time_s=0.0)
+        state = _SnapshotMerger()
         t0 = time.perf_counter()
 
-        async def _att():
-            async for a in self.system.telemetry.attitude_euler():
-                last.roll_deg = a.roll_deg
-                last.pitch_deg = a.pitch_deg
-                last.yaw_deg = a.yaw_deg
-
-        async def _vel():
-            async for v in self.system.telemetry.velocity_ned():
-                last.vx_ms = v.north_m_s
-                last.vy_ms = v.east_m_s
-                last.vz_ms = v.down_m_s
-                if None not in (v.north_m_s, v.east_m_s, v.down_m_s):
-                    last.groundspeed_ms = (
-                        v.north_m_s**2 + v.east_m_s**2 + v.down_m_s**2
-                    ) ** 0.5
-
-        async def _bat():
-            async for b in self.system.telemetry.battery():
-                last.voltage_v = b.voltage_v
-                last.battery_percent = (
-                    b.remaining_percent * 100.0 if b.remaining_percent is not None else None
-                )
+        def now() -> float:
+            return time.perf_counter() - t0
+
+        if self._streams is not None:
+            await self._streams.stop()
+        streams = _MavsdkStreams(self.system.telemetry, state, now,
+                                 self.stream_rates_hz, self.emit_topics)
+        self._streams = streams
+        await streams.start()
 
-        async def _gps():
-            async for g in self.system.telemetry.gps_info():
-                last.gps_fix_type = int(getattr(g.fix_type, "value", 0))
-                last.num_sat = g.num_satellites
-
-        async def _mode():
-            async for fm in self.system.telemetry.flight_mode():
-                last.flight_mode = fm.name
-
-        async def _air():
-            async for s in self.system.telemetry.in_air():
-                last.in_air = bool(s)
-
-        # Lanza tareas en paralelo
-        asyncio.create_task(_att())
-        asyncio.create_task(_vel())
-        asyncio.create_task(_bat())
-        asyncio.create_task(_gps())
-        asyncio.create_task(_mode())
-        asyncio.create_task(_air())
-
-        async for p in self.system.telemetry.position():
-            last.time_s = time.perf_counter() - t0
-            last.lat_deg = p.latitude_deg
-            last.lon_deg = p.longitude_deg
-            last.abs_alt_m = p.absolute_altitude_m
-            last.rel_alt_m = getattr(p, "relative_altitude_m", None)
-
-            # Contrato parcial (sin espacios, minúsculas)
-            parts = []
-
-            def add(k, v):
-                if v is not None:
-                    if isinstance(v, float):
-                        parts.append(f"{k}:{v:.4f}")
-                    else:
-                        parts.append(f"{k}:{v}")
-
-            add("lat", last.lat_deg)
-            add("lon", last.lon_deg)
-            add("speed", last.groundspeed_ms)
-            add("vbat", last.voltage_v)
-            add("bat", last.battery_percent)
-            add("ts", last.time_s)
-            last.raw_line = ",".join(parts)
-
-            yield last
+        values = state.values
+        i_lat, i_lon, i_speed, i_vbat, i_bat = (
+            _FIELD_INDEX[n]
+            for n in ("lat_deg", "lon_deg", "groundspeed_ms", "voltage_v", "battery_percent")
+        )
+
+        try:
+            while self._running:
+                # Una muestra por ráfaga de tópicos emisores (posición o actitud)
+                await streams.changed.wait()
+                streams.changed.clear()
+                if streams.error is not None:
+                    raise streams.error
+                if not self._running:
+                    break
+                t = now()
+
+                # Contrato parcial (sin espacios, minúsculas)
+                parts = []
+
+                def add(k, v):
+                    if v is not None:
+                        if isinstance(v, float):
+                            parts.append(f"{k}:{v:.4f}")
+                        else:
+                            parts.append(f"{k}:{v}")
+
+                add("lat", values[i_lat])
+                add("lon", values[i_lon])
+                add("speed", values[i_speed])
+                add("vbat", values[i_vbat])
+                add("bat", values[i_bat])
+                add("ts", t)
+                state.set(t, time_s=t, raw_line=",".join(parts))
+
+                # Foto inmutable: lo que llegue después no altera lo ya entregado
+                yield state.snapshot()
+        finally:
+            await streams.stop()
 
     async def stop(self) -> None:
-        """Detiene el backend de telemetría."""
+        """Detiene el backend de telemetría (y cancela las suscripciones MAVSDK)."""
         self._running = False
+        if self._streams is not None:
+            await self._streams.stop()
 
 
 # ----------------------------------------------------------------------
 #  LoRaBackend: lee contrato por puerto serie
 # ----------------------------------------------------------------------
+# Contrato LoRa: clave -> campo de TelemetrySample
+LORA_KEYS: Dict[str, str] = {
+    "temp": "temp_c",
+    "hum": "hum_pct",
+    "pres": "pres_hpa",
+    "rad": "rad_mwcm2",
+    "lat": "lat_deg",
+    "lon": "lon_deg",
+    "speed": "groundspeed_ms",
+    "acc": "acc_ms2",
+    "vbat": "voltage_v",
+    "bat": "battery_percent",
+    "ts": "time_s",
+}
+
+
+# Misma tabla con claves str y bytes: se puede parsear sin decodificar
+_LORA_TABLE: Dict = {**LORA_KEYS, **{k.encode(): v for k, v in LORA_KEYS.items()}}
+
+
+def parse_lora_fields(line) -> Dict[str, float]:
+    """
+    Una pasada sobre `clave:valor,...` -> {campo de TelemetrySample: float}.
+    Acepta str o bytes (float() convierte bytes directamente). La clave se
+    busca tal cual en la tabla (caso normal del contrato) y solo si no
+    aparece se normaliza (espacios / mayúsculas). Claves desconocidas y
+    valores no numéricos se ignoran; si una clave se repite gana la última.
+    """
+    out: Dict[str, float] = {}
+    keys = _LORA_TABLE
+    if isinstance(line, str):
+        comma, colon = ",", ":"
+    else:
+        comma, colon = b",", b":"
+    for part in line.split(comma):
+        k, sep, v = part.partition(colon)
+        name = keys.get(k)
+        if name is None:
+            if not sep:
+                continue
+            name = keys.get(k.strip().lower())
+            if name is None:
+                continue
+        try:
+            out[name] = float(v)   # float() ya ignora espacios alrededor
+        except ValueError:
+            pass
+    return out
+
+
+def parse_lora_line(line: str, t_default: float = 0.0) -> TelemetrySample:
+    """Línea del contrato LoRa -> TelemetrySample (t_default si no trae `ts`)."""
+    fields = parse_lora_fields(line)
+    if "time_s" not in fields:
+        fields["time_s"] = t_default
+    return TelemetrySample(flight_mode="LORA", raw_line=line, **fields)
+
+
+class _LoRaProtocol(asyncio.BufferedProtocol):
+    """
+    Protocolo del puerto serie: lo recibido cae en el búfer reutilizable
+    del decodificador (get_buffer / buffer_updated) y los mensajes
+    completos quedan en `pending` hasta que samples() los consume.
+
+    El tiempo de espera sin datos lo vigila un único temporizador que se
+    rearma una vez por periodo (no uno por línea ni por lectura).
+    """
+
+    def __init__(self, decoder: LoRaStreamDecoder, idle_timeout_s: float):
+        self.decoder = decoder
+        self.idle_timeout_s = idle_timeout_s
+        self.pending: Deque[LoRaMessage] = deque()
+        self.transport = None
+        self.closed = False
+        self.error: Optional[BaseException] = None
+        self.idle_periods = 0
+        self._loop = asyncio.get_running_loop()
+        self._last_rx = 0.0
+        self._waiter: Optional[asyncio.Future] = None
+        self._watchdog: Optional[asyncio.TimerHandle] = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self._last_rx = self._loop.time()
+        self._watchdog = self._loop.call_later(self.idle_timeout_s, self._check_idle)
+
+    def get_buffer(self, sizehint: int):
+        return self.decoder.get_buffer(sizehint)
+
+    def buffer_updated(self, nbytes: int):
+        self._received(self.decoder.buffer_updated(nbytes))
+
+    def data_received(self, data: bytes):
+        # pyserial-asyncio entrega bytes aunque el protocolo sea "buffered"
+        self._received(self.decoder.feed(data))
+
+    def _received(self, msgs: List[LoRaMessage]):
+        self._last_rx = self._loop.time()
+        if msgs:
+            self.pending.extend(msgs)
+            self.wake()
+
+    def connection_lost(self, exc):
+        self.closed = True
+        self.error = exc
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+        self.wake()
+
+    def _check_idle(self):
+        now = self._loop.time()
+        idle = now - self._last_rx
+        if idle >= self.idle_timeout_s:
+            self.idle_periods += 1
+            self._last_rx = now
+            self.wake()
+            idle = 0.0
+        self._watchdog = self._loop.call_later(self.idle_timeout_s - idle, self._check_idle)
+
+    def wake(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def wait(self):
+        """Espera mensajes nuevos, cierre del puerto o un periodo sin datos."""
+        if self.pending or self.closed:
+            return
+        self._waiter = self._loop.create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+
+
 class LoRaBackend:
     """
     Lee de un puerto serial (LoRa) líneas:
       clave:valor,clave:valor,...\\n
     Claves esperadas: temp,hum,pres,rad,lat,lon,speed,acc,ts, vbat, bat (sin espacios, minúsculas).
+    También acepta tramas binarias (telemetria.trama_lora) en el mismo
+    puerto; se detectan solas por la palabra de sincronía. En el historial
+    la trama queda en raw_line como hex.
     """
 
     def __init__(self, port: str, baud: int = 57600) -> None:
         self.port = port
         self.baud = baud
+        self.buffer_size: int = 4096      # búfer de recepción inicial (crece si hace falta)
+        self.read_timeout_s: float = 2.0  # periodo sin datos que se reporta como inactivo
         self._running: bool = False
-        self._reader: Optional[asyncio.StreamReader] = None
+        self._protocol: Optional[_LoRaProtocol] = None
+        self.decoder = LoRaStreamDecoder(LORA_KEYS, parse_lora_fields)
 
     async def connect(self, _: str, timeout_s: float = 10.0) -> None:
         if not SERIAL_OK:
@@ -279,9 +652,14 @@ class LoRaBackend:
                 "pyserial-asyncio no está instalado. Revisa requirements.txt"
             )
 
+        self.decoder = LoRaStreamDecoder(LORA_KEYS, parse_lora_fields, self.buffer_size)
+        loop = asyncio.get_running_loop()
         try:
-            self._reader, _ = await serial_asyncio.open_serial_connection(
-                url=self.port, baudrate=self.baud
+            _, self._protocol = await serial_asyncio.create_serial_connection(
+                loop,
+                lambda: _LoRaProtocol(self.decoder, self.read_timeout_s),
+                self.port,
+                baudrate=self.baud,
             )
         except Exception as e:
             raise RuntimeError(f"No se pudo abrir {self.port}@{self.baud}: {e}") from e
@@ -293,94 +671,26 @@ class LoRaBackend:
             await self.connect(self.port)
 
         t0 = time.perf_counter()
+        proto = self._protocol
+        pending = proto.pending
 
         while self._running:
-            try:
-                line_bytes = await asyncio.wait_for(
-                    self._reader.readline(), timeout=2.0
-                )
-            except asyncio.TimeoutError:
-                continue
-
-            if not line_bytes:
+            if not pending:
+                if proto.closed:
+                    raise RuntimeError(f"Se cerró {self.port}: {proto.error or 'sin datos'}")
+                await proto.wait()
                 continue
 
-            try:
-                line = line_bytes.decode("utf-8", errors="ignore").strip()
-                if not line:
-                    continue
-
-                data = self._parse_line(line)
-
-                if data.get("ts") is not None:
-                    t = float(data.get("ts"))
-                else:
-                    t = time.perf_counter() - t0
-
-                def f(key: str) -> Optional[float]:
-                    try:
-                        v = data.get(key)
-                        return float(v) if v is not None else None
-                    except Exception:
-                        return None
-
-                lat = f("lat")
-                lon = f("lon")
-                spd = f("speed")
-                acc = f("acc")
-                temp = f("temp")
-                hum = f("hum")
-                pres = f("pres")
-                rad = f("rad")
-                vbat = f("vbat")
-                batp = f("bat")
-
-                yield TelemetrySample(
-                    time_s=t,
-                    lat_deg=lat,
-                    lon_deg=lon,
-                    abs_alt_m=None,
-                    rel_alt_m=None,
-                    roll_deg=None,
-                    pitch_deg=None,
-                    yaw_deg=None,
-                    vx_ms=None,
-                    vy_ms=None,
-                    vz_ms=None,
-                    groundspeed_ms=spd,
-                    voltage_v=vbat,
-                    battery_percent=batp,
-                    flight_mode="LORA",
-                    in_air=None,
-                    gps_fix_type=None,
-                    num_sat=None,
-                    temp_c=temp,
-                    hum_pct=hum,
-                    pres_hpa=pres,
-                    rad_mwcm2=rad,
-                    acc_ms2=acc,
-                    raw_line=line,  # guardamos EXACTAMENTE lo que llega
-                )
-            except Exception:
-                # Si llega basura, la ignoramos
-                continue
-
-    @staticmethod
-    def _parse_line(line: str) -> Dict[str, float]:
-        out: Dict[str, float] = {}
-        for part in line.split(","):
-            if ":" not in part:
-                continue
-            k, v = part.split(":", 1)
-            k = k.strip().lower()
-            v = v.strip()
-            try:
-                out[k] = float(v)
-            except Exception:
-                # Ignora valores no numéricos
-                pass
-        return out
+            msg = pending.popleft()
+            fields = msg.fields
+            if "time_s" not in fields:
+                fields["time_s"] = time.perf_counter() - t0
+            yield TelemetrySample(flight_mode="LORA", raw_line=msg.text, **fields)
 
     async def stop(self) -> None:
-        """Detiene la lectura por LoRa."""
+        """Detiene la lectura por LoRa y cierra el puerto."""
         self._running = False
+        if self._protocol is not None:
+            if self._protocol.transport is not None:
+                self._protocol.transport.close()
+            self._protocol.wake()
@@ -0,0 +1,252 @@
+"""
+Trama binaria compacta para el enlace LoRa (alternativa al texto).
+
+El contrato de texto `clave:valor,...` ocupa ~90 bytes por muestra; la
+trama binaria lleva los mismos campos como enteros escalados en ~34:
+
+    AA 55            palabra de sincronía
+    LL               largo de la carga (máscara + campos), 1 byte
+    MM MM            máscara de campos presentes (uint16 LE)
+    ...              campos presentes, en el orden de FRAME_FIELDS (LE)
+    CC CC            CRC-16/CCITT (poly 0x1021, init 0xFFFF) de LL..campos
+
+Una trama con CRC o largo incorrecto no se salta según su largo (que
+puede ser justo el byte dañado): se descarta solo el byte de sincronía y
+se vuelve a buscar el siguiente AA 55; el resto de la trama dañada, hasta
+el siguiente salto de línea, no se entrega como texto.
+
+El byte 0xAA nunca aparece en el texto ASCII del contrato, así que texto
+y tramas pueden convivir en el mismo puerto: LoRaStreamDecoder separa
+ambos y entrega líneas de texto y campos decodificados.
+"""
+
+import struct
+from binascii import crc_hqx
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+SYNC = b"\xAA\x55"
+_HEAD = 3                     # sync + largo
+_CRC = struct.Struct("<H")
+_MASK = struct.Struct("<H")
+
+# (clave del contrato, formato struct, escala): valor = entero * escala
+FRAME_FIELDS: Tuple[Tuple[str, str, float], ...] = (
+    ("temp", "h", 0.01),      # °C
+    ("hum", "H", 0.01),       # %
+    ("pres", "H", 0.1),       # hPa
+    ("rad", "H", 0.001),      # mW/cm²
+    ("lat", "i", 1e-7),       # grados
+    ("lon", "i", 1e-7),       # grados
+    ("speed", "H", 0.01),     # m/s
+    ("acc", "h", 0.01),       # m/s²
+    ("vbat", "H", 0.001),     # V
+    ("bat", "B", 1.0),        # %
+    ("ts", "I", 0.01),        # s
+)
+_LIMITS = {"h": (-32768, 32767), "H": (0, 65535), "i": (-2**31, 2**31 - 1),
+           "B": (0, 255), "I": (0, 2**32 - 1)}
+
+MAX_LINE = 1024               # texto sin salto de línea más largo que esto se descarta
+
+
+def crc16(data) -> int:
+    """CRC-16/CCITT-FALSE (el mismo que calcula el firmware)."""
+    return crc_hqx(data, 0xFFFF)
+
+
+def encode_frame(values: Dict[str, float]) -> bytes:
+    """
+    Empaqueta {clave del contrato: valor} en una trama (referencia para el
+    firmware y para pruebas). Claves ausentes o None no se envían; los
+    valores fuera de rango se saturan.
+    """
+    mask = 0
+    fmt = "<"
+    ints = []
+    for bit, (key, code, scale) in enumerate(FRAME_FIELDS):
+        v = values.get(key)
+        if v is None:
+            continue
+        lo, hi = _LIMITS[code]
+        mask |= 1 << bit
+        fmt += code
+        ints.append(min(hi, max(lo, round(v / scale))))
+    body = _MASK.pack(mask) + struct.pack(fmt, *ints)
+    head = bytes((len(body),)) + body
+    return SYNC + head + _CRC.pack(crc16(head))
+
+
+class _Layout(NamedTuple):
+    struct: struct.Struct
+    names: Tuple[str, ...]
+    scales: Tuple[float, ...]
+
+
+class LoRaMessage(NamedTuple):
+    """Mensaje del enlace (línea de texto o trama)."""
+    fields: Optional[Dict[str, float]]   # None si no hay parser de texto
+    text: str                            # línea de texto, o la trama en hex
+
+
+TextParser = Callable[[bytes], Dict[str, float]]
+
+
+class LoRaStreamDecoder:
+    """
+    Separa el flujo de bytes del puerto en líneas de texto y tramas.
+
+    Trabaja sobre un único bytearray reutilizable: los bytes se reciben
+    directamente en él (get_buffer / buffer_updated, como un
+    asyncio.BufferedProtocol) o se copian con feed(data). Las líneas y
+    tramas se buscan en el lugar (find / unpack_from con desplazamiento);
+    lo incompleto queda en el búfer y solo se compacta al faltar espacio.
+
+    `key_map` traduce la clave del contrato al nombre del campo de salida
+    (p. ej. LORA_KEYS). `text_parser`, si se da, convierte cada línea de
+    texto (bytes, sin decodificar) en campos.
+    """
+
+    def __init__(self, key_map: Optional[Dict[str, str]] = None,
+                 text_parser: Optional[TextParser] = None, capacity: int = 4096):
+        self.key_map = key_map or {}
+        self.text_parser = text_parser
+        self._buf = bytearray(max(_HEAD + 255 + _CRC.size, int(capacity)))
+        self._view = memoryview(self._buf)
+        self._start = 0          # primer byte sin procesar
+        self._end = 0            # fin de los datos recibidos
+        self._layouts: Dict[int, _Layout] = {}
+        self.lines = 0
+        self.frames = 0
+        self.bad_frames = 0
+        self.dropped_bytes = 0
+        self._resync = False     # tras una trama dañada: descartar hasta \n o AA 55
+
+    # --- Búfer ----------------------------------------------------------
+
+    def _reserve(self, need: int):
+        """Garantiza `need` bytes libres al final (compacta o agranda)."""
+        if len(self._buf) - self._end >= need:
+            return
+        live = self._end - self._start
+        if self._start:
+            # bytes(): origen y destino se solapan
+            self._buf[:live] = bytes(self._view[self._start:self._end])
+            self._start, self._end = 0, live
+        if len(self._buf) - live < need:
+            # Búfer nuevo: el anterior puede tener vistas exportadas
+            buf = bytearray(max(2 * len(self._buf), live + need))
+            buf[:live] = self._view[:live]
+            self._view.release()
+            self._buf = buf
+            self._view = memoryview(buf)
+
+    def get_buffer(self, sizehint: int = -1) -> memoryview:
+        """Zona libre donde el transporte escribe lo recibido."""
+        self._reserve(max(sizehint, 1024))
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> List[LoRaMessage]:
+        """Se recibieron `nbytes` en la zona de get_buffer()."""
+        self._end += nbytes
+        return self._process()
+
+    def feed(self, data) -> List[LoRaMessage]:
+        """Copia `data` al búfer y devuelve los mensajes completos."""
+        n = len(data)
+        self._reserve(n)
+        self._buf[self._end:self._end + n] = data
+        self._end += n
+        return self._process()
+
+    # --- Decodificación -------------------------------------------------
+
+    def _layout(self, mask: int) -> Optional[_Layout]:
+        """Struct precompilado por máscara (se arma una vez por combinación)."""
+        layout = self._layouts.get(mask)
+        if layout is None:
+            if mask >> len(FRAME_FIELDS):
+                return None
+            fmt, names, scales = "<", [], []
+            for bit, (key, code, scale) in enumerate(FRAME_FIELDS):
+                if mask & (1 << bit):
+                    fmt += code
+                    names.append(self.key_map.get(key, key))
+                    scales.append(scale)
+            layout = _Layout(struct.Struct(fmt), tuple(names), tuple(scales))
+            self._layouts[mask] = layout
+        return layout
+
+    def _decode(self, pos: int, size: int) -> Optional[Dict[str, float]]:
+        """Campos de la carga que empieza en `pos` (máscara + enteros)."""
+        (mask,) = _MASK.unpack_from(self._buf, pos)
+        layout = self._layout(mask)
+        if layout is None or layout.struct.size != size - _MASK.size:
+            return None
+        ints = layout.struct.unpack_from(self._buf, pos + _MASK.size)
+        return {n: i * s for n, i, s in zip(layout.names, ints, layout.scales)}
+
+    def _process(self) -> List[LoRaMessage]:
+        buf = self._buf
+        view = self._view
+        out: List[LoRaMessage] = []
+        pos = self._start
+        n = self._end
+        while pos < n:
+            if buf[pos] == 0xAA:
+                if n - pos < _HEAD:
+                    break
+                if buf[pos + 1] != 0x55:
+                    pos += 1
+                    self.dropped_bytes += 1
+                    continue
+                size = buf[pos + 2]
+                end = pos + _HEAD + size + _CRC.size
+                if end > n:
+                    break
+                fields = None
+                crc = crc16(view[pos + 2:end - _CRC.size])
+                if _CRC.unpack_from(buf, end - _CRC.size)[0] == crc:
+                    fields = self._decode(pos + _HEAD, size)
+                if fields is None:
+                    # CRC o largo inválido: el largo no es confiable, así que
+                    # solo se descarta la sincronía y se busca la siguiente
+                    self.bad_frames += 1
+                    self.dropped_bytes += 1
+                    self._resync = True
+                    pos += 1
+                    continue
+                self._resync = False
+                self.frames += 1
+                out.append(LoRaMessage(fields, view[pos:end].hex()))
+                pos = end
+                continue
+
+            nl = buf.find(b"\n", pos, n)
+            sync = buf.find(b"\xAA", pos, n)
+            if nl < 0 or 0 <= sync < nl:
+                if sync >= 0:
+                    # Texto sin terminar antes de una trama: se descarta
+                    self.dropped_bytes += sync - pos
+                    pos = sync
+                    continue
+                if n - pos > MAX_LINE:
+                    self.dropped_bytes += n - pos
+                    pos = n
+                break
+            if self._resync:
+                # Resto de una trama dañada (puede traer \n): no es texto
+                self._resync = False
+                self.dropped_bytes += nl + 1 - pos
+                pos = nl + 1
+                continue
+            line = bytes(view[pos:nl]).strip()
+            pos = nl + 1
+            if line:
+                self.lines += 1
+                fields = self.text_parser(line) if self.text_parser is not None else None
+                out.append(LoRaMessage(fields, line.decode("utf-8", errors="ignore")))
+        if pos >= n:
+            self._start = self._end = 0
+        else:
+            self._start = pos
+        return out